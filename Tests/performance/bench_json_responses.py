@@ -0,0 +1,100 @@
+"""
+Бенчмарк сериализации ответов.
+
+Сравнивает прежний путь FastAPI (словарь -> jsonable_encoder -> JSONResponse,
+модель ответа через response_model) с FastJSONResponse, ModelResponse и
+заранее сериализованными StaticJSON на одинаковых эндпоинтах. Запросы
+подаются напрямую в ASGI-приложение, без middleware и сети.
+
+Запуск: python Tests/performance/bench_json_responses.py [--requests N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from fastapi import FastAPI, Request
+from bench_middleware import call
+from src.api.auth import LoginResponse
+from src.infrastructure.http.jsonResponse import FastJSONResponse, ModelResponse, StaticJSON
+
+API_INFO = {
+    "name": "Agora.AI API",
+    "version": "1.0.0",
+    "description": "Интеллектуальная платформа B2B-сотрудничества",
+    "endpoints": {name: f"/api/v1/{name}" for name in
+                  ("auth", "profile", "match", "logistics", "contract", "ai", "reputation", "blockchain")},
+}
+
+def metrics_payload() -> dict:
+    # Ответ /api/v1/metrics с 20 маршрутами в трех окнах
+    summary = {"requests": 100, "rps": 1.667, "errors": 2, "server_errors": 0, "error_rate": 0.02,
+               "latency_ms": {"p50": 1.2, "p95": 4.5, "p99": 9.1}}
+    window = {"total": summary, "routes": {f"/api/v1/route{i}": dict(summary) for i in range(20)}}
+    return {"requests_total": 1000, "errors_total": 20, "active_users": 5,
+            "windows": {name: window for name in ("1m", "5m", "1h")}}
+
+def make_app(fast: bool) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse) if fast else FastAPI()
+    info = StaticJSON(API_INFO)
+    token = "x" * 180
+
+    if fast:
+        @app.get("/api/v1/info")
+        async def api_info(request: Request):
+            return info.response(request)
+
+        @app.get("/api/v1/metrics")
+        async def metrics():
+            return FastJSONResponse(metrics_payload())
+
+        @app.get("/login", response_model=LoginResponse)
+        async def login():
+            return ModelResponse(LoginResponse(access_token=token, expires_in=86400))
+    else:
+        @app.get("/api/v1/info")
+        async def api_info():
+            return API_INFO
+
+        @app.get("/api/v1/metrics")
+        async def metrics():
+            return metrics_payload()
+
+        @app.get("/login", response_model=LoginResponse)
+        async def login():
+            return LoginResponse(access_token=token, expires_in=86400)
+
+    return app
+
+async def bench(app, path: str, requests: int) -> float:
+    for _ in range(200):
+        await call(app, path)
+    started = time.perf_counter_ns()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter_ns() - started) / requests / 1000
+
+async def main_async(requests: int) -> None:
+    apps = {
+        "jsonable_encoder + json": make_app(fast=False),
+        "orjson / static bytes": make_app(fast=True),
+    }
+    paths = ("/api/v1/info", "/api/v1/metrics", "/login")
+    print(f"Запросов на эндпоинт: {requests}")
+    print(f"{'вариант':<26}" + "".join(f"{path + ', мкс':>22}" for path in paths))
+    for name, app in apps.items():
+        results = [await bench(app, path, requests) for path in paths]
+        print(f"{name:<26}" + "".join(f"{value:>22.1f}" for value in results))
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации ответов")
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+if __name__ == "__main__":
+    main()
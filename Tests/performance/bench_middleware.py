@@ -0,0 +1,101 @@
+"""
+Бенчмарк накладных расходов middleware учета запросов.
+
+Сравнивает прежний @app.middleware("http") (BaseHTTPMiddleware) с ASGI
+TimingMiddleware на health-эндпоинтах. Запросы подаются напрямую в ASGI-приложение,
+без сети и HTTP-клиента.
+
+Запуск: python Tests/performance/bench_middleware.py [--requests N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi import FastAPI, Request
+from src.infrastructure.monitoring.monitoringService import monitoring_service, route_label
+from src.infrastructure.monitoring.timingMiddleware import TimingMiddleware
+
+def make_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    if pure_asgi:
+        app.add_middleware(TimingMiddleware)
+    else:
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            monitoring_service.increment_api_requests(
+                endpoint=route_label(request.scope),
+                method=request.method,
+                status=response.status_code
+            )
+            monitoring_service.track_request_duration(process_time)
+            monitoring_service.record_request_stats(route_label(request.scope), response.status_code, process_time)
+            response.headers["X-Process-Time"] = str(process_time)
+            return response
+
+    @app.get("/health/live")
+    async def liveness_check():
+        return {"status": "alive"}
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "timestamp": time.time()}
+
+    return app
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+async def bench(app, path: str, requests: int) -> float:
+    for _ in range(200):
+        await call(app, path)
+    started = time.perf_counter_ns()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter_ns() - started) / requests / 1000
+
+async def main_async(requests: int) -> None:
+    apps = {
+        "BaseHTTPMiddleware": make_app(pure_asgi=False),
+        "TimingMiddleware (ASGI)": make_app(pure_asgi=True),
+    }
+    print(f"Запросов на эндпоинт: {requests}")
+    print(f"{'middleware':<26}{'/health/live, мкс':>20}{'/health, мкс':>16}")
+    for name, app in apps.items():
+        live = await bench(app, "/health/live", requests)
+        health = await bench(app, "/health", requests)
+        print(f"{name:<26}{live:>20.1f}{health:>16.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк middleware учета запросов")
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+if __name__ == "__main__":
+    main()
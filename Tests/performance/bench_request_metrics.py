@@ -0,0 +1,62 @@
+"""
+Микробенчмарк стоимости метрик запроса в middleware.
+
+До: метка endpoint - сырой путь, labels() на каждый запрос.
+После: метка - шаблон маршрута, дочерняя метрика берется из кэша.
+
+Запуск: python Tests/performance/bench_request_metrics.py [--requests N]
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from prometheus_client import CollectorRegistry, Counter
+from src.infrastructure.monitoring.monitoringService import monitoring_service, route_label
+
+def make_requests(count: int):
+    """Смесь запросов с параметрами пути и 404-сканов"""
+    profile_route = SimpleNamespace(path="/api/v1/profile/{profile_id}")
+    requests = []
+    for i in range(count):
+        if i % 10 == 0:
+            requests.append(({"path": f"/wp-admin/{i}.php"}, 404))
+        else:
+            requests.append(({"path": f"/api/v1/profile/{i}", "route": profile_route}, 200))
+    return requests
+
+def bench_legacy(requests) -> tuple:
+    registry = CollectorRegistry()
+    counter = Counter('bench_api_requests_total', 'API requests', ['endpoint', 'method', 'status'], registry=registry)
+    started = time.perf_counter_ns()
+    for scope, status in requests:
+        counter.labels(endpoint=scope["path"], method="GET", status=status).inc()
+    elapsed = time.perf_counter_ns() - started
+    return elapsed, len(counter._metrics)
+
+def bench_current(requests) -> tuple:
+    started = time.perf_counter_ns()
+    for scope, status in requests:
+        monitoring_service.increment_api_requests(route_label(scope), "GET", status)
+    elapsed = time.perf_counter_ns() - started
+    return elapsed, len(monitoring_service._request_children)
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк метрик запросов")
+    parser.add_argument('--requests', type=int, default=200000)
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests)
+    legacy_ns, legacy_series = bench_legacy(requests)
+    current_ns, current_series = bench_current(requests)
+
+    print(f"Запросов: {args.requests}")
+    print(f"{'вариант':<28}{'нс/запрос':>12}{'серий':>10}")
+    print(f"{'сырой путь + labels()':<28}{legacy_ns / args.requests:>12.0f}{legacy_series:>10}")
+    print(f"{'шаблон + кэш дочерних':<28}{current_ns / args.requests:>12.0f}{current_series:>10}")
+
+if __name__ == "__main__":
+    main()
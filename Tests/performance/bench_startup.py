@@ -0,0 +1,92 @@
+"""
+Бенчмарк запуска воркера: время импорта main и время до первого ответа.
+
+Каждый замер - отдельный чистый процесс Python: импорт main, затем запуск
+lifespan (создание сервисов) и первый GET /health/live через ASGI-транспорт
+httpx, без сети. Дополнительно проверяется, что импорт main не создает
+сервисы (не занимает порт метрик и не строит HTTP клиент).
+
+Запуск: python Tests/performance/bench_startup.py [--runs N] [--import-budget-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+
+from src.infrastructure.monitoring import monitoringService
+from src.integrations.telegram import telegramIntegration
+lazy = monitoringService._monitoring_service is None and telegramIntegration._telegram_integration is None
+
+import httpx
+
+async def first_response():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health/live")
+        responded = time.perf_counter()
+    return ready, responded, response.status_code
+
+ready, responded, status = asyncio.run(first_response())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+    "lazy": lazy,
+    "status": status,
+}}))
+"""
+
+def measure() -> dict:
+    env = dict(os.environ)
+    env.setdefault("TELEGRAM_BOT_TOKEN", "123456:BENCH")
+    env.setdefault("AGORA_EVENT_LOG", os.devnull)
+    # Отдельный порт, чтобы не конфликтовать с запущенным приложением
+    env.setdefault("AGORA_METRICS_PORT", "0")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=ROOT)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска воркера")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=None,
+                        help="Завершиться с ошибкой, если медиана импорта main больше бюджета")
+    args = parser.parse_args()
+
+    samples = [measure() for _ in range(args.runs)]
+    print(f"Запусков: {args.runs}")
+    print(f"{'метрика':<22}{'медиана, мс':>14}{'макс, мс':>12}")
+    for key in ("import_ms", "startup_ms", "first_response_ms"):
+        values = [sample[key] for sample in samples]
+        print(f"{key:<22}{statistics.median(values):>14.1f}{max(values):>12.1f}")
+
+    lazy = all(sample["lazy"] for sample in samples)
+    print(f"Сервисы не создаются при импорте: {'да' if lazy else 'НЕТ'}")
+
+    failed = not lazy or any(sample["status"] != 200 for sample in samples)
+    if args.import_budget_ms is not None:
+        median_import = statistics.median(sample["import_ms"] for sample in samples)
+        if median_import > args.import_budget_ms:
+            print(f"Импорт main превышает бюджет: {median_import:.1f} > {args.import_budget_ms:.1f} мс")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
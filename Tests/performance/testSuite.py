@@ -0,0 +1,275 @@
+# AGORA_BLOCK: start:performance_tests
+"""
+Нагрузочный бенчмарк API в одном процессе.
+
+main:app запускается с lifespan и нагружается через ASGI-транспорт httpx
+виртуальными клиентами, без сети. Telegram Bot API подменяется локальным
+FakeTelegramServer. Каждый сценарий повторяется --repeats раз; записываются
+медианы пропускной способности и квантилей задержки и разброс между повторами.
+
+Запуск:
+    python Tests/performance/testSuite.py --save Tests/performance/baseline.json
+    python Tests/performance/testSuite.py --compare Tests/performance/baseline.json --threshold 0.3
+
+В режиме --compare код возврата 1, если p95 задержки какого-либо сценария
+вырос или пропускная способность упала больше чем на порог: threshold или
+удвоенный разброс повторов, если он больше.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from telegram_fixtures import FakeTelegramServer, make_init_data
+
+BENCH_BOT_TOKEN = "123456:BENCHMARK"
+BENCH_USER = {"id": 424242, "first_name": "Bench", "username": "bench_user", "language_code": "ru"}
+
+# AGORA_BLOCK: start:performance_scenarios
+class Scenario:
+    """Сценарий нагрузки: фабрика запроса по номеру и допустимые статусы"""
+
+    def __init__(self, name: str, build: Callable[[int], Dict[str, Any]], ok_statuses=(200,)):
+        self.name = name
+        self.build = build
+        self.ok_statuses = ok_statuses
+
+def make_scenarios(total: int, token: str) -> List[Scenario]:
+    # initData подписываются заранее: у каждого входа уникальный query_id (защита от повторов)
+    init_data = [
+        make_init_data(BENCH_BOT_TOKEN, BENCH_USER, query_id=f"BENCH{i:010d}")
+        for i in range(total)
+    ]
+    auth_header = {"Authorization": f"Bearer {token}"}
+    return [
+        Scenario("health_live", lambda i: {"method": "GET", "url": "/health/live"}),
+        Scenario("health_ready", lambda i: {"method": "GET", "url": "/health/ready"}),
+        Scenario("api_info", lambda i: {"method": "GET", "url": "/api/v1/info"}),
+        Scenario("metrics", lambda i: {"method": "GET", "url": "/api/v1/metrics"}),
+        Scenario("auth_login", lambda i: {"method": "POST", "url": "/api/v1/auth/login",
+                                          "json": {"init_data": init_data[i]}}),
+        Scenario("auth_me", lambda i: {"method": "GET", "url": "/api/v1/auth/me", "headers": auth_header}),
+    ]
+# AGORA_BLOCK: end:performance_scenarios
+
+# AGORA_BLOCK: start:performance_run
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Квантиль по ближайшему рангу"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, indexes: range,
+                       concurrency: int) -> Dict[str, Any]:
+    """Один прогон сценария; indexes - номера запросов (уникальные initData для входа)"""
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(indexes)
+
+    async def virtual_client() -> None:
+        nonlocal errors
+        for index in pending:
+            started = time.perf_counter()
+            response = await client.request(**scenario.build(index))
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in scenario.ok_statuses:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[virtual_client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(indexes),
+        "errors": errors,
+        "throughput_rps": round(len(indexes) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+    }
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Медиана метрик по повторам и их разброс: noise - (max - min) / медиана
+    для p95 и пропускной способности, по нему compare() подбирает порог
+    """
+    def median_and_noise(values: List[float]) -> tuple:
+        median = statistics.median(values)
+        return round(median, 3), round((max(values) - min(values)) / median, 3) if median else 0.0
+
+    rps, rps_noise = median_and_noise([run["throughput_rps"] for run in runs])
+    latency = {}
+    for key in ("p50", "p95", "p99", "max"):
+        latency[key], noise = median_and_noise([run["latency_ms"][key] for run in runs])
+        if key == "p95":
+            p95_noise = noise
+    return {
+        "requests": sum(run["requests"] for run in runs),
+        "repeats": len(runs),
+        "errors": sum(run["errors"] for run in runs),
+        "throughput_rps": rps,
+        "latency_ms": latency,
+        "noise": {"throughput_rps": rps_noise, "p95": p95_noise},
+    }
+
+@contextmanager
+def scoped_environ(values: Dict[str, str], defaults: Dict[str, str]):
+    """Переменные окружения на время прогона: values - всегда, defaults - если не заданы"""
+    saved = {name: os.environ.get(name) for name in (*values, *defaults)}
+    os.environ.update(values)
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+async def run_suite(requests: int, concurrency: int, warmup: int = 100,
+                    only: Optional[List[str]] = None, repeats: int = 5) -> Dict[str, Any]:
+    server = FakeTelegramServer()
+    await server.start()
+    environ = {"TELEGRAM_BOT_TOKEN": BENCH_BOT_TOKEN, "TELEGRAM_API_URL": server.url}
+    defaults = {
+        "AGORA_EVENT_LOG": os.devnull,
+        "AGORA_METRICS_PORT": "0",
+        "JWT_SECRET": "benchmark-secret-key-of-at-least-32-bytes",
+    }
+
+    results: Dict[str, Any] = {}
+    try:
+        with scoped_environ(environ, defaults):
+            import main
+
+            async with main.app.router.lifespan_context(main.app):
+                # lifespan включает INFO для корневого логгера: строка httpx на каждый
+                # запрос пишется синхронно и искажает задержки и пропускную способность
+                logging.getLogger("httpx").setLevel(logging.WARNING)
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                    login = await client.post("/api/v1/auth/login", json={
+                        "init_data": make_init_data(BENCH_BOT_TOKEN, BENCH_USER, query_id="BENCHWARMUP")
+                    })
+                    login.raise_for_status()
+                    # Первые результаты фоновых проверок готовности
+                    await asyncio.sleep(0.1)
+
+                    # Номера запросов: прогрев, затем повторы (initData входа не повторяются)
+                    for scenario in make_scenarios(warmup + repeats * requests, login.json()["access_token"]):
+                        if only and scenario.name not in only:
+                            continue
+                        await run_scenario(client, scenario, range(warmup), concurrency)
+                        runs = [
+                            await run_scenario(client, scenario, range(start, start + requests), concurrency)
+                            for start in range(warmup, warmup + repeats * requests, requests)
+                        ]
+                        results[scenario.name] = summarize(runs)
+                        print(format_row(scenario.name, results[scenario.name]))
+    finally:
+        await server.stop()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": requests,
+            "repeats": repeats,
+            "concurrency": concurrency,
+            "warmup": warmup,
+        },
+        "scenarios": results,
+    }
+# AGORA_BLOCK: end:performance_run
+
+# AGORA_BLOCK: start:performance_compare
+def format_row(name: str, result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    return (f"{name:<14}{result['throughput_rps']:>10.1f}{latency['p50']:>10.2f}{latency['p95']:>10.2f}"
+            f"{latency['p99']:>10.2f}{result['errors']:>8}{result['noise']['p95']:>9.0%}")
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Список регрессий относительно базовой линии.
+
+    Порог метрики - не меньше удвоенного разброса повторов (в текущем
+    прогоне или в базовой линии): изменения в пределах шума не считаются.
+    """
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        noise = {key: max(result.get("noise", {}).get(key, 0.0), base.get("noise", {}).get(key, 0.0))
+                 for key in ("p95", "throughput_rps")}
+        p95, base_p95 = result["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        limit = max(threshold, 2 * noise["p95"])
+        if base_p95 and p95 > base_p95 * (1 + limit):
+            regressions.append(f"{name}: p95 {base_p95:.2f} -> {p95:.2f} мс (+{p95 / base_p95 - 1:.0%}, порог {limit:.0%})")
+        rps, base_rps = result["throughput_rps"], base["throughput_rps"]
+        limit = min(0.9, max(threshold, 2 * noise["throughput_rps"]))
+        if base_rps and rps < base_rps * (1 - limit):
+            regressions.append(f"{name}: throughput {base_rps:.1f} -> {rps:.1f} rps ({rps / base_rps - 1:.0%}, порог {limit:.0%})")
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {result['errors']}")
+    return regressions
+# AGORA_BLOCK: end:performance_compare
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк API в одном процессе")
+    parser.add_argument('--requests', type=int, default=2000, help="Запросов на сценарий")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Число виртуальных клиентов (ASGI-транспорт выполняет запросы без сети, "
+                             "поэтому клиенты почти не перекрываются - задержка равна времени обработки)")
+    parser.add_argument('--repeats', type=int, default=5, help="Повторов сценария (в результатах - медиана)")
+    parser.add_argument('--warmup', type=int, default=100, help="Неучитываемых запросов прогрева на сценарий")
+    parser.add_argument('--scenario', action='append', help="Запустить только указанные сценарии")
+    parser.add_argument('--save', help="Сохранить результаты как базовую линию (JSON)")
+    parser.add_argument('--compare', help="Сравнить с базовой линией (JSON)")
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help="Допустимое ухудшение (доля); для шумных метрик порог - удвоенный разброс повторов")
+    args = parser.parse_args()
+
+    print(f"Запросов на сценарий: {args.requests} x {args.repeats} повторов, клиентов: {args.concurrency}")
+    print(f"{'сценарий':<14}{'rps':>10}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'ошибки':>8}{'шум p95':>9}")
+    results = asyncio.run(run_suite(args.requests, args.concurrency, args.warmup, args.scenario, args.repeats))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nБазовая линия сохранена: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Регрессии (порог {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ Регрессий нет (порог {args.threshold:.0%})")
+
+if __name__ == "__main__":
+    main()
+# AGORA_BLOCK: end:performance_tests
@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+def make_init_data(bot_token: str, user: Dict[str, Any], auth_date: Optional[int] = None,
+                   query_id: str = "AAHdF6IQAAAAAN0XohDhrKY") -> str:
+    """Формирование подписанных initData так же, как это делает Telegram"""
+    fields = {
+        "query_id": query_id,
+        "user": json.dumps(user, separators=(",", ":"), ensure_ascii=False),
+        "auth_date": str(auth_date if auth_date is not None else int(time.time())),
+    }
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+class FakeTelegramServer:
+    """Локальный HTTP-сервер, имитирующий Telegram Bot API"""
+
+    def __init__(self):
+        self.calls = []
+        # chat_id -> список retry_after, которые вернутся до успешного ответа
+        self.rate_limits: Dict[Any, list] = {}
+        # метод -> (error_code, description) для ответов с "ok": false
+        self.failures: Dict[str, Tuple[int, str]] = {}
+        # метод -> событие, до установки которого ответ задерживается
+        self.gates: Dict[str, asyncio.Event] = {}
+        self.url = None
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _respond(self, method: str, payload: Dict[str, Any]):
+        chat_id = payload.get("chat_id")
+        pending_limits = self.rate_limits.get(chat_id)
+        if pending_limits:
+            retry_after = pending_limits.pop(0)
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            }
+
+        if method in self.failures:
+            error_code, description = self.failures[method]
+            return error_code, {"ok": False, "error_code": error_code, "description": description}
+
+        self.calls.append((method, payload, time.monotonic()))
+        if method == "sendMessage":
+            result = {"message_id": len(self.calls), "chat": {"id": chat_id}, "text": payload.get("text")}
+        elif method == "createChatInviteLink":
+            result = {"invite_link": f"https://t.me/+fake{len(self.calls)}", "member_limit": payload.get("member_limit")}
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+        else:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        return 200, {"ok": True, "result": result}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+                length = int({k.lower(): v for k, v in headers.items()}.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                method = path.rsplit("/", 1)[-1]
+                if method in self.gates:
+                    await self.gates[method].wait()
+                status, data = self._respond(method, json.loads(body or b"{}"))
+                raw = json.dumps(data).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(raw)}\r\n\r\n".encode() + raw
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.cache.asyncTtlCache import AsyncTTLCache
+
+async def run_cache_checks():
+    calls = []
+    release = asyncio.Event()
+
+    async def slow_loader(key):
+        calls.append(key)
+        await release.wait()
+        return {"id": key, "version": len(calls)}
+
+    # Тест 1: Одновременные промахи объединяются в один запрос
+    print("\nТест 1: Объединение одновременных промахов")
+    cache = AsyncTTLCache("test", slow_loader, ttl=60, stale_ttl=60, max_size=2)
+    waiters = [asyncio.create_task(cache.get(1)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 9
+    print("✅ 10 запросов - 1 вызов loader")
+
+    # Тест 2: Устаревшее значение отдается сразу, обновление идет в фоне
+    print("\nТест 2: Stale-while-revalidate")
+    cache.ttl = 0
+    release.clear()
+    stale = await cache.get(1)
+    assert stale["version"] == 1
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+    release.set()
+    await asyncio.sleep(0.01)
+    cache.ttl = 60
+    fresh = await cache.get(1)
+    assert fresh["version"] == 2
+    print("✅ Устаревшее значение отдано без ожидания, затем обновлено")
+
+    # Тест 3: Ограничение размера
+    print("\nТест 3: Ограничение размера")
+    await cache.get(2)
+    await cache.get(3)
+    assert len(cache) == 2
+    assert cache.stats()["hit_ratio"] > 0
+    print("✅ Лишняя запись вытеснена")
+
+    # Тест 4: Ошибки и None не кэшируются
+    print("\nТест 4: Ошибки и None")
+    failures = []
+
+    async def failing_loader(key):
+        failures.append(key)
+        if len(failures) == 1:
+            raise RuntimeError("upstream down")
+        return None
+
+    failing_cache = AsyncTTLCache("failing", failing_loader)
+    try:
+        await failing_cache.get("x")
+        assert False, "Ожидалась ошибка loader"
+    except RuntimeError:
+        pass
+    assert await failing_cache.get("x") is None
+    assert await failing_cache.get("x") is None
+    assert len(failing_cache) == 0
+    print("✅ Ошибки и пустые ответы не закэшированы")
+
+def test_async_ttl_cache():
+    print("Тестирование AsyncTTLCache...")
+    asyncio.run(run_cache_checks())
+
+if __name__ == "__main__":
+    test_async_ttl_cache()
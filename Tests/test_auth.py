@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 from fastapi.testclient import TestClient
 from main import app
 from src.integrations.telegram.telegramIntegration import telegram_integration
+from telegram_fixtures import make_init_data
 
 def test_auth_api():
     print("Тестирование Auth API...")
@@ -45,7 +46,8 @@ def test_auth_api():
     
     # Тест 4: Вход с тестовыми данными
     print("\nТест 4: Вход с тестовыми данными")
-    test_init_data = "query_id=AAHdF6IQAAAAAN0XohDhrKY&user=%7B%22id%22%3A123456789%2C%22first_name%22%3A%22Test%22%2C%22last_name%22%3A%22User%22%2C%22username%22%3A%22testuser%22%2C%22language_code%22%3A%22en%22%7D&auth_date=1663224242&hash=c8a3b9e3d8e4f5a6b7c8d9e0f1a2b3c4d5e6f7a8b9c0d1e2f3a4b5c6d7e8f9a0b1"
+    test_user = {"id": 123456789, "first_name": "Test", "last_name": "User", "username": "testuser", "language_code": "en"}
+    test_init_data = make_init_data(telegram_integration.bot_token, test_user)
     
     login_data = {
         "init_data": test_init_data
@@ -53,6 +55,7 @@ def test_auth_api():
     
     response = client.post("/api/v1/auth/login", json=login_data)
     print(f"✅ Статус входа: {response.status_code}")
+    assert response.status_code == 200
     
     if response.status_code == 200:
         token_data = response.json()
@@ -67,6 +70,9 @@ def test_auth_api():
         
         response = client.get("/api/v1/auth/me", headers=headers)
         print(f"✅ Получение данных пользователя: {response.status_code}")
+        print(f"   Server-Timing: {response.headers.get('server-timing')}")
+        assert "auth;dur=" in response.headers["server-timing"]
+        assert float(response.headers["x-process-time"]) > 0
         
         if response.status_code == 200:
             user_info = response.json()
@@ -77,6 +83,24 @@ def test_auth_api():
             print(f"   Ошибка: {response.json()}")
     else:
         print(f"   Ошибка входа: {response.json()}")
+    
+    # Тест 6: Повторное использование тех же initData
+    print("\nТест 6: Повторное использование initData")
+    response = client.post("/api/v1/auth/login", json=login_data)
+    print(f"✅ Повтор отклонен: {response.status_code}")
+    assert response.status_code == 401
+    
+    # Тест 7: Поддельная подпись и устаревшие initData
+    print("\nТест 7: Поддельная подпись и устаревшие initData")
+    forged_init_data = make_init_data("000000:FORGED", test_user)
+    response = client.post("/api/v1/auth/login", json={"init_data": forged_init_data})
+    print(f"✅ Поддельная подпись отклонена: {response.status_code}")
+    assert response.status_code == 401
+    
+    stale_init_data = make_init_data(telegram_integration.bot_token, test_user, auth_date=1663224242)
+    response = client.post("/api/v1/auth/login", json={"init_data": stale_init_data})
+    print(f"✅ Устаревшие initData отклонены: {response.status_code}")
+    assert response.status_code == 401
 
 if __name__ == "__main__":
     test_auth_api()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import queue
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.block_watcher import BlockEvent, BlockWatcher, InotifyBackend
+from src.utils.code_utils import CodeBlockManager
+from test_code_block_manager import SERVICE_SOURCE, make_project
+
+def collect(events_queue, count, timeout=5):
+    """События из callback watcher'а (пока не набрано count событий)"""
+    events = set()
+    while len(events) < count:
+        events.update(events_queue.get(timeout=timeout))
+    return events
+
+def check_watcher(use_inotify):
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+        events_queue = queue.Queue()
+        watcher = BlockWatcher([directory], tag_index=manager.tag_index, callback=events_queue.put,
+                               poll_interval=0.05, use_inotify=use_inotify)
+        watcher.start()
+        try:
+            print(f"   Механизм наблюдения: {watcher.backend.name}")
+            assert set(watcher.get_blocks(source)) == {"service", "init", "init_data"}
+            assert watcher.find("init") == [(source, 5, 8)]
+            assert source in manager.tag_index.watched
+
+            # Изменение одного блока через CodeBlockManager (атомарная замена файла)
+            manager.replace_block("init_data", "DATA = 2")
+            events = collect(events_queue, 2)
+            assert events == {BlockEvent("changed", source, "init_data"), BlockEvent("changed", source, "service")}
+
+            # Новый файл и удаление блока
+            other = os.path.join(directory, "pkg", "other.py")
+            os.makedirs(os.path.dirname(other))
+            with open(other, "w", encoding="utf-8") as f:
+                f.write("# AGORA_BLOCK: start:other\nX = 1\n# AGORA_BLOCK: end:other\n")
+            assert collect(events_queue, 1) == {BlockEvent("added", other, "other")}
+            os.remove(other)
+            assert collect(events_queue, 1) == {BlockEvent("removed", other, "other")}
+
+            # Менеджер видит изменения из индекса watcher'а
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(SERVICE_SOURCE.replace("DATA = 1", "DATA = 3"))
+            collect(events_queue, 2)
+            assert manager.get_block_content("init_data") == "DATA = 3"
+        finally:
+            watcher.stop()
+        assert not manager.tag_index.watched
+
+def check_external_edit():
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+        # Редкий опрос: watcher заведомо не успевает увидеть правку
+        watcher = BlockWatcher([directory], tag_index=manager.tag_index, poll_interval=60, use_inotify=False)
+        watcher.start()
+        try:
+            assert source in manager.tag_index.watched
+            with open(source, "a", encoding="utf-8") as f:
+                f.write("y = 2\n")
+            manager.replace_block("init_data", "DATA = 2")
+            with open(source, encoding="utf-8") as f:
+                content = f.read()
+            assert content.endswith("y = 2\n") and "DATA = 2" in content
+        finally:
+            watcher.stop()
+
+def test_block_watcher():
+    print("Тестирование наблюдения за блоками...")
+
+    # Тест 1: Опрос mtime
+    print("\nТест 1: Опрос файлов")
+    check_watcher(use_inotify=False)
+    print("✅ События блоков получены опросом")
+
+    # Тест 2: inotify (на Linux)
+    print("\nТест 2: inotify")
+    if InotifyBackend.available():
+        check_watcher(use_inotify=True)
+        print("✅ События блоков получены через inotify")
+    else:
+        print("⚠️ inotify недоступен, проверка пропущена")
+
+    # Тест 3: Внешняя правка до обновления индекса watcher'ом
+    print("\nТест 3: Запись наблюдаемого файла")
+    check_external_edit()
+    print("✅ Правка, которую watcher еще не видел, сохранена при замене блока")
+
+    print("\n✅ Наблюдение за блоками работает корректно!")
+
+if __name__ == "__main__":
+    test_block_watcher()
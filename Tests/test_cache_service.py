@@ -0,0 +1,136 @@
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.cache.cacheService import CacheService, InMemorySharedTier, NamespaceConfig
+from src.infrastructure.cache.strategies.translationCache import TranslationCache
+from src.infrastructure.events.eventBus import get_event_bus
+
+async def run_cache_service_checks():
+    shared = InMemorySharedTier()
+    configs = {
+        "translation": NamespaceConfig(ttl=60.0, max_size=3, early_refresh_beta=0),
+        "embedding": NamespaceConfig(ttl=60.0, early_refresh_beta=1e9),
+        "short": NamespaceConfig(ttl=0.05, early_refresh_beta=0),
+    }
+    service = CacheService(shared, configs)
+    calls = []
+
+    def loader(value, delay=0.0):
+        async def load():
+            calls.append(value)
+            await asyncio.sleep(delay)
+            return value
+        return load
+
+    # Тест 1: Одновременные промахи - одна загрузка
+    print("\nТест 1: Объединение запросов")
+    translation = service.namespace("translation")
+    results = await asyncio.gather(*(translation.get("hello", loader("привет", 0.02)) for _ in range(20)))
+    assert results == ["привет"] * 20
+    assert calls == ["привет"]
+    assert translation.counts["miss"] == 1 and translation.counts["coalesced"] == 19
+    assert await translation.get("hello", loader("другое")) == "привет"
+    assert translation.counts["hit"] == 1 and calls == ["привет"]
+    print("✅ 20 одновременных запросов - одна загрузка")
+
+    # Тест 2: Общий уровень виден другому воркеру
+    print("\nТест 2: Общий уровень")
+    worker = CacheService(shared, configs).namespace("translation")
+    assert await worker.get("hello", loader("другое")) == "привет"
+    assert worker.counts["shared_hit"] == 1 and calls == ["привет"]
+    assert await worker.get("missing") is None
+    print("✅ Значение получено из общего уровня без загрузки")
+
+    # Тест 3: Вытеснение по размеру
+    print("\nТест 3: Ограничение локального уровня")
+    for i in range(4):
+        await translation.set(f"key{i}", i)
+    assert len(translation) == 3 and translation.counts["evicted"] == 2
+    assert "hello" not in translation._entries and "key0" not in translation._entries
+    assert await translation.get("key0") == 0 and translation.counts["shared_hit"] == 1
+    print("✅ Лишние записи вытеснены по LRU, общий уровень их сохранил")
+
+    # Тест 4: Раннее обновление до истечения
+    print("\nТест 4: Вероятностное раннее обновление")
+    embedding = service.namespace("embedding")
+    await embedding.set("doc", [0.1], delta=1.0)
+    assert await embedding.get("doc", loader([0.2])) == [0.1]
+    assert embedding.counts["early_refresh"] == 1
+    await asyncio.sleep(0.01)
+    assert await embedding.get("doc") == [0.2]
+    assert await CacheService(shared, configs).namespace("embedding").get("doc") == [0.2]
+    print("✅ Значение обновлено в фоне, запрос получил прежнее без ожидания")
+
+    # Тест 5: Истечение TTL
+    print("\nТест 5: Время жизни пространства имен")
+    short = service.namespace("short")
+    assert await short.get("token", loader("s1")) == "s1"
+    await asyncio.sleep(0.06)
+    assert await short.get("token", loader("s2")) == "s2"
+    assert short.counts["miss"] == 2
+    print("✅ Истекшие записи загружаются заново")
+
+    # Тест 6: Ошибка загрузки получают все ожидающие, ключ не кэшируется
+    print("\nТест 6: Ошибка загрузки")
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("source down")
+    outcomes = await asyncio.gather(*(translation.get("broken", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert await translation.get("broken", loader("ok")) == "ok"
+    print("✅ Ошибка передана всем ожидающим, следующий запрос загружает заново")
+
+    # Тест 7: Инвалидация и стратегии
+    print("\nТест 7: Инвалидация")
+    translations = TranslationCache(translation)
+    key = TranslationCache.key("Hello", "EN", "ru")
+    assert key.startswith("en:ru:") and len(key) == len("en:ru:") + 64
+    assert await translations.get("Hello", "EN", "ru", loader("Привет")) == "Привет"
+    await translations.invalidate("Hello", "en", "ru")
+    assert await shared.get("translation:" + key) is None
+    await translation.clear()
+    assert len(translation) == 0
+    assert await shared.get("translation:key1") is None and await shared.get("embedding:doc") is not None
+    await service.close()
+    print("✅ Ключи удалены из обоих уровней")
+
+    # Тест 8: Недоступный общий уровень не ломает инвалидацию
+    print("\nТест 8: Ошибки общего уровня при удалении")
+    class BrokenSharedTier(InMemorySharedTier):
+        async def delete(self, key):
+            raise ConnectionError("shared tier down")
+
+        async def delete_prefix(self, prefix):
+            raise ConnectionError("shared tier down")
+
+    broken = CacheService(BrokenSharedTier(), configs).namespace("translation")
+    await broken.set("key", "value")
+    await broken.delete("key")
+    assert "key" not in broken._entries
+    await broken.set("key", "value")
+    await broken.clear()
+    assert len(broken) == 0
+    print("✅ Локальный уровень очищен, ошибка общего уровня записана в лог")
+
+def test_cache_service():
+    print("Тестирование сервиса кэша...")
+    bus = get_event_bus()
+    events = []
+    bus.subscribe("cache.*", events.append, name="test_cache_events")
+    try:
+        asyncio.run(run_cache_service_checks())
+        subscription = bus.subscriptions["test_cache_events"]
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        assert [event.topic for event in events] == ["cache.invalidated", "cache.cleared"] * 2
+        assert events[1].data["namespace"] == "translation"
+        assert events[3].data["shared_keys"] == 0
+    finally:
+        bus.unsubscribe("test_cache_events")
+
+    print("\n✅ Сервис кэша работает корректно!")
+
+if __name__ == "__main__":
+    test_cache_service()
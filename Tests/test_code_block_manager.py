@@ -0,0 +1,302 @@
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.code_map_store import SqliteCodeMapStore, convert_code_map
+from src.utils.code_utils import CodeBlockManager, block_hash
+
+SERVICE_SOURCE = """# AGORA_BLOCK: start:service
+import os
+# AGORA_BLOCK: start:init_data
+DATA = 1
+# AGORA_BLOCK: end:init_data
+# AGORA_BLOCK: start:init
+def init():
+    return DATA
+# AGORA_BLOCK: end:init
+# AGORA_BLOCK: end:service
+"""
+
+# init_data закрывается внутри init
+CROSSED_SOURCE = """# AGORA_BLOCK: start:service
+# AGORA_BLOCK: start:init_data
+DATA = 1
+# AGORA_BLOCK: start:init
+# AGORA_BLOCK: end:init_data
+def init():
+    return DATA
+# AGORA_BLOCK: end:init
+# AGORA_BLOCK: end:service
+"""
+
+def make_project(directory):
+    """Временный проект: исходный файл и кодовая карта с тремя блоками"""
+    source = os.path.join(directory, "service.py")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write(SERVICE_SOURCE)
+
+    def block(block_id, dependencies=()):
+        return {
+            "id": block_id,
+            "file": source,
+            "start_tag": f"# AGORA_BLOCK: start:{block_id}",
+            "end_tag": f"# AGORA_BLOCK: end:{block_id}",
+            "description": block_id,
+            "dependencies": list(dependencies),
+            "author": "AI_Assistant",
+            "version": "1.0.0",
+            "last_modified": "2023-11-15T00:00:00Z",
+        }
+
+    code_map = {"metadata": {"project": "test"}, "layers": {
+        "core": {"description": "core", "modules": {"service": block("service"), "init": block("init", ["init_data"])}},
+        "data": {"modules": {"init_data": block("init_data")}},
+    }}
+    code_map_path = os.path.join(directory, "code_map.json")
+    with open(code_map_path, "w", encoding="utf-8") as f:
+        json.dump(code_map, f, indent=2, ensure_ascii=False)
+    return source, code_map_path
+
+def test_code_block_manager_indexes():
+    print("Тестирование индексов CodeBlockManager...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+
+        # Тест 1: Индексы кодовой карты
+        print("\nТест 1: Поиск по ID, тегу и файлу")
+        assert manager.get_block_info("init_data")["id"] == "init_data"
+        assert manager.get_block_layer("init_data") == "data"
+        assert manager.find_block_by_tag("init") == "init"
+        assert manager.find_block_by_tag("# AGORA_BLOCK: start:service") == "service"
+        assert manager.find_block_by_tag("missing") is None
+        assert sorted(manager.get_file_blocks(source)) == ["init", "init_data", "service"]
+        print("✅ Блоки находятся без обхода слоев")
+
+        # Тест 2: Теги сравниваются целиком (init не совпадает с init_data)
+        print("\nТест 2: Точное совпадение тегов")
+        assert manager.get_block_content("init") == "def init():\n    return DATA"
+        assert manager.get_block_content("init_data") == "DATA = 1"
+        print("✅ start:init не спутан с start:init_data")
+
+        # Тест 3: Файл читается один раз, пока не изменится
+        print("\nТест 3: Кэш тегов по mtime и размеру")
+        first = manager.tag_index.get(source)
+        for block_id in ("service", "init", "init_data"):
+            manager.validate_block_integrity(block_id)
+        assert manager.tag_index.get(source)[0] is first[0]
+        with open(source, "a", encoding="utf-8") as f:
+            f.write("# AGORA_BLOCK: start:extra\n# AGORA_BLOCK: end:extra\n")
+        lines, tags = manager.tag_index.get(source)
+        assert lines is not first[0]
+        assert ("start", "extra") in tags
+        print("✅ Измененный файл перечитан, неизмененный - нет")
+
+        # Тест 4: Кодовая карта разбирается повторно только после изменения
+        print("\nТест 4: Кэш кодовой карты")
+        # Несохраненные правки одного менеджера не видны другим
+        manager.get_block_info("init")["description"] = "черновик"
+        assert CodeBlockManager(code_map_path).get_block_info("init")["description"] == "init"
+        manager.get_block_info("init")["description"] = "init"
+        manager.replace_block("init_data", "DATA = 2")
+        other = CodeBlockManager(code_map_path)
+        assert other.get_block_info("init_data")["version"] == "1.0.1"
+        assert other.get_block_content("init_data") == "DATA = 2"
+        print("✅ Новый менеджер видит сохраненные изменения")
+
+    print("\n✅ Индексы CodeBlockManager работают корректно!")
+
+def test_code_block_manager_batch_replace():
+    print("Тестирование пакетной замены блоков...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+
+        # Тест 1: Несколько блоков файла заменяются за одну запись
+        print("\nТест 1: Пакетная замена")
+        inode = os.stat(source).st_ino
+        changed = manager.replace_blocks({"init_data": "DATA = 3", "init": "def init():\n    return DATA * 2"})
+        assert changed == {source: ["init_data", "init"]}
+        assert manager.get_block_content("init_data") == "DATA = 3"
+        assert manager.get_block_content("init") == "def init():\n    return DATA * 2"
+        assert os.stat(source).st_ino != inode
+        assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+        assert CodeBlockManager(code_map_path).get_block_info("init")["version"] == "1.0.1"
+        print("✅ Оба блока обновлены, файл заменен атомарно, версии увеличены")
+
+        # Тест 2: Ошибка в одном блоке отменяет весь пакет
+        print("\nТест 2: Откат пакета при ошибке")
+        with open(source, encoding="utf-8") as f:
+            before = f.read()
+        for updates in ({"init": "x", "service": "y"}, {"init": "x", "missing": "y"}):
+            try:
+                manager.replace_blocks(updates)
+                assert False, "ожидалась ошибка"
+            except ValueError as e:
+                print(f"   {e}")
+        with open(source, encoding="utf-8") as f:
+            assert f.read() == before
+        assert manager.get_block_info("init")["version"] == "1.0.1"
+        print("✅ Вложенные блоки и неизвестный ID отклонены без изменений файлов")
+
+    print("\n✅ Пакетная замена работает корректно!")
+
+def test_code_block_manager_validation():
+    print("Тестирование проверки целостности блоков...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+
+        # Тест 1: Корректный файл и отсутствующий файл
+        print("\nТест 1: Корректные блоки")
+        results = manager.validate_all_blocks()
+        assert all(result["valid"] for result in results.values()), results
+        assert list(results) == ["service", "init", "init_data"]
+        manager.get_block_info("init")["file"] = os.path.join(directory, "missing.py")
+        manager.store.update_blocks(["init"])
+        is_valid, message = manager.validate_block_integrity("init")
+        assert not is_valid and "File not found" in message
+        manager.get_block_info("init")["file"] = source
+        manager.store.update_blocks(["init"])
+        print("✅ Все блоки валидны, отсутствующий файл не прерывает проверку")
+
+        # Тест 2: Пересечение блоков и незакрытый блок
+        print("\nТест 2: Ошибки вложенности и порядка")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write(CROSSED_SOURCE)
+        results = manager.validate_all_blocks(max_workers=2)
+        assert not results["init_data"]["valid"]
+        assert not results["init"]["valid"]
+        for block_id, result in results.items():
+            print(f"   {block_id}: {result['message']}")
+        print("✅ Пересекающиеся блоки отмечены невалидными")
+
+        # Тест 3: Строки, упоминающие теги в коде, не считаются тегами
+        print("\nТест 3: Теги только в строках-комментариях")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write(SERVICE_SOURCE.replace("DATA = 1", 'DATA = "# AGORA_BLOCK: end:service"  # AGORA_BLOCK: start:init'))
+        results = manager.validate_all_blocks()
+        assert all(result["valid"] for result in results.values()), results
+        print("✅ Упоминания тегов внутри кода игнорируются")
+
+    print("\n✅ Проверка целостности работает корректно!")
+
+def test_code_block_manager_content_hash():
+    print("Тестирование хэшей кода блоков...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        manager = CodeBlockManager(code_map_path)
+
+        # Тест 1: Замена тем же кодом ничего не записывает
+        print("\nТест 1: Обновление без изменений")
+        before = (os.stat(source).st_ino, os.stat(code_map_path).st_ino)
+        assert manager.replace_blocks({"init_data": "DATA = 1", "init": "def init():\n    return DATA"}) == {}
+        assert "unchanged" in manager.replace_block("init_data", "DATA = 1")
+        assert (os.stat(source).st_ino, os.stat(code_map_path).st_ino) == before
+        assert manager.modified_paths == set()
+        assert manager.get_block_info("init_data")["version"] == "1.0.0"
+        print("✅ Ни исходный файл, ни кодовая карта не перезаписаны")
+
+        # Тест 2: Изменяются только отличающиеся блоки, хэш сохраняется в карте
+        print("\nТест 2: Хэш после обновления")
+        changed = manager.replace_blocks({"init_data": "DATA = 2", "init": "def init():\n    return DATA"})
+        assert changed == {source: ["init_data"]}
+        assert manager.get_block_info("init")["version"] == "1.0.0"
+        assert CodeBlockManager(code_map_path).get_block_info("init_data")["content_hash"] == block_hash("DATA = 2\n")
+        print("✅ Версия и хэш обновлены только у измененного блока")
+
+        # Тест 3: Поиск блоков, измененных в обход карты
+        print("\nТест 3: Расхождения с кодовой картой")
+        assert set(manager.find_drifted_blocks()) == {"service", "init"}
+        assert manager.record_content_hashes() == ["service", "init"]
+        assert manager.find_drifted_blocks() == {}
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+        with open(source, "w", encoding="utf-8") as f:
+            f.write(text.replace("return DATA", "return DATA + 1"))
+        drifted = manager.find_drifted_blocks(max_workers=2)
+        assert drifted == {"service": "Block content differs from code map", "init": "Block content differs from code map"}
+        print("✅ Найдены блоки, измененные вручную")
+
+    print("\n✅ Хэши кода блоков работают корректно!")
+
+def test_code_map_sqlite_store():
+    print("Тестирование SQLite хранилища кодовой карты...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, code_map_path = make_project(directory)
+        db_path = os.path.join(directory, "code_map.db")
+        with open(code_map_path, encoding="utf-8") as f:
+            original = json.load(f)
+
+        # Тест 1: Импорт из JSON и экспорт обратно без потерь
+        print("\nТест 1: JSON -> SQLite -> JSON")
+        convert_code_map(code_map_path, db_path)
+        exported_path = os.path.join(directory, "exported.json")
+        convert_code_map(db_path, exported_path)
+        with open(exported_path, encoding="utf-8") as f:
+            exported = json.load(f)
+        assert exported == original
+        assert list(exported) == list(original)
+        assert list(exported["layers"]["core"]["modules"]) == ["service", "init"]
+        print("✅ Порядок слоев, блоков и метаданные сохранены")
+
+        # Тест 2: Запросы по индексам
+        print("\nТест 2: Поиск по ID, тегу, файлу и зависимости")
+        manager = CodeBlockManager(db_path)
+        assert isinstance(manager.store, SqliteCodeMapStore)
+        assert manager.get_block_layer("init_data") == "data"
+        assert manager.find_block_by_tag("init") == "init"
+        assert manager.find_block_by_tag("missing") is None
+        assert manager.get_file_blocks(source) == ["service", "init", "init_data"]
+        assert manager.get_dependent_blocks("init_data") == ["init"]
+        assert manager.get_block_content("init_data") == "DATA = 1"
+        print("✅ Блоки находятся запросами к таблицам")
+
+        # Тест 3: Изменения пишутся построчно и видны новому менеджеру
+        print("\nТест 3: Обновление и создание блоков")
+        manager.replace_blocks({"init_data": "DATA = 5"})
+        manager.create_new_block("extra", source, "# AGORA_BLOCK: start:extra", "# AGORA_BLOCK: end:extra",
+                                 "extra", "data", dependencies=["init_data"])
+        manager.close()
+        with CodeBlockManager(db_path) as other:
+            assert other.get_block_info("init_data")["version"] == "1.0.1"
+            assert other.get_block_content("init_data") == "DATA = 5"
+            assert other.get_dependent_blocks("init_data") == ["extra", "init"]
+            assert list(other.code_map["layers"]["data"]["modules"]) == ["init_data", "extra"]
+            results = other.validate_all_blocks()
+            assert list(results) == ["service", "init", "init_data", "extra"]
+            assert not results["extra"]["valid"]
+        try:
+            other.find_block_by_tag("init")
+            assert False, "соединение должно быть закрыто"
+        except sqlite3.ProgrammingError:
+            pass
+        print("✅ Новый менеджер видит сохраненные изменения, соединение закрыто")
+
+        # Тест 4: code_map - копия только для чтения в обоих хранилищах
+        print("\nТест 4: Изменение code_map не влияет на хранилище")
+        for path in (code_map_path, db_path):
+            with CodeBlockManager(path) as reader:
+                snapshot = reader.code_map
+                snapshot["layers"]["data"]["modules"]["init_data"]["version"] = "9.9.9"
+                del snapshot["layers"]["core"]
+                assert reader.get_block_info("init_data")["version"] != "9.9.9"
+                assert reader.code_map["layers"]["core"]
+        print("✅ Изменения копии не попадают в кодовую карту")
+
+    print("\n✅ SQLite хранилище работает корректно!")
+
+if __name__ == "__main__":
+    test_code_block_manager_indexes()
+    test_code_block_manager_batch_replace()
+    test_code_block_manager_validation()
+    test_code_block_manager_content_hash()
+    test_code_map_sqlite_store()
@@ -1,8 +1,13 @@
+import json
 import sys
 import os
+import tempfile
+import time
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from src.infrastructure.error.errorHandler import ErrorHandler
+from src.infrastructure.error.errorHandler import ErrorFingerprints, ErrorHandler
+from src.infrastructure.monitoring.eventLogger import EventLogger, EventSampler
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
 
 def test_error_handler():
     print("Тестирование ErrorHandler...")
@@ -40,6 +45,76 @@ def test_error_handler():
         except Exception as e:
             error_info = ErrorHandler.handle_error(e, f"test_{i}")
             print(f"✅ {type(e).__name__}: {error_info['error_type']}")
+    
+    # Тест 4: Повторы одной и той же ошибки
+    print("\nТест 4: Дедупликация повторов")
+    infos = []
+    for _ in range(3):
+        try:
+            raise ConnectionError("Повторяющаяся ошибка")
+        except Exception as e:
+            infos.append(ErrorHandler.handle_error(e, "repeat_test"))
+    assert len({info['fingerprint'] for info in infos}) == 1
+    assert infos[0]['traceback'] is not None
+    assert infos[1]['traceback'] is None and infos[2]['traceback'] is None
+    assert infos[2]['occurrences'] == infos[0]['occurrences'] + 2
+    print(f"✅ Отпечаток {infos[0]['fingerprint']}: traceback только у первой ошибки")
+    
+    try:
+        raise ConnectionError("Та же ошибка в другом месте")
+    except Exception as e:
+        other = ErrorHandler.handle_error(e, "repeat_test")
+    assert other['fingerprint'] != infos[0]['fingerprint']
+    print("✅ Ошибка из другого места получила другой отпечаток")
+    
+    summaries = ErrorHandler.fingerprints.flush(force=True)
+    assert any(s['fingerprint'] == infos[0]['fingerprint'] and s['repeated'] == 2 for s in summaries)
+    print("✅ Сводка о 2 подавленных повторах сформирована")
+    
+    # Тест 5: Сводки пишутся по таймеру, даже если повторы прекратились
+    print("\nТест 5: Периодические сводки")
+    fingerprints = ErrorHandler.fingerprints
+    log_summaries = ErrorHandler._log_summaries
+    written = []
+    ErrorHandler.fingerprints = ErrorFingerprints(window=0.05)
+    ErrorHandler._log_summaries = staticmethod(written.extend)
+    try:
+        for _ in range(3):
+            try:
+                raise TimeoutError("Короткая серия ошибок")
+            except Exception as e:
+                ErrorHandler.handle_error(e, "burst_test")
+        assert written == []
+        ErrorHandler.start_summary_timer(interval=0.02)
+        deadline = time.monotonic() + 2
+        while not written and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ErrorHandler.stop_summary_timer()
+    finally:
+        ErrorHandler.fingerprints = fingerprints
+        ErrorHandler._log_summaries = log_summaries
+    assert [(s['context'], s['repeated']) for s in written] == [("burst_test", 2)]
+    print("✅ Сводка о серии записана без новых ошибок")
+    
+    # Тест 6: Ошибка пишется в журнал без lifespan приложения
+    print("\nТест 6: Журнал без запуска приложения")
+    monitoring = get_monitoring_service()
+    event_logger = monitoring.event_logger
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        monitoring.event_logger = EventLogger(path=path, sampler=EventSampler())
+        try:
+            try:
+                raise KeyError("Ошибка в скрипте")
+            except Exception as e:
+                ErrorHandler.handle_error(e, "cli_test")
+        finally:
+            monitoring.event_logger.stop()
+            monitoring.event_logger = event_logger
+        with open(path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+    assert [(entry["event"], entry["data"]["context"]) for entry in entries] == [("error.occurred", "cli_test")]
+    print("✅ Ошибка записана в журнал")
 
 if __name__ == "__main__":
     test_error_handler()
\ No newline at end of file
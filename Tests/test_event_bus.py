@@ -0,0 +1,167 @@
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.events.eventBus import BLOCK, DROP_NEW, EventBus, get_event_bus
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+class RecordingMetrics:
+    """Метрики шины в памяти"""
+
+    def __init__(self):
+        self.published = []
+        self.delivered = []
+        self.dropped = []
+
+    def track_event_published(self, topic):
+        self.published.append(topic)
+
+    def track_event_delivered(self, topic, lag):
+        self.delivered.append((topic, lag))
+
+    def track_event_dropped(self, topic, subscriber, reason):
+        self.dropped.append((topic, subscriber, reason))
+
+    def track_event_queue_depth(self, subscriber, depth):
+        pass
+
+async def run_event_bus_checks():
+    metrics = RecordingMetrics()
+    bus = EventBus(metrics=metrics)
+    received = []
+    batches = []
+
+    async def on_auth(event):
+        received.append((event.topic, event.data))
+
+    bus.subscribe("auth.*", on_auth, name="auth")
+    bus.subscribe_batch("match.found", batches.append, name="matches", max_batch=10, max_wait=0.05)
+
+    # Тест 1: Доставка по шаблону темы и пачками
+    print("\nТест 1: Подписка по шаблону и пачки")
+    bus.start()
+    assert bus.publish_nowait("auth.success", {"user": 1}) == 1
+    assert bus.publish_nowait("auth.failed", {"user": 2}) == 1
+    assert bus.publish_nowait("profile.created", {}) == 0
+    for i in range(25):
+        bus.publish_nowait("match.found", {"id": i})
+    await asyncio.sleep(0.2)
+    assert received == [("auth.success", {"user": 1}), ("auth.failed", {"user": 2})]
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [event.data["id"] for batch in batches for event in batch] == list(range(25))
+    assert len(metrics.delivered) == 27 and all(lag >= 0 for _, lag in metrics.delivered)
+    assert bus.stats()["published"] == {"auth.success": 1, "auth.failed": 1, "profile.created": 1, "match.found": 25}
+    print("✅ События доставлены по шаблону, пачки не больше max_batch")
+
+    # Тест 2: Типизированные темы
+    print("\nТест 2: Тип данных темы")
+    matched = bus.topic("match.found", dict)
+    try:
+        bus.publish_nowait(matched, "не словарь")
+        assert False, "ожидалась ошибка"
+    except TypeError as e:
+        print(f"   {e}")
+    print("✅ Данные неверного типа отклонены")
+
+    # Тест 3: Переполнение очередей медленных подписчиков
+    print("\nТест 3: Политики переполнения")
+    gate = asyncio.Event()
+    slow = []
+
+    async def slow_handler(event):
+        await gate.wait()
+        slow.append(event.data)
+
+    bus.subscribe("load.*", slow_handler, name="oldest", queue_size=2)
+    bus.subscribe("load.*", lambda event: None, name="newest", queue_size=2, policy=DROP_NEW)
+    await asyncio.sleep(0)
+    for i in range(6):
+        bus.publish_nowait("load.tick", i)
+    gate.set()
+    await asyncio.sleep(0.05)
+    # В очередях по два события: последние у drop_oldest, первые у drop_new
+    assert slow == [4, 5], slow
+    stats = bus.stats()["subscribers"]
+    assert stats["oldest"]["dropped"] == 4
+    assert stats["newest"]["dropped"] == 4 and stats["newest"]["delivered"] == 2
+    assert ("load.tick", "oldest", "overflow") in metrics.dropped
+    assert ("load.tick", "newest", "full") in metrics.dropped
+    print("✅ drop_oldest хранит новые события, drop_new - старые")
+
+    # Тест 4: Обратное давление и публикация из другого потока
+    print("\nТест 4: Обратное давление")
+    release = asyncio.Event()
+    blocked = []
+
+    async def blocked_handler(event):
+        await release.wait()
+        blocked.append(event.data)
+
+    bus.subscribe("audit.*", blocked_handler, name="audit", queue_size=1, policy=BLOCK)
+    await bus.publish("audit.completed", 1)
+    await bus.publish("audit.completed", 2)
+    waiting = asyncio.create_task(bus.publish("audit.completed", 3))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    release.set()
+    await asyncio.wait_for(waiting, 1)
+    await asyncio.get_running_loop().run_in_executor(None, bus.publish_nowait, "audit.completed", 4)
+    await bus.stop()
+    assert blocked == [1, 2, 3, 4]
+    print("✅ publish() ждет места в очереди, события из потоков доставлены")
+
+def test_event_bus():
+    print("Тестирование шины событий...")
+    asyncio.run(run_event_bus_checks())
+
+    # Тест 5: log_event публикует событие в шину
+    print("\nТест 5: Интеграция с MonitoringService")
+    bus = get_event_bus()
+    events = []
+    bus.subscribe("test.bus.*", events.append, name="test_log_event")
+    try:
+        get_monitoring_service().log_event("test.bus.logged", {"ok": True})
+        # До запуска шины событие ждет в очереди подписчика
+        assert events == []
+        assert bus.subscriptions["test_log_event"].queue.qsize() == 1
+
+        async def deliver():
+            bus.start()
+            await bus.stop()
+        asyncio.run(deliver())
+        assert [(event.topic, event.data) for event in events] == [("test.bus.logged", {"ok": True})]
+    finally:
+        bus.unsubscribe("test_log_event")
+    print("✅ События журнала доступны подписчикам шины")
+
+    # Тест 6: Шина переживает несколько циклов событий
+    print("\nТест 6: Повторный запуск в новом цикле")
+    bus = EventBus()
+    delivered = []
+    bus.subscribe("cycle.*", delivered.append, name="cycle")
+
+    async def cycle(value):
+        bus.start()
+        await asyncio.sleep(0)
+        bus.publish_nowait("cycle.tick", value)
+        await bus.stop()
+
+    for value in range(3):
+        asyncio.run(cycle(value))
+    # Событие, опубликованное между циклами, доставляется в следующем
+    bus.publish_nowait("cycle.tick", 3)
+    asyncio.run(cycle(4))
+    assert [event.data for event in delivered] == [0, 1, 2, 3, 4]
+    print("✅ События доставлены в каждом из циклов")
+
+    # Тест 7: log_event не падает на данных неверного типа
+    print("\nТест 7: Типизированная тема и log_event")
+    get_event_bus().topic("test.typed", dict)
+    get_monitoring_service().log_event("test.typed", ["не словарь"])
+    print("✅ Ошибка типа залогирована, вызывающий продолжил работу")
+
+    print("\n✅ Шина событий работает корректно!")
+
+if __name__ == "__main__":
+    test_event_bus()
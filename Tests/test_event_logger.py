@@ -0,0 +1,58 @@
+import json
+import logging
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.monitoring.eventLogger import EventLogger, EventSampler
+
+def test_event_logger():
+    print("Тестирование EventLogger...")
+    dropped = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "logs", "events.jsonl")
+        sampler = EventSampler(sample_rates={"noise": 0.0}, burst_limits={"auth.success": 5})
+        event_logger = EventLogger(path=path, sampler=sampler, queue_size=100,
+                                   on_drop=lambda name, reason: dropped.append((name, reason)))
+
+        # Тест 1: Слушатель запускается при первой записи
+        print("\nТест 1: Запись без явного start()")
+        for i in range(10):
+            event_logger.emit("auth.success", {"user_id": i})
+        event_logger.emit("noise", {"value": 1})
+        assert event_logger._listener is not None
+        print("✅ Слушатель запущен первой записью")
+
+        # Тест 2: Лимит всплеска и выборка
+        print("\nТест 2: Лимит всплеска и выборка")
+        assert dropped.count(("auth.success", "burst")) == 5
+        assert ("noise", "sampled") in dropped
+        print("✅ Лишние события отброшены с указанием причины")
+
+        # Тест 3: Фоновая запись JSON-строк
+        print("\nТест 3: Запись JSON-строк")
+        event_logger.start()
+        event_logger.emit("error.occurred", {"error_type": "ValueError"}, level=logging.ERROR)
+        event_logger.stop()
+        with open(path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        assert [entry["event"] for entry in entries] == ["auth.success"] * 5 + ["error.occurred"]
+        assert entries[0]["data"] == {"user_id": 0}
+        assert entries[-1]["level"] == "ERROR"
+        print(f"✅ Записано {len(entries)} событий")
+
+        # Тест 4: Переполнение очереди не блокирует вызывающего
+        print("\nТест 4: Переполнение очереди")
+        small_logger = EventLogger(path=path, sampler=EventSampler(), queue_size=2,
+                                   on_drop=lambda name, reason: dropped.append((name, reason)))
+        # Слушатель пишет на диск медленнее, чем события ставятся в очередь
+        for i in range(1000):
+            small_logger.emit("match.found", {"i": i})
+        small_logger.stop()
+        assert ("match.found", "queue_full") in dropped
+        print("✅ Лишнее событие отброшено")
+
+if __name__ == "__main__":
+    test_event_logger()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.code_utils import CodeBlockManager
+from src.utils.git_integration import CommitQueue, GitIntegration
+from test_code_block_manager import make_project
+
+def git(*args):
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+
+def test_git_integration_scoped_commits():
+    print("Тестирование коммитов только измененных файлов...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            git("init", "-q")
+            git("config", "user.email", "test@example.com")
+            git("config", "user.name", "test")
+            source, code_map_path = make_project(directory)
+            with open("notes.txt", "w", encoding="utf-8") as f:
+                f.write("черновик\n")
+            git("add", ".")
+            git("commit", "-q", "-m", "initial")
+
+            # Тест 1: Коммит затрагивает только файлы блока и кодовую карту
+            print("\nТест 1: Коммит по путям")
+            with open("notes.txt", "a", encoding="utf-8") as f:
+                f.write("правка\n")
+            git("add", "notes.txt")
+            manager = CodeBlockManager(code_map_path)
+            manager.replace_block("init_data", "DATA = 2")
+            assert manager.modified_paths == {source, code_map_path}
+            GitIntegration.timings.clear()
+            result = GitIntegration.commit_changes("init_data", paths=manager.modified_paths)
+            assert result.startswith("Changes committed"), result
+            assert sorted(git("show", "--name-only", "--format=", "HEAD").split()) == ["code_map.json", "service.py"]
+            assert git("diff", "--cached", "--name-only").split() == ["notes.txt"]
+            assert [command for command, _ in GitIntegration.timings] == ["add", "commit"]
+            print("✅ Чужие staged изменения не попали в коммит, время вызовов записано")
+
+            # Тест 2: Несколько обновлений - один коммит
+            print("\nТест 2: Очередь коммитов")
+            commits_before = int(git("rev-list", "--count", "HEAD"))
+            with CommitQueue() as queue:
+                for block_id, code in (("init_data", "DATA = 3"), ("init", "def init():\n    return 3")):
+                    manager.replace_block(block_id, code)
+                    queue.add([block_id], manager.modified_paths)
+                assert len(queue) == 2
+            assert int(git("rev-list", "--count", "HEAD")) == commits_before + 1
+            assert git("log", "-1", "--format=%s") == "AI update: Modified block 'init_data, init'\n"
+            assert queue.flush() is None
+            print("✅ Два обновления закоммичены одним коммитом")
+
+            # Тест 3: Неудачный коммит не очищает очередь
+            print("\nТест 3: Ошибка коммита")
+            hook = os.path.join(".git", "hooks", "pre-commit")
+            with open(hook, "w", encoding="utf-8") as f:
+                f.write("#!/bin/sh\nexit 1\n")
+            os.chmod(hook, 0o755)
+            manager.replace_block("init_data", "DATA = 4")
+            queue = CommitQueue()
+            queue.add(["init_data"], manager.modified_paths)
+            assert queue.flush().startswith("Git commit failed")
+            assert queue.block_ids == ["init_data"] and queue.paths == manager.modified_paths
+            os.remove(hook)
+            assert queue.flush().startswith("Changes committed")
+            assert len(queue) == 0 and not queue.paths
+            assert git("status", "--porcelain", "--", *manager.modified_paths) == ""
+            print("✅ Очередь сохранена до успешного коммита")
+        finally:
+            os.chdir(cwd)
+
+    print("\n✅ Интеграция с Git работает корректно!")
+
+if __name__ == "__main__":
+    test_git_integration_scoped_commits()
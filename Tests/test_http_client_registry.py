@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx
+from src.infrastructure.http.httpClientRegistry import HttpClientRegistry, InstrumentedTransport
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+from telegram_fixtures import FakeTelegramServer
+
+def sample(name, labels):
+    metric = getattr(get_monitoring_service(), name)
+    for family in metric.collect():
+        for item in family.samples:
+            if all(item.labels.get(key) == value for key, value in labels.items()) and item.name.endswith(("_total", "_count")):
+                return item.value
+    return 0.0
+
+async def run_registry_checks():
+    server = FakeTelegramServer()
+    await server.start()
+    registry = HttpClientRegistry()
+    registry.register("fake_api", base_url=server.url, timeout=2.0, max_connections=4, max_keepalive_connections=2, http2=True)
+    registry.start()
+    try:
+        # Тест 1: Последовательные запросы переиспользуют соединение
+        print("\nТест 1: Keep-alive")
+        client = registry.get("fake_api")
+        assert registry.get("fake_api") is client
+        opened_before = sample("http_connections_opened", {"client": "fake_api"})
+        waits_before = sample("http_pool_wait", {"client": "fake_api"})
+        for i in range(5):
+            response = await client.post("/botTEST/getMe", json={})
+            assert response.status_code == 200
+        assert sample("http_connections_opened", {"client": "fake_api"}) - opened_before == 1
+        assert sample("http_pool_wait", {"client": "fake_api"}) - waits_before == 5
+        print("✅ 5 запросов через одно соединение, ожидание пула учтено")
+
+        # Тест 2: Параллельные запросы ограничены max_connections
+        print("\nТест 2: Лимит соединений")
+        await asyncio.gather(*[client.post("/botTEST/getMe", json={}) for _ in range(10)])
+        stats = registry.stats()["fake_api"]
+        assert stats["active"] + stats["idle"] <= 4
+        assert stats["max"] == 4
+        print(f"✅ Пул: {stats}")
+
+        # Тест 3: Закрытие и повторное открытие
+        print("\nТест 3: Закрытие клиентов")
+        await registry.close()
+        assert client.is_closed
+        reopened = registry.get("fake_api")
+        assert reopened is not client and not reopened.is_closed
+        assert (await reopened.post("/botTEST/getMe", json={})).status_code == 200
+        print("✅ После close() клиент открывается заново с теми же настройками")
+
+        # Тест 4: Удаление клиента из реестра
+        print("\nТест 4: unregister")
+        await registry.unregister("fake_api")
+        assert reopened.is_closed
+        assert not registry.is_registered("fake_api") and "fake_api" not in registry.stats()
+        print("✅ Клиент закрыт, настройки удалены")
+
+        # Тест 5: Транспорт без внутреннего пула httpx
+        print("\nТест 5: Транспорт без пула")
+        transport = InstrumentedTransport("mock_api", httpx.MockTransport(lambda request: httpx.Response(200)), 4)
+        assert transport.pool_stats() == {}
+        async with httpx.AsyncClient(transport=transport) as mock_client:
+            assert (await mock_client.get("http://mock/")).status_code == 200
+        print("✅ Без пула статистика не собирается, запросы проходят")
+    finally:
+        await registry.close()
+        await server.stop()
+
+def test_http_client_registry():
+    print("Тестирование реестра HTTP клиентов...")
+    asyncio.run(run_registry_checks())
+    print("\n✅ Реестр HTTP клиентов работает корректно!")
+
+if __name__ == "__main__":
+    test_http_client_registry()
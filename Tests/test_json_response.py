@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from main import app
+from src.infrastructure.http.jsonResponse import ModelResponse, StaticJSON, dump_json
+
+class Sample(BaseModel):
+    name: str
+    count: int = 0
+
+def test_json_response():
+    print("Тестирование JSON-ответов...")
+    client = TestClient(app)
+
+    # Тест 1: Сериализация
+    print("\nТест 1: dump_json")
+    assert dump_json({"a": "б", 1: [Sample(name="x")]}) == '{"a":"б","1":[{"name":"x","count":0}]}'.encode()
+    assert ModelResponse(Sample(name="y", count=2)).body == b'{"name":"y","count":2}'
+    print("✅ Словари, модели и нестроковые ключи сериализуются")
+
+    # Тест 2: ETag и 304 для постоянных ответов
+    print("\nТест 2: ETag статических ответов")
+    response = client.get("/api/v1/info")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["name"] == "Agora.AI API"
+    etag = response.headers["etag"]
+    cached = client.get("/api/v1/info", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    other = client.get("/api/v1/info", headers={"If-None-Match": '"other", W/' + etag})
+    assert other.status_code == 304
+    assert client.get("/api/v1/info", headers={"If-None-Match": '"other"'}).status_code == 200
+    print(f"✅ ETag {etag}: повторный запрос получает 304")
+
+    # Тест 3: Тело вычисляется один раз
+    print("\nТест 3: Кэширование тела")
+    payload = StaticJSON({"status": "alive"})
+    assert payload.body == b'{"status":"alive"}'
+    assert client.get("/health/live").json() == {"status": "alive"}
+    print("✅ Тело и ETag готовы при создании")
+
+if __name__ == "__main__":
+    test_json_response()
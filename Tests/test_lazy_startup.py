@@ -0,0 +1,42 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = """
+import sys
+sys.path.insert(0, {root!r})
+import main
+from src.infrastructure.monitoring import monitoringService
+from src.integrations.telegram import telegramIntegration
+assert monitoringService._monitoring_service is None, "monitoring service created on import"
+assert telegramIntegration._telegram_integration is None, "telegram integration created on import"
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/health/live").status_code == 200
+    assert monitoringService._monitoring_service is not None
+    assert telegramIntegration._telegram_integration is not None
+assert telegramIntegration._telegram_integration is None, "telegram integration not closed"
+print("ok")
+"""
+
+def test_lazy_startup():
+    print("Тестирование ленивого создания сервисов...")
+
+    # Тест 1: Импорт main без побочных эффектов, сервисы принадлежат lifespan
+    print("\nТест 1: Импорт main и lifespan")
+    env = dict(os.environ, AGORA_EVENT_LOG=os.devnull, AGORA_METRICS_PORT="0")
+    env.setdefault("TELEGRAM_BOT_TOKEN", "123456:TEST")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=ROOT)],
+        env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
+    print("✅ Сервисы создаются в lifespan и закрываются при остановке")
+
+if __name__ == "__main__":
+    test_lazy_startup()
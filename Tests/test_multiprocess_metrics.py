@@ -0,0 +1,66 @@
+import sys
+import os
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.monitoring.metricsRegistry import create_export_registry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Воркер: пишет метрики в файлы каталога PROMETHEUS_MULTIPROC_DIR
+WORKER = """
+import sys
+sys.path.insert(0, {root!r})
+from src.infrastructure.monitoring.monitoringService import monitoring_service as service
+for _ in range({requests}):
+    service.increment_api_requests("/api/v1/metrics", "GET", 200)
+service.track_cache_size("telegram_user_info", {requests})
+"""
+
+def run_worker(directory, requests, dead=False):
+    code = WORKER.format(root=ROOT, requests=requests)
+    if dead:
+        code += "service.mark_process_dead()\n"
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory, AGORA_EVENT_LOG="-")
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+def sample_value(registry, name, labels):
+    value = registry.get_sample_value(name, labels)
+    return value or 0.0
+
+def test_multiprocess_metrics():
+    print("Тестирование многопроцессных метрик...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        previous = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+        try:
+            # Тест 1: Счетчики воркеров суммируются
+            print("\nТест 1: Агрегация счетчиков нескольких воркеров")
+            run_worker(directory, 3)
+            run_worker(directory, 4)
+            registry = create_export_registry()
+            labels = {"endpoint": "/api/v1/metrics", "method": "GET", "status": "200"}
+            assert sample_value(registry, "agora_api_requests_total", labels) == 7
+            print("✅ agora_api_requests_total = 3 + 4")
+
+            # Тест 2: Live-значения Gauge остановленного воркера не учитываются
+            print("\nТест 2: mark_process_dead")
+            run_worker(directory, 5, dead=True)
+            registry = create_export_registry()
+            assert sample_value(registry, "agora_api_requests_total", labels) == 12
+            cache_size = sample_value(registry, "agora_cache_entries", {"cache": "telegram_user_info"})
+            assert cache_size == 7, cache_size
+            print(f"✅ agora_cache_entries = {cache_size:.0f} (без остановленного воркера)")
+        finally:
+            if previous is None:
+                os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+            else:
+                os.environ["PROMETHEUS_MULTIPROC_DIR"] = previous
+
+    print("\n✅ Многопроцессные метрики работают корректно!")
+
+if __name__ == "__main__":
+    test_multiprocess_metrics()
@@ -0,0 +1,118 @@
+import asyncio
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx
+from src.infrastructure.health.probeRegistry import ProbeRegistry
+from src.infrastructure.http.httpClientRegistry import get_http_client_registry
+from src.integrations.telegram.telegramIntegration import TELEGRAM_HTTP_CLIENT, TelegramIntegration
+from telegram_fixtures import FakeTelegramServer
+
+async def run_probe_checks():
+    registry = ProbeRegistry()
+    calls = {"db": 0}
+    healthy = {"db": True}
+
+    async def check_db():
+        calls["db"] += 1
+        if not healthy["db"]:
+            raise ConnectionError("connection refused")
+        return "ok"
+
+    async def check_slow():
+        await asyncio.sleep(1)
+
+    async def check_optional():
+        raise RuntimeError("down")
+
+    registry.register("db", check_db, interval=0.05, timeout=0.5)
+    registry.register("slow", check_slow, interval=10.0, timeout=0.05, critical=False)
+    registry.register("optional", check_optional, interval=10.0, critical=False)
+
+    # Тест 1: До первых результатов сервис не готов
+    print("\nТест 1: Проверки в ожидании")
+    assert registry.snapshot()["status"] == "not_ready"
+    assert registry.snapshot()["checks"]["db"]["status"] == "pending"
+    print("✅ До первой проверки статус not_ready")
+
+    # Тест 2: Результаты обновляются в фоне, некритичные сбои не снимают готовность
+    print("\nТест 2: Фоновое обновление")
+    registry.start()
+    await asyncio.sleep(0.2)
+    snapshot = registry.snapshot()
+    assert snapshot["status"] == "ready", snapshot
+    assert snapshot["checks"]["slow"]["detail"].startswith("timeout")
+    assert snapshot["checks"]["optional"]["status"] == "fail"
+    assert calls["db"] >= 2
+    assert snapshot["checks"]["db"]["age_seconds"] < 0.1
+    print(f"✅ db проверена {calls['db']} раз, некритичные сбои учтены")
+
+    # Тест 3: Сбой критичной зависимости и дешевое чтение результатов
+    print("\nТест 3: Сбой критичной зависимости")
+    healthy["db"] = False
+    await asyncio.sleep(0.15)
+    snapshot = registry.snapshot()
+    assert snapshot["status"] == "not_ready"
+    assert "connection refused" in snapshot["checks"]["db"]["detail"]
+    started = time.perf_counter()
+    for _ in range(1000):
+        registry.snapshot()
+    per_call = (time.perf_counter() - started) / 1000
+    assert per_call < 0.001
+    print(f"✅ not_ready; snapshot() за {per_call * 1e6:.1f} мкс")
+
+    await registry.stop()
+    count = calls["db"]
+    await asyncio.sleep(0.1)
+    assert calls["db"] == count
+    print("✅ После stop() проверки не выполняются")
+
+async def run_telegram_ping_checks():
+    server = FakeTelegramServer()
+    await server.start()
+    http_clients = get_http_client_registry()
+    registered = http_clients.is_registered(TELEGRAM_HTTP_CLIENT)
+    previous_token = os.environ.get("TELEGRAM_BOT_TOKEN")
+    os.environ["TELEGRAM_BOT_TOKEN"] = "123456:TEST"
+    try:
+        integration = TelegramIntegration()
+    finally:
+        if previous_token is None:
+            os.environ.pop("TELEGRAM_BOT_TOKEN", None)
+        else:
+            os.environ["TELEGRAM_BOT_TOKEN"] = previous_token
+    integration.api_url = server.url
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        integration.http_client = client
+        try:
+            # Тест 4: Проверка Telegram через getMe
+            print("\nТест 4: Проверка telegram_api")
+            assert await integration.ping() == "@fake_bot"
+            server.failures["getMe"] = (401, "Unauthorized")
+            registry = ProbeRegistry()
+            registry.register("telegram_api", integration.ping, interval=10.0, critical=False)
+            registry.start()
+            await asyncio.sleep(0.1)
+            await registry.stop()
+            check = registry.snapshot()["checks"]["telegram_api"]
+            assert check["status"] == "fail"
+            assert "getMe: 401 Unauthorized" in check["detail"], check
+            print(f"✅ Ошибка Telegram в результате проверки: {check['detail']}")
+        finally:
+            await integration.close()
+            # Клиент, открытый интеграцией в общем реестре, не переживает тест
+            if not registered:
+                await http_clients.unregister(TELEGRAM_HTTP_CLIENT)
+            await server.stop()
+    assert http_clients.is_registered(TELEGRAM_HTTP_CLIENT) == registered
+
+def test_probe_registry():
+    print("Тестирование фоновых проверок готовности...")
+    asyncio.run(run_probe_checks())
+    asyncio.run(run_telegram_ping_checks())
+    print("\n✅ Фоновые проверки работают корректно!")
+
+if __name__ == "__main__":
+    test_probe_registry()
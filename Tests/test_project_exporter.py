@@ -0,0 +1,133 @@
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.project_snapshot import SEGMENT_SIZE, SnapshotReader
+from src.utils.project_structure_exporter import BINARY_MARKER, ProjectStructureExporter
+
+def make_project(directory):
+    """Временный проект: текстовые файлы, бинарный файл и пропускаемая директория"""
+    os.makedirs(os.path.join(directory, "src", "pkg"))
+    os.makedirs(os.path.join(directory, "__pycache__"))
+    files = {
+        os.path.join("src", "pkg", "module.py"): "def run():\n    return 'привет'\n",
+        os.path.join("src", "main.py"): "import pkg\r\nprint(1)",
+        "readme.md": "# Проект\n",
+        "data.txt": "a\0b",
+        "image.png": "png",
+        os.path.join("__pycache__", "main.pyc"): "cache",
+    }
+    for relative_path, content in files.items():
+        with open(os.path.join(directory, relative_path), "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+
+def test_project_exporter_text():
+    print("Тестирование текстового экспорта проекта...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_project(directory)
+        output = os.path.join(directory, "project_structure.txt")
+        exporter = ProjectStructureExporter(directory, output, max_workers=2)
+
+        # Тест 1: Иерархия и содержимое за один проход
+        print("\nТест 1: Структура и содержимое")
+        structure, files = exporter.scan()
+        assert structure == ["├── src/", "│   ├── pkg/", "│   │   └── module.py", "│   └── main.py",
+                             "├── data.txt", "├── image.png", "└── readme.md"]
+        exporter.export_project()
+        with open(output, encoding="utf-8") as f:
+            text = f.read()
+        assert "def run():\n    return 'привет'\n" in text
+        assert "import pkg\nprint(1)\n" in text
+        assert text.count(BINARY_MARKER) == 2
+        assert "main.pyc" not in text and "ФАЙЛ: project_structure.txt" not in text
+        print("✅ Бинарные файлы определены, переводы строк нормализованы")
+
+        # Тест 2: Неизмененные файлы берутся из прошлого экспорта
+        print("\nТест 2: Повторный экспорт по манифесту")
+        read = []
+        original_read = exporter._read_text
+        exporter._read_text = lambda path: read.append(os.path.basename(path)) or original_read(path)
+        exporter.export_project()
+        assert read == []
+        module_path = os.path.join(directory, "src", "pkg", "module.py")
+        with open(module_path, "a", encoding="utf-8") as f:
+            f.write("# изменение\n")
+        exporter.export_project()
+        assert read == ["module.py"]
+        with open(output, encoding="utf-8") as f:
+            second = f.read()
+        assert second.split("СОДЕРЖИМОЕ ФАЙЛОВ:")[1] == text.split("СОДЕРЖИМОЕ ФАЙЛОВ:")[1].replace(
+            "return 'привет'\n", "return 'привет'\n# изменение\n")
+        print("✅ Перечитан только измененный файл")
+
+        # Тест 3: Измененный вручную результат не используется как кэш
+        print("\nТест 3: Проверка результата перед повторным использованием")
+        with open(output, "a", encoding="utf-8") as f:
+            f.write("\n")
+        read.clear()
+        exporter.export_project()
+        assert sorted(read) == ["data.txt", "main.py", "module.py", "readme.md"]
+        print("✅ После изменения результата все файлы перечитаны")
+
+    print("\n✅ Текстовый экспорт работает корректно!")
+
+def test_project_exporter_snapshot():
+    print("Тестирование экспорта в снимок с произвольным доступом...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_project(directory)
+        large = "".join(f"line {i} {'ж' * 30}\n" for i in range(5000))
+        with open(os.path.join(directory, "large.txt"), "w", encoding="utf-8") as f:
+            f.write(large)
+        output = os.path.join(directory, "project.snap")
+        exporter = ProjectStructureExporter(directory, output, output_format="snapshot")
+        exporter.export_project()
+
+        # Тест 1: Извлечение отдельных файлов по индексу
+        print("\nТест 1: Чтение файлов из снимка")
+        with SnapshotReader(output) as reader:
+            assert reader.metadata["structure"][0] == "├── src/"
+            assert reader.read_file(os.path.join("src", "pkg", "module.py")) == "def run():\n    return 'привет'\n"
+            assert reader.read_file(os.path.join("src", "main.py")) == "import pkg\nprint(1)"
+            assert reader.entry("image.png")["binary"]
+            assert len(reader.entry("large.txt")["segments"]) > 1
+            assert reader.read_file("large.txt") == large
+            try:
+                reader.read_file("data.txt")
+                assert False, "ожидалась ошибка"
+            except ValueError:
+                pass
+        print("✅ Файлы извлекаются без распаковки остальных")
+
+        # Тест 2: Чанки с бюджетом токенов по границам строк
+        print("\nТест 2: Чанки с бюджетом токенов")
+        with SnapshotReader(output) as reader:
+            chunks = list(reader.iter_chunks("large.txt", max_tokens=100))
+            assert "".join(chunks) == large
+            assert all(len(chunk) <= 400 for chunk in chunks)
+            assert all(chunk.endswith("\n") for chunk in chunks)
+            first = next(reader.iter_chunks("large.txt", max_tokens=SEGMENT_SIZE))
+            assert large.startswith(first)
+        print(f"✅ {len(chunks)} чанков, строки не разрезаны")
+
+        # Тест 3: Неизмененные файлы копируются сжатыми из прошлого снимка
+        print("\nТест 3: Повторный экспорт снимка")
+        with open(os.path.join(directory, "readme.md"), "w", encoding="utf-8") as f:
+            f.write("# Новый проект\n")
+        read = []
+        original_read = exporter._read_text
+        exporter._read_text = lambda path: read.append(os.path.basename(path)) or original_read(path)
+        exporter.export_project()
+        assert read == ["readme.md"]
+        with SnapshotReader(output) as reader:
+            assert reader.read_file("readme.md") == "# Новый проект\n"
+            assert reader.read_file("large.txt") == large
+        print("✅ Перечитан только измененный файл")
+
+    print("\n✅ Снимок проекта работает корректно!")
+
+if __name__ == "__main__":
+    test_project_exporter_text()
+    test_project_exporter_snapshot()
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from fastapi.testclient import TestClient
+from main import app
+from src.infrastructure.monitoring.monitoringService import UNMATCHED_ROUTE, get_monitoring_service
+
+def test_request_metrics():
+    print("Тестирование меток метрик запросов...")
+    service = get_monitoring_service()
+
+    # Тест 1: Метки - шаблоны маршрутов, неизвестные пути - одна метка
+    print("\nТест 1: Шаблоны маршрутов")
+    client = TestClient(app)
+    client.get("/health/live")
+    for i in range(10):
+        client.get(f"/no/such/path/{i}")
+    endpoints = {key[0] for key in service._request_children}
+    assert "/health/live" in endpoints
+    assert UNMATCHED_ROUTE in endpoints
+    assert not any(endpoint.startswith("/no/such/path") for endpoint in endpoints)
+    print(f"✅ 10 неизвестных путей - метка '{UNMATCHED_ROUTE}'")
+
+    # Тест 2: Дочерние серии кэшируются по набору меток
+    print("\nТест 2: Кэш дочерних серий")
+    service.increment_api_requests("/cached", "GET", 200)
+    child = service._request_children[("/cached", "GET", 200)]
+    service.increment_api_requests("/cached", "GET", 200)
+    assert service._request_children[("/cached", "GET", 200)] is child
+    print("✅ Повторный запрос использует ту же серию")
+
+    # Тест 3: Произвольные методы не размножают серии и кэш
+    print("\nТест 3: Нестандартные HTTP методы")
+    for i in range(1000):
+        service.increment_api_requests("/scan", f"JUNK{i}", 405)
+    keys = [key for key in service._request_children if key[0] == "/scan"]
+    assert keys == [("/scan", "OTHER", 405)], keys
+    print("✅ 1000 методов - одна серия method=OTHER")
+
+    print("\n✅ Метки метрик запросов ограничены!")
+
+if __name__ == "__main__":
+    test_request_metrics()
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from fastapi.testclient import TestClient
+from main import app
+from src.infrastructure.monitoring.rollingStats import RollingStats, LogHistogram, bucket_index
+
+def test_rolling_stats():
+    print("Тестирование RollingStats...")
+
+    # Тест 1: Квантили логарифмической гистограммы
+    print("\nТест 1: Квантили гистограммы")
+    histogram = LogHistogram()
+    for i in range(1, 1001):
+        histogram.record_bucket(bucket_index(i / 1000))  # 1 мс .. 1 с
+    p50, p99 = histogram.quantiles((0.5, 0.99))
+    assert abs(p50 - 0.5) / 0.5 < 0.05
+    assert abs(p99 - 0.99) / 0.99 < 0.05
+    print(f"✅ p50={p50:.3f} с, p99={p99:.3f} с")
+
+    # Тест 2: Окна забывают старые слоты
+    print("\nТест 2: Скользящие окна")
+    stats = RollingStats({"1m": (6, 10.0), "1h": (6, 600.0)})
+    stats.record("/a", 200, 0.01, now=1000.0)
+    stats.record("/a", 500, 0.02, now=1001.0)
+    stats.record("/b", 404, 0.03, now=1070.0)
+    snapshot = stats.snapshot(now=1075.0)
+    assert "/a" not in snapshot["1m"]["routes"]
+    assert snapshot["1m"]["total"]["requests"] == 1
+    assert snapshot["1h"]["routes"]["/a"]["server_errors"] == 1
+    assert snapshot["1h"]["total"]["error_rate"] == round(2 / 3, 4)
+    # rps - по времени, покрытому окном: 1m с начала старейшего слота, 1h с первого запроса
+    assert snapshot["1m"]["total"]["rps"] == round(1 / 55, 3)
+    assert snapshot["1h"]["total"]["rps"] == round(3 / 75, 3)
+    print("✅ Минутное окно очищено, часовое хранит все запросы")
+
+    # Тест 3: Эндпоинт /api/v1/metrics отдает окна по шаблонам маршрутов
+    print("\nТест 3: /api/v1/metrics")
+    client = TestClient(app)
+    client.get("/health/live")
+    client.get("/no/such/path")
+    response = client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    routes = data["windows"]["1m"]["routes"]
+    assert "/health/live" in routes
+    assert "unmatched" in routes
+    assert data["requests_total"] >= 2
+    print(f"✅ Маршруты в окне 1m: {sorted(routes)}")
+
+if __name__ == "__main__":
+    test_rolling_stats()
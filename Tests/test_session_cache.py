@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.infrastructure.cache.strategies.sessionCache import SessionCache
+
+def test_session_cache():
+    print("Тестирование SessionCache...")
+
+    # Тест 1: Попадание в кэш до истечения токена
+    print("\nТест 1: Попадание в кэш")
+    cache = SessionCache(max_size=2)
+    payload = {"sub": "1", "user_info": {"id": 1}, "exp": time.time() + 60}
+    assert cache.get("token-1") is None
+    cache.put("token-1", payload)
+    assert cache.get("token-1") is payload
+    print("✅ Пейлоад возвращен из кэша")
+
+    # Тест 2: Истекший токен вытесняется при обращении
+    print("\nТест 2: Вытеснение по exp")
+    cache._entries[SessionCache.token_key("token-1")] = (time.time() - 1, payload)
+    assert cache.get("token-1") is None
+    assert len(cache) == 0
+    print("✅ Истекший токен удален")
+
+    # Тест 3: Ограничение размера (LRU)
+    print("\nТест 3: Ограничение размера")
+    for i in range(3):
+        cache.put(f"token-{i}", {"exp": time.time() + 60})
+    assert len(cache) == 2
+    assert cache.get("token-0") is None
+    assert cache.get("token-2") is not None
+    print("✅ Самая старая запись вытеснена")
+
+    # Тест 4: Токены без exp не кэшируются
+    print("\nТест 4: Токены без exp")
+    cache.put("no-exp", {"sub": "2"})
+    assert cache.get("no-exp") is None
+    print("✅ Бессрочный токен не закэширован")
+
+    # Тест 5: Активные токены без истекших записей в глубине LRU
+    print("\nТест 5: Число активных токенов")
+    cache = SessionCache(max_size=10)
+    cache.put("long", {"exp": time.time() + 60})
+    cache.put("short", {"exp": time.time() + 0.05})
+    cache.put("fresh", {"exp": time.time() + 60})
+    time.sleep(0.06)
+    # Истекшая запись в середине LRU
+    assert len(cache) == 3
+    assert cache.active() == 2 and len(cache) == 2
+    assert cache.get("long") is not None and cache.get("fresh") is not None
+    print("✅ Истекший токен не учтен и удален")
+
+if __name__ == "__main__":
+    test_session_cache()
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx
+from src.integrations.telegram.telegramDispatcher import TelegramDispatcher, TelegramAPIError
+from telegram_fixtures import FakeTelegramServer
+
+async def run_dispatcher_checks():
+    server = FakeTelegramServer()
+    await server.start()
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        dispatcher = TelegramDispatcher(
+            client, "TEST", api_url=server.url,
+            workers=3, max_queue_size=4, global_rate=100.0, chat_rate=20.0, chat_burst=1.0
+        )
+
+        # Тест 1: Порядок сообщений внутри чата и темп отправки
+        print("\nТест 1: Порядок и темп отправки в один чат")
+        started = time.monotonic()
+        futures = [await dispatcher.submit("sendMessage", {"chat_id": 1, "text": str(i)}, 1) for i in range(4)]
+        await asyncio.gather(*futures)
+        elapsed = time.monotonic() - started
+        texts = [payload["text"] for method, payload, _ in server.calls if payload["chat_id"] == 1]
+        assert texts == ["0", "1", "2", "3"]
+        # 20 сообщений/с при burst=1: три паузы по ~50 мс
+        assert elapsed >= 0.14
+        print(f"✅ 4 сообщения доставлены по порядку за {elapsed:.2f} с")
+
+        # Тест 2: Ответ 429 с retry_after
+        print("\nТест 2: Ответ 429 с retry_after")
+        server.rate_limits[2] = [1]
+        started = time.monotonic()
+        result = await dispatcher.call("sendMessage", {"chat_id": 2, "text": "after 429"}, 2)
+        elapsed = time.monotonic() - started
+        assert result["text"] == "after 429"
+        assert elapsed >= 1.0
+        print(f"✅ Сообщение доставлено после паузы {elapsed:.2f} с")
+
+        # Тест 3: Ошибки API доходят до вызывающего
+        print("\nТест 3: Ошибки API")
+        try:
+            await dispatcher.call("unknownMethod", {"chat_id": 3}, 3)
+            assert False, "Ожидалась TelegramAPIError"
+        except TelegramAPIError as e:
+            assert e.error_code == 404
+            print(f"✅ Ошибка передана вызывающему: {e}")
+
+        # Тест 4: Fire-and-forget и ожидание доставки при остановке
+        print("\nТест 4: Fire-and-forget")
+        for i in range(3):
+            await dispatcher.submit("sendMessage", {"chat_id": 4, "text": str(i)}, 4)
+        await dispatcher.stop()
+        assert dispatcher.pending == 0
+        assert sum(1 for _, payload, _ in server.calls if payload["chat_id"] == 4) == 3
+        print("✅ Очередь доставлена до остановки")
+
+        # Тест 5: Остановка по таймауту во время отправки
+        print("\nТест 5: Остановка с зависшим запросом")
+        dispatcher.start()
+        gate = server.gates["sendMessage"] = asyncio.Event()
+        stuck = await dispatcher.submit("sendMessage", {"chat_id": 5, "text": "stuck"}, 5)
+        queued = await dispatcher.submit("sendMessage", {"chat_id": 5, "text": "queued"}, 5)
+        await asyncio.sleep(0.05)
+        await dispatcher.stop(timeout=0.01)
+        for future in (stuck, queued):
+            assert future.done() and isinstance(future.exception(), RuntimeError)
+        await asyncio.sleep(0)
+        assert dispatcher.pending == 0
+        gate.set()
+        await asyncio.sleep(0.05)
+        print("✅ Future отправляемого и ожидающего запросов завершены ошибкой")
+
+    await server.stop()
+
+def test_telegram_dispatcher():
+    print("Тестирование TelegramDispatcher...")
+    asyncio.run(run_dispatcher_checks())
+
+if __name__ == "__main__":
+    test_telegram_dispatcher()
@@ -2,17 +2,28 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import os
 import time
 import datetime
-from src.api.auth import router as auth_router
-from src.infrastructure.monitoring.monitoringService import monitoring_service
+from src.api.auth import router as auth_router, get_session_cache
+from src.infrastructure.config.configService import configure_logging
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service, route_label
+from src.infrastructure.monitoring.timingMiddleware import TimingMiddleware
 from src.infrastructure.error.errorHandler import ErrorHandler
+from src.infrastructure.http.httpClientRegistry import get_http_client_registry
+from src.infrastructure.http.jsonResponse import FastJSONResponse, StaticJSON
+from src.infrastructure.health.probeRegistry import get_probe_registry
+from src.infrastructure.events.eventBus import get_event_bus
+from src.infrastructure.cache.cacheService import get_cache_service, close_cache_service
+from src.integrations.telegram.telegramIntegration import get_telegram_integration, close_telegram_integration
 # AGORA_BLOCK: start:app_initialization
 # Создание приложения FastAPI
 app = FastAPI(
    title="Agora.AI API",
    description="Интеллектуальная платформа B2B-сотрудничества",
-   version="1.0.0"
+   version="1.0.0",
+   # Сериализация ответов через orjson вместо json.dumps
+   default_response_class=FastJSONResponse
 )
 # AGORA_BLOCK: end:app_initialization
 # AGORA_BLOCK: start:cors_setup
@@ -38,30 +49,9 @@ app.include_router(auth_router, prefix="/api/v1")
 # app.include_router(blockchain_router, prefix="/api/v1")
 # AGORA_BLOCK: end:routers_registration
 # AGORA_BLOCK: start:middleware_logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-   """Middleware для логирования запросов"""
-   start_time = time.time()
-   
-   response = await call_next(request)
-   
-   # Расчет времени выполнения
-   process_time = time.time() - start_time
-   
-   # Логирование запроса
-   monitoring_service.increment_api_requests(
-       endpoint=request.url.path,
-       method=request.method,
-       status=response.status_code
-   )
-   
-   # Отслеживание длительности запроса
-   monitoring_service.track_request_duration(process_time)
-   
-   # Добавление заголовков с метриками
-   response.headers["X-Process-Time"] = str(process_time)
-   
-   return response
+# Учет запросов: ASGI middleware без BaseHTTPMiddleware, с заголовками
+# X-Process-Time и Server-Timing
+app.add_middleware(TimingMiddleware)
 # AGORA_BLOCK: end:middleware_logging
 # AGORA_BLOCK: start:exception_handlers
 @app.exception_handler(Exception)
@@ -70,8 +60,8 @@ async def global_exception_handler(request: Request, exc: Exception):
    error_info = ErrorHandler.handle_error(exc, "global")
    
    # Логирование ошибки
-   monitoring_service.increment_api_errors(
-       endpoint=request.url.path,
+   get_monitoring_service().increment_api_errors(
+       endpoint=route_label(request.scope),
        status=500
    )
    
@@ -81,16 +71,16 @@ async def global_exception_handler(request: Request, exc: Exception):
    )
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
-    monitoring_service.increment_api_errors(
-        endpoint=request.url.path,
+    get_monitoring_service().increment_api_errors(
+        endpoint=route_label(request.scope),
         status=404
     )
     return JSONResponse(status_code=404, content={"detail": "Ресурс не найден"})
 @app.exception_handler(422)
 async def validation_exception_handler(request: Request, exc):
     """Обработчик ошибок валидации"""
-    monitoring_service.increment_api_errors(
-        endpoint=request.url.path,
+    get_monitoring_service().increment_api_errors(
+        endpoint=route_label(request.scope),
         status=422
     )
     return JSONResponse(
@@ -103,32 +93,70 @@ from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Контекстный менеджер для управления жизненным циклом приложения"""
-    # Код при запуске
+    # Код при запуске: сервисы создаются здесь, а не при импорте main
+    configure_logging()
+    monitoring_service = get_monitoring_service()
+    monitoring_service.start()
+    # Сводки по подавленным повторам ошибок раз в четверть окна
+    ErrorHandler.start_summary_timer()
+    # Доставка событий подписчикам шины (события до старта ждут в очередях)
+    get_event_bus().start()
+    telegram_integration = get_telegram_integration()
+    # Исходящие HTTP клиенты интеграций открываются до первого запроса
+    get_http_client_registry().start()
+    # Кэш переводов, эмбеддингов и сессий (общий уровень - Redis по REDIS_URL)
+    cache_service = get_cache_service()
+    # Фоновые проверки зависимостей для /health/ready
+    probes = get_probe_registry()
+    probes.register("event_log", monitoring_service.event_logger.check, interval=10.0, timeout=1.0)
+    probes.register(
+        "telegram_api", telegram_integration.ping,
+        interval=float(os.getenv("TELEGRAM_PROBE_INTERVAL", "30")), timeout=5.0,
+        # Без Telegram сервис продолжает обслуживать уже выданные токены
+        critical=False
+    )
+    # Без общего кэша запросы идут напрямую к источникам данных
+    probes.register("cache", cache_service.check, interval=10.0, timeout=1.0, critical=False)
+    probes.start()
     monitoring_service.log_event("app.startup", {"message": "Agora.AI API starting..."})
     # TODO: Инициализация подключений к БД
-    # TODO: Инициализация кэша
     # TODO: Проверка переменных окружения
     
     yield  # Здесь приложение работает
     
     # Код при остановке
     monitoring_service.log_event("app.shutdown", {"message": "Agora.AI API shutting down..."})
+    await get_probe_registry().stop()
+    # Доставка сообщений, оставшихся в очереди Telegram, и закрытие HTTP клиентов
+    await close_telegram_integration()
+    await get_http_client_registry().close()
+    # Отмена фоновых обновлений кэша и закрытие общего уровня
+    await close_cache_service()
+    # Доставка оставшихся событий шины
+    await get_event_bus().stop()
+    # Сводки по подавленным повторам ошибок, запись оставшихся событий журнала,
+    # снятие live-метрик воркера
+    ErrorHandler.stop_summary_timer()
+    ErrorHandler.flush_error_summaries()
+    monitoring_service.stop()
     # TODO: Закрытие подключений к БД
-    # TODO: Очистка кэша
     # TODO: Сохранение состояния
 # Применяем lifespan к приложению
 app.router.lifespan_context = lifespan
 # AGORA_BLOCK: end:startup_shutdown_events
 # AGORA_BLOCK: start:health_endpoints
+# Постоянные ответы сериализуются один раз, с ETag
+ROOT_PAYLOAD = StaticJSON({
+   "message": "Agora.AI API is running",
+   "version": "1.0.0",
+   "docs": "/docs",
+   "health": "/health"
+})
+LIVENESS_PAYLOAD = StaticJSON({"status": "alive"})
 @app.get("/")
-async def root():
+async def root(request: Request):
    """Корневой эндпоинт для проверки работы API"""
-   return {
-       "message": "Agora.AI API is running",
-       "version": "1.0.0",
-       "docs": "/docs",
-       "health": "/health"
-   }
+   return ROOT_PAYLOAD.response(request)
 @app.get("/health")
 async def health_check():
    """Эндпоинт для проверки здоровья сервиса"""
@@ -139,52 +167,57 @@ async def health_check():
    }
 @app.get("/health/ready")
 async def readiness_check():
-   """Проверка готовности сервиса к работе"""
-   # TODO: Проверить подключение к БД
-   # TODO: Проверить доступность внешних сервисов
-   return {
-       "status": "ready",
-       "checks": {
-           "database": "ok",
-           "cache": "ok",
-           "external_apis": "ok"
-       }
-   }
+   """
+   Проверка готовности сервиса к работе
+
+   Проверки зависимостей выполняются в фоне (ProbeRegistry), здесь только
+   возвращаются их последние результаты с возрастом.
+   """
+   # TODO: Зарегистрировать проверки БД по мере их появления
+   readiness = get_probe_registry().snapshot()
+   return JSONResponse(
+       status_code=200 if readiness["status"] == "ready" else 503,
+       content=readiness
+   )
 @app.get("/health/live")
-async def liveness_check():
+async def liveness_check(request: Request):
    """Проверка что сервис живой"""
-   return {"status": "alive"}
+   return LIVENESS_PAYLOAD.response(request)
 # AGORA_BLOCK: end:health_endpoints
 # AGORA_BLOCK: start:api_info_endpoints
+API_INFO_PAYLOAD = StaticJSON({
+   "name": "Agora.AI API",
+   "version": "1.0.0",
+   "description": "Интеллектуальная платформа B2B-сотрудничества",
+   "endpoints": {
+       "auth": "/api/v1/auth",
+       "profile": "/api/v1/profile",
+       "match": "/api/v1/match",
+       "logistics": "/api/v1/logistics",
+       "contract": "/api/v1/contract",
+       "ai": "/api/v1/ai",
+       "reputation": "/api/v1/reputation",
+       "blockchain": "/api/v1/blockchain"
+   }
+}, cache_control="public, max-age=300")
 @app.get("/api/v1/info")
-async def api_info():
+async def api_info(request: Request):
    """Информация об API"""
-   return {
-       "name": "Agora.AI API",
-       "version": "1.0.0",
-       "description": "Интеллектуальная платформа B2B-сотрудничества",
-       "endpoints": {
-           "auth": "/api/v1/auth",
-           "profile": "/api/v1/profile",
-           "match": "/api/v1/match",
-           "logistics": "/api/v1/logistics",
-           "contract": "/api/v1/contract",
-           "ai": "/api/v1/ai",
-           "reputation": "/api/v1/reputation",
-           "blockchain": "/api/v1/blockchain"
-       }
-   }
+   return API_INFO_PAYLOAD.response(request)
 @app.get("/api/v1/metrics")
 async def metrics_endpoint():
-   """Базовые метрики приложения"""
-   # TODO: Вернуть актуальные метрики
-   return {
-       "requests_total": 0,
-       "errors_total": 0,
-       "active_users": 0,
-       "active_negotiations": 0,
-       "successful_matches": 0
-   }
+   """Базовые метрики приложения и скользящие окна по маршрутам"""
+   stats = get_monitoring_service().get_stats_snapshot()
+   # Ответ собирается из простых типов - jsonable_encoder не нужен
+   return FastJSONResponse({
+       "requests_total": stats["requests_total"],
+       "errors_total": stats["errors_total"],
+       # Активные пользователи - непросроченные проверенные токены в кэше сессий
+       "active_users": get_session_cache().active(),
+       "active_negotiations": stats["active_negotiations"],
+       "successful_matches": stats["successful_matches"],
+       "windows": stats["windows"]
+   })
 # AGORA_BLOCK: end:api_info_endpoints
 # AGORA_BLOCK: start:main_entry_point
 if __name__ == "__main__":
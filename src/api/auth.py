@@ -5,14 +5,30 @@ from pydantic import BaseModel
 from typing import Dict, Any
 import jwt
 import datetime
-import os
-from src.integrations.telegram.telegramIntegration import telegram_integration
+from functools import lru_cache
+from src.integrations.telegram.telegramIntegration import get_telegram_integration
+from src.infrastructure.config.configService import get_setting
 from src.infrastructure.error.errorHandler import ErrorHandler
-from src.infrastructure.monitoring.monitoringService import monitoring_service
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+from src.infrastructure.cache.strategies.sessionCache import SessionCache
+from src.infrastructure.monitoring.timingMiddleware import timing_phase
+from src.infrastructure.http.jsonResponse import FastJSONResponse, ModelResponse
 
 router = APIRouter()
 security = HTTPBearer()
 
+JWT_ALGORITHM = "HS256"
+
+@lru_cache(maxsize=1)
+def get_jwt_secret() -> str:
+    """Ключ подписи: читается один раз при первом запросе, а не при импорте и не на каждый запрос"""
+    return get_setting("JWT_SECRET", "your-secret-key")
+
+@lru_cache(maxsize=1)
+def get_session_cache() -> SessionCache:
+    """Кэш проверенных токенов: повторный /auth/me обходится без HMAC и разбора JSON"""
+    return SessionCache(max_size=int(get_setting("JWT_CACHE_SIZE", "10000")))
+
 class LoginRequest(BaseModel):
     """Модель запроса на вход"""
     init_data: str
@@ -38,8 +54,11 @@ async def login(request: LoginRequest):
         HTTPException: При ошибках аутентификации
     """
     try:
+        telegram_integration = get_telegram_integration()
+        
         # Валидация initData от Telegram
-        user_data = await telegram_integration.validate_init_data(request.init_data)
+        with timing_phase("auth"):
+            user_data = await telegram_integration.validate_init_data(request.init_data)
         
         # Получение информации о пользователе
         telegram_id = int(user_data.get('user', {}).get('id'))
@@ -58,19 +77,21 @@ async def login(request: LoginRequest):
             "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=24)
         }
         
-        token = jwt.encode(
-            payload,
-            os.getenv("JWT_SECRET", "your-secret-key"),
-            algorithm="HS256"
-        )
+        with timing_phase("auth"):
+            token = jwt.encode(
+                payload,
+                get_jwt_secret(),
+                algorithm=JWT_ALGORITHM
+            )
         
         # Логирование успешного входа
-        monitoring_service.log_event("auth.success", {"user_id": telegram_id})
+        get_monitoring_service().log_event("auth.success", {"user_id": telegram_id})
         
-        return LoginResponse(
+        # Модель сериализуется pydantic напрямую в JSON (response_model - для схемы OpenAPI)
+        return ModelResponse(LoginResponse(
             access_token=token,
             expires_in=24 * 60 * 60  # 24 часа в секундах
-        )
+        ))
         
     except Exception as e:
         # Логирование ошибки
@@ -94,24 +115,34 @@ async def get_current_user(token: str = Depends(security)):
     Raises:
         HTTPException: При ошибках валидации токена
     """
-    try:
-        # Декодирование токена
-        payload = jwt.decode(
-            token.credentials,
-            os.getenv("JWT_SECRET", "your-secret-key"),
-            algorithms=["HS256"]
-        )
+    with timing_phase("auth"):
+        # Быстрый путь: токен уже проверен и еще не истек
+        payload = get_session_cache().get(token.credentials)
+        if payload is not None:
+            get_monitoring_service().track_cache_lookup("jwt", "hit")
+            return FastJSONResponse(payload.get("user_info"))
         
-        return payload.get("user_info")
+        get_monitoring_service().track_cache_lookup("jwt", "miss")
         
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Токен истек"
-        )
-    except jwt.InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Невалидный токен"
-        )
+        try:
+            # Декодирование токена
+            payload = jwt.decode(
+                token.credentials,
+                get_jwt_secret(),
+                algorithms=[JWT_ALGORITHM]
+            )
+            
+            get_session_cache().put(token.credentials, payload)
+            return FastJSONResponse(payload.get("user_info"))
+            
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Токен истек"
+            )
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Невалидный токен"
+            )
 # AGORA_BLOCK: end:auth_login
\ No newline at end of file
@@ -0,0 +1,134 @@
+# AGORA_FILE: start:src/infrastructure/cache/asyncTtlCache.py
+# AGORA_BLOCK: start:async_ttl_cache
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# AGORA_BLOCK: start:async_ttl_cache_class
+class AsyncTTLCache:
+    """
+    Асинхронный TTL/LRU-кэш перед медленным источником данных.
+
+    - одновременные промахи по одному ключу объединяются в один вызов loader;
+    - после ttl значение еще stale_ttl секунд отдается как есть,
+      а обновление выполняется в фоне (stale-while-revalidate);
+    - число записей ограничено max_size, вытесняются наименее используемые.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Hashable], Awaitable[Any]],
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        max_size: int = 10000,
+        cache_none: bool = False,
+    ):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.cache_none = cache_none
+
+        # key -> (время загрузки, значение)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    # AGORA_BLOCK: start:async_ttl_cache_get
+    async def get(self, key: Hashable) -> Any:
+        """Значение из кэша или из loader (с объединением одновременных запросов)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            loaded_at, value = entry
+            age = time.monotonic() - loaded_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                # Отдаем устаревшее значение и обновляем его в фоне
+                self._entries.move_to_end(key)
+                self._record("stale")
+                self._load(key)
+                return value
+            del self._entries[key]
+
+        # Промах по ключу, который уже загружается, ждет ту же загрузку
+        self._record("coalesced" if key in self._inflight else "miss")
+        return await asyncio.shield(self._load(key))
+    # AGORA_BLOCK: end:async_ttl_cache_get
+
+    # AGORA_BLOCK: start:async_ttl_cache_load
+    def _load(self, key: Hashable) -> asyncio.Task:
+        """Единственная загрузка ключа: повторные вызовы получают ту же задачу"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_loader(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda finished: self._on_loaded(key, finished))
+        return task
+
+    async def _run_loader(self, key: Hashable) -> Any:
+        value = await self.loader(key)
+        if value is not None or self.cache_none:
+            self._store(key, value)
+        return value
+
+    def _on_loaded(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Устаревшее значение (если есть) остается в кэше до конца stale_ttl
+            logger.warning(f"Cache '{self.name}' loader failed for {key!r}: {task.exception()}")
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        get_monitoring_service().track_cache_size(self.name, len(self._entries))
+    # AGORA_BLOCK: end:async_ttl_cache_load
+
+    def _record(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        elif result == "stale":
+            self.stale_hits += 1
+        elif result == "coalesced":
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        get_monitoring_service().track_cache_lookup(self.name, result)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Удаление ключа из кэша"""
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика кэша для метрик и отладки"""
+        total = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.stale_hits) / total if total else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+# AGORA_BLOCK: end:async_ttl_cache_class
+# AGORA_BLOCK: end:async_ttl_cache
+# AGORA_FILE: end:src/infrastructure/cache/asyncTtlCache.py
@@ -0,0 +1,366 @@
+# AGORA_FILE: start:src/infrastructure/cache/cacheService.py
+# AGORA_BLOCK: start:cache_service
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.infrastructure.config.configService import get_setting
+from src.infrastructure.http.jsonResponse import dump_json
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость, без нее используется json
+    orjson = None
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis - необязательная зависимость, без нее общий уровень в памяти
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+# Загрузка значения при промахе (вызывается один раз на ключ для всех ожидающих)
+Loader = Callable[[], Awaitable[Any]]
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+# AGORA_BLOCK: start:shared_tiers
+class InMemorySharedTier:
+    """
+    Общий уровень в памяти процесса - замена Redis для тестов и локального
+    запуска. Значения хранятся сериализованными, как в Redis.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        # ключ -> (время истечения, значение)
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            del self._data[key]
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.time() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._data if key.startswith(prefix)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    async def ping(self) -> str:
+        return f"in-memory, {len(self._data)} keys"
+
+    async def close(self) -> None:
+        self._data.clear()
+
+class RedisSharedTier:
+    """Общий уровень в Redis (клиент redis.asyncio)"""
+
+    name = "redis"
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        batch = []
+        async for key in self.client.scan_iter(match=prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += await self.client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += await self.client.delete(*batch)
+        return deleted
+
+    async def ping(self) -> str:
+        await self.client.ping()
+        return "redis"
+
+    async def close(self) -> None:
+        await self.client.aclose()
+# AGORA_BLOCK: end:shared_tiers
+
+# AGORA_BLOCK: start:namespace_config
+@dataclass
+class NamespaceConfig:
+    """Настройки пространства имен кэша"""
+    # Время жизни значения (в обоих уровнях)
+    ttl: float = 300.0
+    # Время жизни в локальном уровне воркера (ограничивает расхождение между воркерами)
+    local_ttl: Optional[float] = None
+    # Число записей локального уровня, лишние вытесняются по LRU
+    max_size: int = 10000
+    # Коэффициент вероятностного раннего обновления (XFetch): 0 - без раннего обновления
+    early_refresh_beta: float = 1.0
+
+# Пространства имен из кодовой карты (translation_cache, embedding_cache);
+# сессии JWT кэшируются в SessionCache (strategies/sessionCache.py)
+DEFAULT_NAMESPACES = {
+    "translation": NamespaceConfig(ttl=86400.0, local_ttl=3600.0, max_size=20000),
+    "embedding": NamespaceConfig(ttl=7 * 86400.0, local_ttl=3600.0, max_size=5000),
+}
+# AGORA_BLOCK: end:namespace_config
+
+# AGORA_BLOCK: start:cache_namespace
+class CacheNamespace:
+    """
+    Пространство имен кэша: локальный LRU-уровень воркера перед общим уровнем.
+
+    - одновременные промахи по ключу объединяются в одну загрузку
+      (включая чтение из общего уровня);
+    - значение обновляется в фоне до истечения с вероятностью, растущей
+      к концу ttl и с длительностью загрузки (XFetch), поэтому популярные
+      ключи не истекают одновременно у всех запросов;
+    - локальный уровень ограничен max_size записей.
+    """
+
+    def __init__(self, name: str, config: NamespaceConfig, shared: Any):
+        self.name = name
+        self.config = config
+        self.shared = shared
+        self.local_ttl = min(config.local_ttl or config.ttl, config.ttl)
+        # key -> (значение, время истечения, длительность загрузки, истечение в локальном уровне)
+        self._entries: "OrderedDict[str, Tuple[Any, float, float, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.counts = {"hit": 0, "shared_hit": 0, "miss": 0, "coalesced": 0, "early_refresh": 0, "evicted": 0}
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _record(self, result: str) -> None:
+        self.counts[result] += 1
+        get_monitoring_service().track_cache_lookup(self.name, result)
+
+    # AGORA_BLOCK: start:cache_namespace_get
+    async def get(self, key: str, loader: Optional[Loader] = None) -> Any:
+        """Значение из локального или общего уровня, иначе из loader (None без loader)"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, delta, local_expires_at = entry
+            if now < local_expires_at:
+                self._entries.move_to_end(key)
+                self._record("hit")
+                self._maybe_refresh(key, loader, expires_at, delta, now)
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._record("coalesced")
+        else:
+            task = self._spawn(key, self._fetch(key, loader))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, loader: Optional[Loader]) -> Any:
+        try:
+            raw = await self.shared.get(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for '{self.name}': {e}")
+            raw = None
+        if raw is not None:
+            envelope = _loads(raw)
+            now = time.time()
+            if now < envelope["e"]:
+                self._record("shared_hit")
+                self._store_local(key, envelope["v"], envelope["e"], envelope["d"])
+                self._maybe_refresh(key, loader, envelope["e"], envelope["d"], now)
+                return envelope["v"]
+        self._record("miss")
+        if loader is None:
+            return None
+        return await self._load(key, loader)
+
+    async def _load(self, key: str, loader: Loader) -> Any:
+        started = time.perf_counter()
+        value = await loader()
+        await self.set(key, value, delta=time.perf_counter() - started)
+        return value
+
+    def _maybe_refresh(self, key: str, loader: Optional[Loader], expires_at: float, delta: float, now: float) -> None:
+        """Фоновое обновление до истечения: now - delta * beta * ln(rand) >= expires_at"""
+        beta = self.config.early_refresh_beta
+        if loader is None or beta <= 0 or key in self._inflight:
+            return
+        if now - delta * beta * math.log(1.0 - random.random()) >= expires_at:
+            self._record("early_refresh")
+            self._spawn(key, self._load(key, loader))
+
+    def _spawn(self, key: str, coro: Awaitable[Any]) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._on_done(key, finished))
+        return task
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache '{self.name}' load failed for {key!r}: {task.exception()}")
+    # AGORA_BLOCK: end:cache_namespace_get
+
+    # AGORA_BLOCK: start:cache_namespace_set
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, delta: float = 0.0) -> None:
+        """Запись в оба уровня; delta - длительность загрузки значения (для раннего обновления)"""
+        ttl = ttl if ttl is not None else self.config.ttl
+        expires_at = time.time() + ttl
+        self._store_local(key, value, expires_at, delta)
+        try:
+            await self.shared.set(self._shared_key(key), dump_json({"v": value, "e": expires_at, "d": delta}), ttl)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for '{self.name}': {e}")
+
+    def _store_local(self, key: str, value: Any, expires_at: float, delta: float) -> None:
+        self._entries[key] = (value, expires_at, delta, min(expires_at, time.time() + self.local_ttl))
+        self._entries.move_to_end(key)
+        monitoring = get_monitoring_service()
+        while len(self._entries) > self.config.max_size:
+            self._entries.popitem(last=False)
+            self.counts["evicted"] += 1
+            monitoring.track_cache_eviction(self.name, "size")
+        monitoring.track_cache_size(self.name, len(self._entries))
+
+    async def delete(self, key: str) -> None:
+        """Удаление ключа из обоих уровней (событие cache.invalidated)"""
+        self._entries.pop(key, None)
+        try:
+            await self.shared.delete(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed for '{self.name}': {e}")
+        get_monitoring_service().log_event("cache.invalidated", {"namespace": self.name, "key": key})
+
+    async def clear(self) -> None:
+        """Очистка пространства имен в обоих уровнях (событие cache.cleared)"""
+        self._entries.clear()
+        try:
+            deleted = await self.shared.delete_prefix(self._shared_key(""))
+        except Exception as e:
+            logger.warning(f"Shared cache clear failed for '{self.name}': {e}")
+            deleted = 0
+        get_monitoring_service().track_cache_size(self.name, 0)
+        get_monitoring_service().log_event("cache.cleared", {"namespace": self.name, "shared_keys": deleted})
+    # AGORA_BLOCK: end:cache_namespace_set
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counts["hit"] + self.counts["shared_hit"] + self.counts["miss"] + self.counts["coalesced"]
+        return {
+            **self.counts,
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_ratio": (self.counts["hit"] + self.counts["shared_hit"]) / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+# AGORA_BLOCK: end:cache_namespace
+
+# AGORA_BLOCK: start:cache_service_class
+class CacheService:
+    """Пространства имен кэша с общим уровнем (Redis или его замена в памяти)"""
+
+    def __init__(self, shared: Any = None, namespaces: Optional[Dict[str, NamespaceConfig]] = None):
+        self.shared = shared or InMemorySharedTier()
+        self.namespaces: Dict[str, CacheNamespace] = {}
+        for name, config in (namespaces if namespaces is not None else DEFAULT_NAMESPACES).items():
+            self.register(name, config)
+
+    def register(self, name: str, config: NamespaceConfig) -> CacheNamespace:
+        namespace = CacheNamespace(name, config, self.shared)
+        self.namespaces[name] = namespace
+        return namespace
+
+    def namespace(self, name: str) -> CacheNamespace:
+        try:
+            return self.namespaces[name]
+        except KeyError:
+            raise ValueError(f"Unknown cache namespace: {name}")
+
+    async def get(self, namespace: str, key: str, loader: Optional[Loader] = None) -> Any:
+        return await self.namespace(namespace).get(key, loader)
+
+    async def check(self) -> str:
+        """Проверка общего уровня для /health/ready"""
+        return await self.shared.ping()
+
+    async def close(self) -> None:
+        """Отмена фоновых загрузок и закрытие общего уровня"""
+        tasks = [task for namespace in self.namespaces.values() for task in namespace._inflight.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"shared": self.shared.name, "namespaces": {name: ns.stats() for name, ns in self.namespaces.items()}}
+# AGORA_BLOCK: end:cache_service_class
+
+# AGORA_BLOCK: start:get_cache_service
+def namespace_configs() -> Dict[str, NamespaceConfig]:
+    """Настройки пространств имен с переопределением CACHE_<ИМЯ>_TTL / _LOCAL_TTL / _SIZE"""
+    configs = {}
+    for name, default in DEFAULT_NAMESPACES.items():
+        prefix = f"CACHE_{name.upper()}_"
+        configs[name] = NamespaceConfig(
+            ttl=float(get_setting(prefix + "TTL", str(default.ttl))),
+            local_ttl=float(get_setting(prefix + "LOCAL_TTL", str(default.local_ttl))),
+            max_size=int(get_setting(prefix + "SIZE", str(default.max_size))),
+            early_refresh_beta=default.early_refresh_beta,
+        )
+    return configs
+
+def create_shared_tier() -> Any:
+    """Redis по REDIS_URL (если установлен пакет redis), иначе общий уровень в памяти"""
+    url = get_setting("REDIS_URL")
+    if url and redis_asyncio is not None:
+        return RedisSharedTier(redis_asyncio.from_url(url))
+    if url:
+        logger.warning("REDIS_URL is set but the redis package is not installed, using in-memory shared cache")
+    return InMemorySharedTier()
+
+_cache_service: Optional[CacheService] = None
+
+def get_cache_service() -> CacheService:
+    """Единственный сервис кэша процесса, создается при первом обращении"""
+    global _cache_service
+    if _cache_service is None:
+        _cache_service = CacheService(create_shared_tier(), namespace_configs())
+    return _cache_service
+
+async def close_cache_service() -> None:
+    """Закрытие сервиса кэша (следующий get_cache_service создаст новый)"""
+    global _cache_service
+    if _cache_service is not None:
+        await _cache_service.close()
+        _cache_service = None
+# AGORA_BLOCK: end:get_cache_service
+# AGORA_BLOCK: end:cache_service
+# AGORA_FILE: end:src/infrastructure/cache/cacheService.py
@@ -0,0 +1,26 @@
+# AGORA_FILE: start:src/infrastructure/cache/strategies/embeddingCache.py
+# AGORA_BLOCK: start:embedding_cache
+from typing import Awaitable, Callable, List, Optional
+
+from src.infrastructure.cache.cacheService import CacheNamespace, get_cache_service
+
+class EmbeddingCache:
+    """Кэш векторов в пространстве имен "embedding": ключ - тип запроса и ID объекта"""
+
+    def __init__(self, cache: Optional[CacheNamespace] = None):
+        self.cache = cache or get_cache_service().namespace("embedding")
+
+    @staticmethod
+    def key(item_id: str, query_type: str) -> str:
+        """Ключ кэша вектора"""
+        return f"{query_type}:{item_id}"
+
+    async def get(self, item_id: str, query_type: str,
+                  embed: Callable[[], Awaitable[List[float]]]) -> List[float]:
+        """Вектор из кэша; при промахе embed вызывается один раз для всех одновременных запросов"""
+        return await self.cache.get(self.key(item_id, query_type), embed)
+
+    async def invalidate(self, item_id: str, query_type: str) -> None:
+        await self.cache.delete(self.key(item_id, query_type))
+# AGORA_BLOCK: end:embedding_cache
+# AGORA_FILE: end:src/infrastructure/cache/strategies/embeddingCache.py
@@ -0,0 +1,108 @@
+# AGORA_FILE: start:src/infrastructure/cache/strategies/sessionCache.py
+# AGORA_BLOCK: start:session_cache
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# AGORA_BLOCK: start:session_cache_class
+class SessionCache:
+    """
+    Ограниченный кэш проверенных JWT-пейлоадов.
+
+    Ключ - SHA-256 от токена (сами токены в памяти не хранятся),
+    запись живет до `exp` токена, при переполнении вытесняется
+    наименее используемая (LRU). Куча сроков истечения позволяет удалять
+    истекшие записи из любого места LRU без полного прохода.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # (expires_at, key); записи удаленных и перезаписанных токенов пропускаются при извлечении
+        self._expiry: List[Tuple[float, bytes]] = []
+
+    # AGORA_BLOCK: start:token_key
+    @staticmethod
+    def token_key(token: str) -> bytes:
+        """Ключ кэша по токену"""
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    # AGORA_BLOCK: end:token_key
+
+    # AGORA_BLOCK: start:get
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Проверенный пейлоад токена или None, если его нет или он истек"""
+        key = self.token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if time.time() >= expires_at:
+            # Токен истек - повторная проверка через jwt.decode вернет ExpiredSignatureError
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return payload
+    # AGORA_BLOCK: end:get
+
+    # AGORA_BLOCK: start:put
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Сохранение проверенного пейлоада до момента его `exp`"""
+        exp = payload.get("exp")
+        if exp is None:
+            # Бессрочные токены не кэшируем
+            return
+
+        now = time.time()
+        expires_at = float(exp)
+        if expires_at <= now:
+            return
+
+        key = self.token_key(token)
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expiry, (expires_at, key))
+        self._evict(now)
+    # AGORA_BLOCK: end:put
+
+    # AGORA_BLOCK: start:evict
+    def _evict(self, now: float) -> None:
+        """Удаление истекших записей (по куче сроков) и соблюдение лимита размера (LRU)"""
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self._entries[key]
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        if len(expiry) > 2 * len(self._entries) + 64:
+            # Сжатие кучи от записей вытесненных и удаленных токенов
+            self._expiry = [(expires_at, key) for key, (expires_at, _) in self._entries.items()]
+            heapq.heapify(self._expiry)
+    # AGORA_BLOCK: end:evict
+
+    # AGORA_BLOCK: start:active
+    def active(self) -> int:
+        """Число непросроченных токенов (удаляются только уже истекшие записи)"""
+        self._evict(time.time())
+        return len(self._entries)
+    # AGORA_BLOCK: end:active
+
+    def invalidate(self, token: str) -> None:
+        """Удаление токена из кэша (например, при logout)"""
+        self._entries.pop(self.token_key(token), None)
+
+    def clear(self) -> None:
+        """Полная очистка кэша"""
+        self._entries.clear()
+        self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+# AGORA_BLOCK: end:session_cache_class
+# AGORA_BLOCK: end:session_cache
+# AGORA_FILE: end:src/infrastructure/cache/strategies/sessionCache.py
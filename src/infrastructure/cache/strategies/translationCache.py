@@ -0,0 +1,33 @@
+# AGORA_FILE: start:src/infrastructure/cache/strategies/translationCache.py
+# AGORA_BLOCK: start:translation_cache
+import hashlib
+from typing import Awaitable, Callable, Optional
+
+from src.infrastructure.cache.cacheService import CacheNamespace, get_cache_service
+
+class TranslationCache:
+    """
+    Кэш переводов в пространстве имен "translation".
+
+    Ключ - языковая пара и SHA-256 от текста, поэтому длинные тексты
+    не попадают в ключи общего уровня.
+    """
+
+    def __init__(self, cache: Optional[CacheNamespace] = None):
+        self.cache = cache or get_cache_service().namespace("translation")
+
+    @staticmethod
+    def key(text: str, source_lang: str, target_lang: str) -> str:
+        """Ключ кэша перевода"""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{source_lang.lower()}:{target_lang.lower()}:{digest}"
+
+    async def get(self, text: str, source_lang: str, target_lang: str,
+                  translate: Callable[[], Awaitable[str]]) -> str:
+        """Перевод из кэша; при промахе translate вызывается один раз для всех одновременных запросов"""
+        return await self.cache.get(self.key(text, source_lang, target_lang), translate)
+
+    async def invalidate(self, text: str, source_lang: str, target_lang: str) -> None:
+        await self.cache.delete(self.key(text, source_lang, target_lang))
+# AGORA_BLOCK: end:translation_cache
+# AGORA_FILE: end:src/infrastructure/cache/strategies/translationCache.py
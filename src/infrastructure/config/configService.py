@@ -0,0 +1,40 @@
+# AGORA_FILE: start:src/infrastructure/config/configService.py
+# AGORA_BLOCK: start:config_service
+import logging
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+_environment_loaded = False
+_logging_configured = False
+
+# AGORA_BLOCK: start:load_environment
+def load_environment() -> None:
+    """
+    Загрузка переменных окружения из .env (один раз за процесс).
+
+    Вызывается при первом создании сервисов, а не при импорте модулей -
+    импорт приложения не должен читать файлы и менять окружение.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        load_dotenv()
+        _environment_loaded = True
+
+def get_setting(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Значение настройки с учетом .env"""
+    load_environment()
+    return os.getenv(name, default)
+# AGORA_BLOCK: end:load_environment
+
+# AGORA_BLOCK: start:configure_logging
+def configure_logging(level: int = logging.INFO) -> None:
+    """Базовая настройка логирования процесса (один раз, при запуске приложения)"""
+    global _logging_configured
+    if not _logging_configured:
+        logging.basicConfig(level=level)
+        _logging_configured = True
+# AGORA_BLOCK: end:configure_logging
+# AGORA_BLOCK: end:config_service
+# AGORA_FILE: end:src/infrastructure/config/configService.py
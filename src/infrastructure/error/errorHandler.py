@@ -1,41 +1,217 @@
 # AGORA_FILE: start:src/infrastructure/error/errorHandler.py
 # AGORA_BLOCK: start:error_handler
+import hashlib
 import logging
+import threading
+import time
 import traceback
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
 
 logger = logging.getLogger(__name__)
 
+# AGORA_BLOCK: start:error_fingerprints
+class ErrorFingerprints:
+    """
+    Учет повторяющихся ошибок по отпечатку (тип исключения + верхние кадры стека).
+
+    Первая ошибка в окне логируется полностью, повторы в пределах окна
+    только считаются; по истечении окна выдается сводка о числе повторов.
+    """
+
+    def __init__(self, window: float = 60.0, max_entries: int = 1000, top_frames: int = 3):
+        self.window = window
+        self.max_entries = max_entries
+        self.top_frames = top_frames
+        # fingerprint -> {error_type, context, window_start, occurrences, suppressed}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    # AGORA_BLOCK: start:fingerprint
+    def fingerprint(self, error: Exception) -> str:
+        """Отпечаток ошибки без форматирования traceback и чтения исходников"""
+        frames = []
+        tb = error.__traceback__
+        while tb is not None:
+            code = tb.tb_frame.f_code
+            frames.append(f"{code.co_filename}:{code.co_name}:{tb.tb_lineno}")
+            tb = tb.tb_next
+        key = "|".join([type(error).__qualname__] + frames[-self.top_frames:])
+        return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    # AGORA_BLOCK: end:fingerprint
+
+    # AGORA_BLOCK: start:observe
+    def observe(self, fingerprint: str, error_type: str, context: str) -> Tuple[bool, int, List[Dict[str, Any]]]:
+        """
+        Учет очередного появления ошибки.
+
+        Возвращает (первая ли в окне, число появлений, сводки по истекшим окнам).
+        """
+        now = time.monotonic()
+        summaries: List[Dict[str, Any]] = []
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None and now - entry["window_start"] < self.window:
+                entry["occurrences"] += 1
+                entry["suppressed"] += 1
+                self._entries.move_to_end(fingerprint)
+                first = False
+            else:
+                if entry is not None and entry["suppressed"]:
+                    summaries.append(self._summary(fingerprint, entry))
+                entry = {
+                    "error_type": error_type,
+                    "context": context,
+                    "window_start": now,
+                    "occurrences": (entry["occurrences"] if entry else 0) + 1,
+                    "suppressed": 0,
+                }
+                self._entries[fingerprint] = entry
+                self._entries.move_to_end(fingerprint)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                first = True
+
+            if now - self._last_flush >= self.window:
+                summaries.extend(self._flush_locked(now))
+        return first, entry["occurrences"], summaries
+    # AGORA_BLOCK: end:observe
+
+    # AGORA_BLOCK: start:flush_summaries
+    def flush(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Сводки по окнам с подавленными повторами (force - не дожидаясь конца окна)"""
+        with self._lock:
+            return self._flush_locked(time.monotonic(), force)
+
+    def _flush_locked(self, now: float, force: bool = False) -> List[Dict[str, Any]]:
+        self._last_flush = now
+        summaries = []
+        for fingerprint, entry in self._entries.items():
+            if entry["suppressed"] and (force or now - entry["window_start"] >= self.window):
+                summaries.append(self._summary(fingerprint, entry))
+                entry["suppressed"] = 0
+        return summaries
+
+    def _summary(self, fingerprint: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "fingerprint": fingerprint,
+            "error_type": entry["error_type"],
+            "context": entry["context"],
+            "repeated": entry["suppressed"],
+            "occurrences": entry["occurrences"],
+            "window_seconds": self.window,
+        }
+    # AGORA_BLOCK: end:flush_summaries
+# AGORA_BLOCK: end:error_fingerprints
+
 # AGORA_BLOCK: start:error_handler_class
 class ErrorHandler:
     """Централизованная обработка ошибок"""
-    
+
+    # Учет повторов общий для всего процесса
+    fingerprints = ErrorFingerprints()
+
     # AGORA_BLOCK: start:handle_error
     @staticmethod
     def handle_error(error: Exception, context: str = "") -> Dict[str, Any]:
         """
         Обработка ошибки и возврат структурированного ответа
+
+        Traceback форматируется и пишется в журнал только для первой ошибки
+        с данным отпечатком в окне; для повторов в ответе traceback = None.
         """
+        error_type = type(error).__name__
+        fingerprint = ErrorHandler.fingerprints.fingerprint(error)
+        first, occurrences, summaries = ErrorHandler.fingerprints.observe(fingerprint, error_type, context)
+        monitoring = get_monitoring_service()
+        monitoring.track_error_fingerprint(fingerprint, error_type)
+
         error_info = {
-            "error_type": type(error).__name__,
+            "error_type": error_type,
             "error_message": str(error),
             "context": context,
-            "traceback": traceback.format_exc()
+            "fingerprint": fingerprint,
+            "occurrences": occurrences,
+            "traceback": None
         }
-        
-        # Логирование ошибки
-        logger.error(f"Ошибка в контексте '{context}': {error_info}")
-        
+
+        if first:
+            error_info["traceback"] = "".join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            )
+            # Логирование ошибки (запись на диск - в фоновом потоке)
+            monitoring.event_logger.emit("error.occurred", error_info, level=logging.ERROR, logger_name=logger.name)
+
+        ErrorHandler._log_summaries(summaries)
         return error_info
     # AGORA_BLOCK: end:handle_error
-    
+
+    # AGORA_BLOCK: start:flush_error_summaries
+    @staticmethod
+    def flush_error_summaries() -> None:
+        """
+        Запись сводок по всем подавленным повторам (например, при остановке)
+        """
+        ErrorHandler._log_summaries(ErrorHandler.fingerprints.flush(force=True))
+
+    @staticmethod
+    def _log_summaries(summaries: List[Dict[str, Any]]) -> None:
+        for summary in summaries:
+            get_monitoring_service().event_logger.emit("error.repeated", summary, level=logging.WARNING, logger_name=logger.name)
+    # AGORA_BLOCK: end:flush_error_summaries
+
+    # AGORA_BLOCK: start:error_summary_timer
+    _summary_thread: Optional[threading.Thread] = None
+    _summary_stop: Optional[threading.Event] = None
+
+    @staticmethod
+    def start_summary_timer(interval: Optional[float] = None) -> None:
+        """
+        Фоновая запись сводок по истекшим окнам: без нее сводка выдается
+        только при следующем повторе той же ошибки или при остановке.
+        По умолчанию проверка 4 раза за окно.
+        """
+        if ErrorHandler._summary_thread is not None:
+            return
+        interval = interval or ErrorHandler.fingerprints.window / 4
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    ErrorHandler._log_summaries(ErrorHandler.fingerprints.flush())
+                except Exception:
+                    logger.exception("Error summary flush failed")
+
+        ErrorHandler._summary_stop = stop
+        ErrorHandler._summary_thread = threading.Thread(target=run, name="error-summaries", daemon=True)
+        ErrorHandler._summary_thread.start()
+
+    @staticmethod
+    def stop_summary_timer() -> None:
+        """Остановка фоновой записи сводок (оставшиеся пишет flush_error_summaries)"""
+        if ErrorHandler._summary_thread is None:
+            return
+        ErrorHandler._summary_stop.set()
+        ErrorHandler._summary_thread.join()
+        ErrorHandler._summary_thread = None
+        ErrorHandler._summary_stop = None
+    # AGORA_BLOCK: end:error_summary_timer
+
     # AGORA_BLOCK: start:log_error
     @staticmethod
     def log_error(error: Exception, context: str = "") -> None:
         """
         Логирование ошибки без возврата информации
         """
-        logger.error(f"Ошибка в контексте '{context}': {type(error).__name__}: {error}")
+        get_monitoring_service().event_logger.emit(
+            "error.occurred",
+            {"error_type": type(error).__name__, "error_message": str(error), "context": context},
+            level=logging.ERROR,
+            logger_name=logger.name
+        )
     # AGORA_BLOCK: end:log_error
 # AGORA_BLOCK: end:error_handler_class
 # AGORA_BLOCK: end:error_handler
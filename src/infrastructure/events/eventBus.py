@@ -0,0 +1,322 @@
+# AGORA_FILE: start:src/infrastructure/events/eventBus.py
+# AGORA_BLOCK: start:event_bus
+import asyncio
+import fnmatch
+import inspect
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Политики переполнения очереди подписчика
+BLOCK = "block"              # publish() ждет места (обратное давление); publish_nowait() отбрасывает
+DROP_NEW = "drop_new"        # отбрасывается новое событие
+DROP_OLDEST = "drop_oldest"  # отбрасывается самое старое событие в очереди
+POLICIES = (BLOCK, DROP_NEW, DROP_OLDEST)
+
+# AGORA_BLOCK: start:event_types
+@dataclass(frozen=True)
+class Topic(Generic[T]):
+    """Тема с типом данных события: публикация данных другого типа - TypeError"""
+    name: str
+    payload: Type[T] = dict
+
+@dataclass
+class Event:
+    """Опубликованное событие; published - time.monotonic() для расчета задержки доставки"""
+    topic: str
+    data: Any
+    ts: float = field(default_factory=time.time)
+    published: float = field(default_factory=time.monotonic)
+# AGORA_BLOCK: end:event_types
+
+# AGORA_BLOCK: start:subscription
+@dataclass
+class Subscription:
+    """Подписчик: шаблон тем (fnmatch, например "auth.*"), своя очередь и задача доставки"""
+    name: str
+    pattern: str
+    handler: Callable[..., Any]
+    queue: asyncio.Queue
+    policy: str = DROP_OLDEST
+    # max_batch > 1 - обработчик получает список событий
+    max_batch: int = 1
+    max_wait: float = 0.0
+    batched: bool = False
+    delivered: int = 0
+    dropped: int = 0
+    failed: int = 0
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pattern": self.pattern,
+            "policy": self.policy,
+            "queued": self.queue.qsize(),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+# AGORA_BLOCK: end:subscription
+
+# AGORA_BLOCK: start:event_bus_class
+class EventBus:
+    """
+    Внутрипроцессная шина событий на asyncio.
+
+    У каждого подписчика своя ограниченная очередь и своя задача доставки,
+    поэтому медленный подписчик не задерживает ни публикацию, ни остальных
+    подписчиков. publish_nowait() не блокирует и может вызываться из
+    обработчиков запросов и из других потоков.
+    """
+
+    def __init__(self, metrics: Any = None):
+        # metrics - объект с track_event_* (MonitoringService); None - без метрик
+        self.metrics = metrics
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._topic_types: Dict[str, type] = {}
+        # Подписчики по имени темы (сбрасывается при изменении подписок)
+        self._routes: Dict[str, Tuple[Subscription, ...]] = {}
+        self._published: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+    # AGORA_BLOCK: start:event_bus_topics
+    def topic(self, name: str, payload: Type[T] = dict) -> Topic[T]:
+        """Регистрация типа данных темы"""
+        self._topic_types[name] = payload
+        return Topic(name, payload)
+
+    def _route(self, topic: str) -> Tuple[Subscription, ...]:
+        subscriptions = self._routes.get(topic)
+        if subscriptions is None:
+            subscriptions = tuple(sub for sub in self.subscriptions.values()
+                                  if fnmatch.fnmatchcase(topic, sub.pattern))
+            self._routes[topic] = subscriptions
+        return subscriptions
+    # AGORA_BLOCK: end:event_bus_topics
+
+    # AGORA_BLOCK: start:event_bus_subscribe
+    def subscribe(self, pattern: str, handler: Callable[[Event], Any], name: Optional[str] = None,
+                  queue_size: int = 1000, policy: str = DROP_OLDEST) -> Subscription:
+        """Подписка с доставкой по одному событию; handler - функция или корутина"""
+        return self._add(pattern, handler, name, queue_size, policy, 1, 0.0, batched=False)
+
+    def subscribe_batch(self, pattern: str, handler: Callable[[List[Event]], Any], name: Optional[str] = None,
+                        queue_size: int = 1000, policy: str = DROP_OLDEST,
+                        max_batch: int = 100, max_wait: float = 0.05) -> Subscription:
+        """Подписка с доставкой пачками до max_batch событий (ожидание пачки - до max_wait секунд)"""
+        return self._add(pattern, handler, name, queue_size, policy, max_batch, max_wait, batched=True)
+
+    def _add(self, pattern, handler, name, queue_size, policy, max_batch, max_wait, batched) -> Subscription:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        name = name or getattr(handler, "__qualname__", None) or pattern
+        if name in self.subscriptions:
+            raise ValueError(f"Subscriber '{name}' already exists")
+        subscription = Subscription(name, pattern, handler, asyncio.Queue(maxsize=queue_size), policy,
+                                    max_batch=max(1, max_batch), max_wait=max_wait, batched=batched)
+        self.subscriptions[name] = subscription
+        self._routes.clear()
+        if self._loop is not None:
+            self._spawn(subscription)
+        return subscription
+
+    def unsubscribe(self, name: str) -> None:
+        subscription = self.subscriptions.pop(name, None)
+        self._routes.clear()
+        if subscription is not None and subscription.task is not None:
+            subscription.task.cancel()
+    # AGORA_BLOCK: end:event_bus_subscribe
+
+    # AGORA_BLOCK: start:event_bus_publish
+    def _event(self, topic: Union[str, Topic], data: Any) -> Event:
+        name = topic.name if isinstance(topic, Topic) else topic
+        expected = topic.payload if isinstance(topic, Topic) else self._topic_types.get(name)
+        if expected is not None and data is not None and not isinstance(data, expected):
+            raise TypeError(f"Topic '{name}' expects {expected.__name__}, got {type(data).__name__}")
+        self._published[name] = self._published.get(name, 0) + 1
+        if self.metrics is not None:
+            self.metrics.track_event_published(name)
+        return Event(name, data)
+
+    def publish_nowait(self, topic: Union[str, Topic], data: Any = None) -> int:
+        """
+        Публикация без ожидания: число подписчиков, в очереди которых попало
+        событие. При заполненной очереди действует политика подписчика
+        (для BLOCK событие отбрасывается).
+        """
+        event = self._event(topic, data)
+        subscriptions = self._route(event.topic)
+        if not subscriptions:
+            return 0
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            # Из другого потока - доставка в цикле событий шины
+            self._loop.call_soon_threadsafe(self._dispatch, event, subscriptions)
+            return len(subscriptions)
+        return self._dispatch(event, subscriptions)
+
+    def _dispatch(self, event: Event, subscriptions: Tuple[Subscription, ...]) -> int:
+        accepted = 0
+        for subscription in subscriptions:
+            queue = subscription.queue
+            if queue.full():
+                if subscription.policy == DROP_OLDEST:
+                    dropped = queue.get_nowait()
+                    queue.task_done()
+                    self._dropped(subscription, dropped.topic, "overflow")
+                else:
+                    self._dropped(subscription, event.topic, "full")
+                    continue
+            queue.put_nowait(event)
+            accepted += 1
+        return accepted
+
+    async def publish(self, topic: Union[str, Topic], data: Any = None) -> int:
+        """Публикация с обратным давлением: ожидание места у подписчиков с политикой BLOCK"""
+        event = self._event(topic, data)
+        accepted = 0
+        for subscription in self._route(event.topic):
+            if subscription.policy == BLOCK:
+                await subscription.queue.put(event)
+                accepted += 1
+            else:
+                accepted += self._dispatch(event, (subscription,))
+        return accepted
+
+    def _dropped(self, subscription: Subscription, topic: str, reason: str) -> None:
+        subscription.dropped += 1
+        if self.metrics is not None:
+            self.metrics.track_event_dropped(topic, subscription.name, reason)
+    # AGORA_BLOCK: end:event_bus_publish
+
+    # AGORA_BLOCK: start:event_bus_consume
+    async def _next_batch(self, subscription: Subscription) -> List[Event]:
+        queue = subscription.queue
+        batch = [await queue.get()]
+        if subscription.max_batch > 1:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + subscription.max_wait
+            while len(batch) < subscription.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    def _spawn(self, subscription: Subscription) -> None:
+        subscription.task = self._loop.create_task(self._consume(subscription), name=f"event-bus-{subscription.name}")
+        subscription.task.add_done_callback(self._consumer_done)
+
+    @staticmethod
+    def _consumer_done(task: asyncio.Task) -> None:
+        """Задача доставки завершается только отменой - иное завершение логируется"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Event bus consumer {task.get_name()} died", exc_info=task.exception())
+
+    async def _consume(self, subscription: Subscription) -> None:
+        while True:
+            batch = await self._next_batch(subscription)
+            if self.metrics is not None:
+                now = time.monotonic()
+                for event in batch:
+                    self.metrics.track_event_delivered(event.topic, now - event.published)
+                self.metrics.track_event_queue_depth(subscription.name, subscription.queue.qsize())
+            try:
+                if subscription.batched:
+                    result = subscription.handler(batch)
+                    if inspect.isawaitable(result):
+                        await result
+                else:
+                    for event in batch:
+                        result = subscription.handler(event)
+                        if inspect.isawaitable(result):
+                            await result
+                subscription.delivered += len(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                subscription.failed += len(batch)
+                logger.exception(f"Event subscriber '{subscription.name}' failed")
+            finally:
+                for _ in batch:
+                    subscription.queue.task_done()
+    # AGORA_BLOCK: end:event_bus_consume
+
+    # AGORA_BLOCK: start:event_bus_lifecycle
+    def start(self) -> None:
+        """Запуск задач доставки в текущем цикле событий (события до старта остаются в очередях)"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        for subscription in self.subscriptions.values():
+            self._rebind_queue(subscription)
+            self._spawn(subscription)
+
+    @staticmethod
+    def _rebind_queue(subscription: Subscription) -> None:
+        """
+        Новая очередь с теми же событиями: asyncio.Queue привязывается к циклу
+        при первом ожидании, а шина переживает несколько циклов (повторный
+        lifespan, TestClient, asyncio.run в тестах)
+        """
+        old = subscription.queue
+        queue: asyncio.Queue = asyncio.Queue(maxsize=old.maxsize)
+        while not old.empty():
+            queue.put_nowait(old.get_nowait())
+        subscription.queue = queue
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Доставка событий, оставшихся в очередях (не дольше timeout), и остановка задач"""
+        if self._loop is None:
+            return
+        subscriptions = list(self.subscriptions.values())
+        try:
+            await asyncio.wait_for(asyncio.gather(*(sub.queue.join() for sub in subscriptions)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Event bus stopped with undelivered events: "
+                           + ", ".join(f"{sub.name}={sub.queue.qsize()}" for sub in subscriptions if sub.queue.qsize()))
+        tasks = [sub.task for sub in subscriptions if sub.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for subscription in subscriptions:
+            subscription.task = None
+        self._loop = None
+        self._loop_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Опубликованные события по темам и состояние подписчиков"""
+        return {
+            "published": dict(self._published),
+            "subscribers": {name: sub.stats() for name, sub in self.subscriptions.items()},
+        }
+    # AGORA_BLOCK: end:event_bus_lifecycle
+# AGORA_BLOCK: end:event_bus_class
+
+# AGORA_BLOCK: start:get_event_bus
+_event_bus: Optional[EventBus] = None
+
+def get_event_bus() -> EventBus:
+    """Единственная шина событий процесса (метрики - в MonitoringService)"""
+    global _event_bus
+    if _event_bus is None:
+        # Импорт здесь: monitoringService сам публикует события в шину
+        from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+        _event_bus = EventBus(metrics=get_monitoring_service())
+    return _event_bus
+# AGORA_BLOCK: end:get_event_bus
+# AGORA_BLOCK: end:event_bus
+# AGORA_FILE: end:src/infrastructure/events/eventBus.py
@@ -0,0 +1,134 @@
+# AGORA_FILE: start:src/infrastructure/health/probeRegistry.py
+# AGORA_BLOCK: start:probe_registry
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# Проверка зависимости: исключение или таймаут - зависимость недоступна,
+# возвращенная строка попадает в detail результата
+ProbeCheck = Callable[[], Awaitable[Optional[str]]]
+
+# AGORA_BLOCK: start:probe
+@dataclass
+class Probe:
+    """Проверка одной зависимости и ее последний результат"""
+    name: str
+    check: ProbeCheck
+    interval: float = 15.0
+    timeout: float = 5.0
+    # Недоступность некритичной зависимости не снимает готовность сервиса
+    critical: bool = True
+    status: str = "pending"
+    detail: Optional[str] = None
+    latency: Optional[float] = None
+    checked_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def result(self, now: float) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "critical": self.critical,
+            "age_seconds": round(now - self.checked_at, 3) if self.checked_at is not None else None,
+            "latency_ms": round(self.latency * 1000, 3) if self.latency is not None else None,
+            "detail": self.detail,
+        }
+# AGORA_BLOCK: end:probe
+
+# AGORA_BLOCK: start:probe_registry_class
+class ProbeRegistry:
+    """
+    Фоновые проверки зависимостей для /health/ready.
+
+    Каждая проверка выполняется в своей задаче со своим интервалом; эндпоинт
+    только читает последние результаты и их возраст, не обращаясь к сети.
+    """
+
+    def __init__(self):
+        self.probes: Dict[str, Probe] = {}
+
+    def register(self, name: str, check: ProbeCheck, interval: float = 15.0,
+                 timeout: float = 5.0, critical: bool = True) -> Probe:
+        """Регистрация проверки (до start() или во время работы)"""
+        probe = Probe(name, check, interval=interval, timeout=timeout, critical=critical)
+        previous = self.probes.get(name)
+        if previous is not None and previous.task is not None:
+            previous.task.cancel()
+        self.probes[name] = probe
+        if self._running():
+            probe.task = asyncio.create_task(self._run(probe), name=f"probe-{name}")
+        return probe
+
+    def _running(self) -> bool:
+        return any(probe.task is not None for probe in self.probes.values())
+
+    # AGORA_BLOCK: start:probe_registry_run
+    async def run_once(self, probe: Probe) -> None:
+        """Однократное выполнение проверки с сохранением результата"""
+        started = time.perf_counter()
+        try:
+            probe.detail = await asyncio.wait_for(probe.check(), probe.timeout)
+            probe.status = "ok"
+        except asyncio.TimeoutError:
+            probe.status, probe.detail = "fail", f"timeout after {probe.timeout:.1f}s"
+        except Exception as e:
+            probe.status, probe.detail = "fail", f"{type(e).__name__}: {e}"
+        probe.latency = time.perf_counter() - started
+        probe.checked_at = time.time()
+        get_monitoring_service().track_dependency_probe(probe.name, probe.status == "ok", probe.latency)
+        if probe.status != "ok":
+            logger.warning(f"Probe '{probe.name}' failed: {probe.detail}")
+
+    async def _run(self, probe: Probe) -> None:
+        while True:
+            await self.run_once(probe)
+            await asyncio.sleep(probe.interval)
+    # AGORA_BLOCK: end:probe_registry_run
+
+    # AGORA_BLOCK: start:probe_registry_lifecycle
+    def start(self) -> None:
+        """Запуск фоновых проверок (первая выполняется сразу)"""
+        for probe in self.probes.values():
+            if probe.task is None:
+                probe.task = asyncio.create_task(self._run(probe), name=f"probe-{probe.name}")
+
+    async def stop(self) -> None:
+        """Остановка фоновых проверок"""
+        tasks = [probe.task for probe in self.probes.values() if probe.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for probe in self.probes.values():
+            probe.task = None
+    # AGORA_BLOCK: end:probe_registry_lifecycle
+
+    # AGORA_BLOCK: start:probe_registry_snapshot
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Готовность сервиса и последние результаты проверок с их возрастом"""
+        if now is None:
+            now = time.time()
+        ready = all(probe.status == "ok" for probe in self.probes.values() if probe.critical)
+        return {
+            "status": "ready" if ready else "not_ready",
+            "checks": {name: probe.result(now) for name, probe in self.probes.items()},
+        }
+    # AGORA_BLOCK: end:probe_registry_snapshot
+# AGORA_BLOCK: end:probe_registry_class
+
+# AGORA_BLOCK: start:get_probe_registry
+_probe_registry: Optional[ProbeRegistry] = None
+
+def get_probe_registry() -> ProbeRegistry:
+    """Единственный реестр проверок процесса"""
+    global _probe_registry
+    if _probe_registry is None:
+        _probe_registry = ProbeRegistry()
+    return _probe_registry
+# AGORA_BLOCK: end:get_probe_registry
+# AGORA_BLOCK: end:probe_registry
+# AGORA_FILE: end:src/infrastructure/health/probeRegistry.py
@@ -0,0 +1,205 @@
+# AGORA_FILE: start:src/infrastructure/http/httpClientRegistry.py
+# AGORA_BLOCK: start:http_client_registry
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 доступен только при установленном пакете h2 (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# AGORA_BLOCK: start:http_client_config
+@dataclass
+class HttpClientConfig:
+    """Настройки исходящего клиента к одному внешнему хосту"""
+    base_url: str = ""
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    pool_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+    def build_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.pool_timeout)
+
+    def build_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+# AGORA_BLOCK: end:http_client_config
+
+# AGORA_BLOCK: start:instrumented_transport
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт с учетом использования пула соединений.
+
+    По событиям trace httpcore определяется, было ли открыто новое соединение,
+    и сколько запрос ждал свободного соединения в пуле (до начала установки
+    нового соединения или до отправки заголовков по уже открытому).
+    """
+
+    def __init__(self, name: str, transport: httpx.AsyncHTTPTransport, max_connections: int):
+        self.name = name
+        self.transport = transport
+        self.max_connections = max_connections
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        outer_trace = request.extensions.get("trace")
+        waited = False
+        new_connection = False
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal waited, new_connection
+            if not waited and (event_name.endswith("connect_tcp.started")
+                               or event_name.endswith("connect_unix_socket.started")
+                               or event_name.endswith("send_request_headers.started")):
+                waited = True
+                new_connection = "connect_" in event_name
+                get_monitoring_service().track_http_pool_wait(
+                    self.name, time.perf_counter() - started, new_connection
+                )
+            elif event_name.endswith("response_closed.complete"):
+                self.report_pool()
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.report_pool()
+        return await self.transport.handle_async_request(request)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """
+        Число занятых и простаивающих соединений пула. Пул - внутренний
+        атрибут httpx: если его нет (другая версия или транспорт), статистики нет.
+        """
+        connections = getattr(getattr(self.transport, "_pool", None), "connections", None)
+        if connections is None:
+            return {}
+        try:
+            idle = sum(1 for connection in connections if connection.is_idle())
+        except AttributeError:
+            return {}
+        return {
+            "active": len(connections) - idle,
+            "idle": idle,
+            "max": self.max_connections,
+        }
+
+    def report_pool(self) -> None:
+        stats = self.pool_stats()
+        if stats:
+            get_monitoring_service().track_http_pool(self.name, stats["active"], stats["idle"])
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+# AGORA_BLOCK: end:instrumented_transport
+
+# AGORA_BLOCK: start:http_client_registry_class
+class HttpClientRegistry:
+    """
+    Общие исходящие HTTP клиенты по именам интеграций.
+
+    Каждая интеграция регистрирует свой клиент (отдельный пул, лимиты и
+    таймауты для своего хоста). Клиенты открываются в start() при запуске
+    приложения и закрываются в close(); get() до start() открывает клиент
+    по требованию.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, HttpClientConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, InstrumentedTransport] = {}
+
+    # AGORA_BLOCK: start:http_client_register
+    def register(self, name: str, config: Optional[HttpClientConfig] = None, **options: Any) -> HttpClientConfig:
+        """Регистрация клиента (повторная регистрация с тем же именем не меняет открытый клиент)"""
+        config = config or HttpClientConfig(**options)
+        if config.http2 and not HTTP2_AVAILABLE:
+            logger.info(f"HTTP client '{name}': h2 is not installed, falling back to HTTP/1.1")
+            config.http2 = False
+        self._configs[name] = config
+        return config
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._configs
+
+    async def unregister(self, name: str) -> None:
+        """Закрытие клиента и удаление его настроек (следующий register создаст новый)"""
+        self._configs.pop(name, None)
+        self._transports.pop(name, None)
+        client = self._clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
+    # AGORA_BLOCK: end:http_client_register
+
+    # AGORA_BLOCK: start:http_client_get
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Открытый клиент по имени"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._open(name)
+        return client
+
+    def _open(self, name: str) -> httpx.AsyncClient:
+        config = self._configs[name]
+        transport = InstrumentedTransport(
+            name,
+            httpx.AsyncHTTPTransport(limits=config.build_limits(), http2=config.http2),
+            config.max_connections,
+        )
+        client = httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=config.build_timeout(),
+            transport=transport,
+        )
+        self._transports[name] = transport
+        self._clients[name] = client
+        return client
+    # AGORA_BLOCK: end:http_client_get
+
+    # AGORA_BLOCK: start:http_client_lifecycle
+    def start(self) -> None:
+        """Открытие всех зарегистрированных клиентов"""
+        for name in self._configs:
+            self.get(name)
+
+    async def close(self) -> None:
+        """Закрытие всех клиентов (зарегистрированные настройки сохраняются)"""
+        clients, self._clients = self._clients, {}
+        self._transports = {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client '{name}': {e}")
+    # AGORA_BLOCK: end:http_client_lifecycle
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Использование пулов открытых клиентов"""
+        return {name: transport.pool_stats() for name, transport in self._transports.items()}
+# AGORA_BLOCK: end:http_client_registry_class
+
+# AGORA_BLOCK: start:get_http_client_registry
+_http_client_registry: Optional[HttpClientRegistry] = None
+
+def get_http_client_registry() -> HttpClientRegistry:
+    """Единственный реестр клиентов процесса"""
+    global _http_client_registry
+    if _http_client_registry is None:
+        _http_client_registry = HttpClientRegistry()
+    return _http_client_registry
+# AGORA_BLOCK: end:get_http_client_registry
+# AGORA_BLOCK: end:http_client_registry
+# AGORA_FILE: end:src/infrastructure/http/httpClientRegistry.py
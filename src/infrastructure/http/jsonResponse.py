@@ -0,0 +1,76 @@
+# AGORA_FILE: start:src/infrastructure/http/jsonResponse.py
+# AGORA_BLOCK: start:json_response
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость, без нее используется json
+    orjson = None
+
+# AGORA_BLOCK: start:dump_json
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dump_json(content: Any) -> bytes:
+    """Сериализация в JSON-байты (orjson, если установлен)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+# AGORA_BLOCK: end:dump_json
+
+# AGORA_BLOCK: start:fast_json_response
+class FastJSONResponse(JSONResponse):
+    """Класс ответа по умолчанию: сериализация через orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+class ModelResponse(Response):
+    """
+    Ответ из модели pydantic: сериализация ядром pydantic сразу в JSON,
+    без промежуточного словаря и jsonable_encoder
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, model: BaseModel, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        super().__init__(model.model_dump_json().encode("utf-8"), status_code=status_code, headers=headers)
+# AGORA_BLOCK: end:fast_json_response
+
+# AGORA_BLOCK: start:static_json
+class StaticJSON:
+    """
+    Неизменяемый JSON-ответ: тело и ETag вычисляются один раз.
+
+    Клиент с совпадающим If-None-Match получает 304 без тела.
+    """
+
+    def __init__(self, content: Any, cache_control: str = "no-cache"):
+        self.body = dump_json(content)
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+    def response(self, request: Request) -> Response:
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
+# AGORA_BLOCK: end:static_json
+# AGORA_BLOCK: end:json_response
+# AGORA_FILE: end:src/infrastructure/http/jsonResponse.py
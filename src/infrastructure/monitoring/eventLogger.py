@@ -0,0 +1,229 @@
+# AGORA_FILE: start:src/infrastructure/monitoring/eventLogger.py
+# AGORA_BLOCK: start:event_logger
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# AGORA_BLOCK: start:parse_event_limits
+def parse_event_limits(value: Optional[str], cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """Разбор настроек вида "auth.success=0.1,error.occurred=1" """
+    limits: Dict[str, Any] = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, raw = item.split("=", 1)
+            limits[name.strip()] = cast(raw.strip())
+    return limits
+# AGORA_BLOCK: end:parse_event_limits
+
+# AGORA_BLOCK: start:event_sampler
+class EventSampler:
+    """Решение, писать ли событие: доля выборки и лимит событий в секунду по имени"""
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        burst_limits: Optional[Dict[str, int]] = None,
+        default_rate: float = 1.0,
+        default_burst: Optional[int] = None,
+    ):
+        self.sample_rates = sample_rates or {}
+        self.burst_limits = burst_limits or {}
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        # event_name -> (секунда, число событий в ней)
+        self._windows: Dict[str, tuple] = {}
+
+    def allow(self, event_name: str) -> Optional[str]:
+        """None - событие пишется, иначе причина отбрасывания (sampled / burst)"""
+        rate = self.sample_rates.get(event_name, self.default_rate)
+        if rate < 1.0 and random.random() >= rate:
+            return "sampled"
+
+        limit = self.burst_limits.get(event_name, self.default_burst)
+        if limit is not None:
+            second = int(time.monotonic())
+            window_second, count = self._windows.get(event_name, (second, 0))
+            if window_second != second:
+                count = 0
+            if count >= limit:
+                self._windows[event_name] = (second, count)
+                return "burst"
+            self._windows[event_name] = (second, count + 1)
+        return None
+# AGORA_BLOCK: end:event_sampler
+
+# AGORA_BLOCK: start:json_lines_formatter
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись - одна JSON-строка"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None) or record.getMessage(),
+        }
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+# AGORA_BLOCK: end:json_lines_formatter
+
+# AGORA_BLOCK: start:deferred_queue_handler
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке.
+
+    Стандартный prepare() подставляет аргументы в сообщение до постановки в
+    очередь - здесь это делает поток-слушатель. При заполненной очереди запись
+    отбрасывается, а не блокирует цикл событий.
+    """
+
+    def __init__(self, log_queue: queue.Queue, on_drop: Optional[Callable[[str], None]] = None):
+        super().__init__(log_queue)
+        self.on_drop = on_drop
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.on_drop:
+                self.on_drop(getattr(record, "event", None) or record.name)
+# AGORA_BLOCK: end:deferred_queue_handler
+
+# AGORA_BLOCK: start:draining_queue_listener
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener, который при остановке ждет места для маркера в заполненной очереди"""
+
+    def enqueue_sentinel(self) -> None:
+        # Стандартный put_nowait бросает queue.Full, пока поток слушателя не разгрузил очередь
+        self.queue.put(self._sentinel)
+# AGORA_BLOCK: end:draining_queue_listener
+
+# AGORA_BLOCK: start:event_logger_class
+class EventLogger:
+    """
+    Неблокирующий журнал событий.
+
+    Цикл событий только создает LogRecord и кладет его в ограниченную очередь;
+    сериализация в JSON и запись на диск выполняются фоновым QueueListener.
+    Записи уровня WARNING и выше дополнительно выводятся в stderr.
+
+    Слушатель запускается lifespan приложения или, если его никто не запустил
+    (CLI, скрипты, TestClient без with), при первой записи.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sampler: Optional[EventSampler] = None,
+        queue_size: int = 10000,
+        on_drop: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.path = path or os.getenv("AGORA_EVENT_LOG", "logs/events.jsonl")
+        self.sampler = sampler or EventSampler(
+            sample_rates=parse_event_limits(os.getenv("AGORA_EVENT_SAMPLING"), float),
+            burst_limits=parse_event_limits(os.getenv("AGORA_EVENT_BURST"), int),
+        )
+        self.on_drop = on_drop
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = DeferredQueueHandler(self.queue, on_drop=lambda name: self._dropped(name, "queue_full"))
+        self.logger = logging.getLogger("agora.events")
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._file_handler: Optional[logging.Handler] = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+
+    def _dropped(self, event_name: str, reason: str) -> None:
+        if self.on_drop:
+            self.on_drop(event_name, reason)
+
+    # AGORA_BLOCK: start:event_logger_lifecycle
+    def start(self) -> None:
+        """Запуск фонового слушателя (записи, накопленные до старта, тоже будут записаны)"""
+        with self._start_lock:
+            if self._listener is None:
+                self._start_listener()
+
+    def _start_listener(self) -> None:
+        if self.path == "-":
+            self._file_handler = logging.StreamHandler(sys.stdout)
+        else:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file_handler = logging.FileHandler(self.path, encoding="utf-8")
+        self._file_handler.setFormatter(JsonLinesFormatter())
+
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setLevel(logging.WARNING)
+        console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(event)s %(data)s"))
+
+        self._listener = DrainingQueueListener(
+            self.queue, self._file_handler, console_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        if not self._atexit_registered:
+            # Без явного stop() (скрипты) оставшиеся записи пишутся при выходе
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def stop(self) -> None:
+        """Остановка слушателя с записью всех поставленных в очередь событий"""
+        with self._start_lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            self._listener = None
+            self._file_handler.close()
+            self._file_handler = None
+
+    async def check(self) -> str:
+        """Проверка для /health/ready: слушатель запущен и очередь не переполнена"""
+        if self._listener is None:
+            raise RuntimeError("event log listener is not running")
+        fill = self.queue.qsize() / self.queue.maxsize if self.queue.maxsize else 0.0
+        if fill >= 0.9:
+            raise RuntimeError(f"event queue is {fill:.0%} full")
+        return f"queue {fill:.0%} full"
+    # AGORA_BLOCK: end:event_logger_lifecycle
+
+    # AGORA_BLOCK: start:event_logger_emit
+    def emit(self, event_name: str, data: Optional[Dict[str, Any]] = None,
+             level: int = logging.INFO, logger_name: Optional[str] = None) -> bool:
+        """
+        Постановка события в очередь; False, если оно отброшено выборкой или лимитом.
+
+        data сериализуется в фоновом потоке - после вызова его нельзя изменять.
+        """
+        if self._listener is None:
+            self.start()
+        reason = self.sampler.allow(event_name)
+        if reason is not None:
+            self._dropped(event_name, reason)
+            return False
+
+        record = logging.LogRecord(
+            logger_name or self.logger.name, level, "", 0, event_name, None, None
+        )
+        record.event = event_name
+        record.data = data
+        self.handler.handle(record)
+        return True
+    # AGORA_BLOCK: end:event_logger_emit
+# AGORA_BLOCK: end:event_logger_class
+# AGORA_BLOCK: end:event_logger
+# AGORA_FILE: end:src/infrastructure/monitoring/eventLogger.py
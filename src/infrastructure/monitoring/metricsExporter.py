@@ -0,0 +1,55 @@
+# AGORA_FILE: start:src/infrastructure/monitoring/metricsExporter.py
+# AGORA_BLOCK: start:metrics_exporter
+"""
+Отдельный экспортер метрик для запуска с несколькими воркерами.
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/agora-metrics \\
+        python -m src.infrastructure.monitoring.metricsExporter --port 8001
+
+Экспортер агрегирует файлы метрик всех воркеров из PROMETHEUS_MULTIPROC_DIR;
+воркеры при этом могут не занимать порт экспортера вовсе.
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import time
+
+from prometheus_client import start_http_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from src.infrastructure.monitoring.metricsRegistry import create_export_registry, multiprocess_dir
+
+logger = logging.getLogger(__name__)
+
+# AGORA_BLOCK: start:metrics_exporter_main
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Агрегирующий экспортер Prometheus-метрик воркеров")
+    parser.add_argument("--port", type=int, default=int(os.getenv("AGORA_METRICS_PORT", "8001")))
+    parser.add_argument("--clean", action="store_true",
+                        help="Очистить каталог метрик перед стартом (до запуска воркеров)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    directory = multiprocess_dir()
+    if directory is None:
+        logger.error("PROMETHEUS_MULTIPROC_DIR is not set")
+        return 1
+    if args.clean and os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    start_http_server(args.port, registry=create_export_registry())
+    logger.info(f"Aggregating metrics from {directory} on port {args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        return 0
+# AGORA_BLOCK: end:metrics_exporter_main
+
+if __name__ == "__main__":
+    sys.exit(main())
+# AGORA_BLOCK: end:metrics_exporter
+# AGORA_FILE: end:src/infrastructure/monitoring/metricsExporter.py
@@ -0,0 +1,51 @@
+# AGORA_FILE: start:src/infrastructure/monitoring/metricsRegistry.py
+# AGORA_BLOCK: start:metrics_registry
+import logging
+import os
+from typing import Optional
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+logger = logging.getLogger(__name__)
+
+# AGORA_BLOCK: start:metrics_registry_helpers
+def multiprocess_dir() -> Optional[str]:
+    """
+    Каталог файлов метрик для режима нескольких воркеров.
+
+    Переменная PROMETHEUS_MULTIPROC_DIR должна быть задана до запуска процесса
+    (prometheus_client выбирает хранилище значений при импорте), а каталог -
+    очищаться перед стартом всех воркеров.
+    """
+    return os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+
+def create_export_registry() -> Optional[CollectorRegistry]:
+    """
+    Реестр для HTTP-экспортера: в многопроцессном режиме - агрегат файлов
+    всех воркеров, иначе None (используется реестр процесса по умолчанию).
+    """
+    if multiprocess_dir() is None:
+        return None
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def start_metrics_exporter(port: int) -> bool:
+    """
+    Запуск HTTP-экспортера метрик; False, если порт уже занят.
+
+    В многопроцессном режиме любой воркер отдает агрегированные метрики всех
+    процессов, поэтому достаточно, чтобы порт занял один из них.
+    """
+    try:
+        registry = create_export_registry()
+        if registry is None:
+            start_http_server(port)
+        else:
+            start_http_server(port, registry=registry)
+        return True
+    except OSError as e:
+        logger.info(f"Metrics exporter port {port} is busy, metrics are served by another process: {e}")
+        return False
+# AGORA_BLOCK: end:metrics_registry_helpers
+# AGORA_BLOCK: end:metrics_registry
+# AGORA_FILE: end:src/infrastructure/monitoring/metricsRegistry.py
@@ -1,66 +1,170 @@
 # AGORA_FILE: start:src/infrastructure/monitoring/monitoringService.py
 # AGORA_BLOCK: start:monitoring_service
 import logging
+import os
 import time
-from typing import Any, Dict, Optional
-from prometheus_client import Counter, Histogram, Gauge, start_http_server
+from typing import Any, Dict, Optional, Tuple
+from prometheus_client import Counter, Histogram, Gauge, multiprocess
+from src.infrastructure.config.configService import load_environment
+from src.infrastructure.monitoring.metricsRegistry import multiprocess_dir, start_metrics_exporter
+from src.infrastructure.monitoring.rollingStats import RollingStats
+from src.infrastructure.monitoring.eventLogger import EventLogger
+from src.infrastructure.events.eventBus import get_event_bus
 
 logger = logging.getLogger(__name__)
 
+# Метка для запросов, не совпавших ни с одним маршрутом (404, сканеры)
+UNMATCHED_ROUTE = "unmatched"
+KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+
+# AGORA_BLOCK: start:route_label
+def route_label(scope: Dict[str, Any]) -> str:
+    """Шаблон маршрута для меток метрик вместо сырого пути запроса"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else UNMATCHED_ROUTE
+# AGORA_BLOCK: end:route_label
+
 # AGORA_BLOCK: start:monitoring_service_class
 class MonitoringService:
     """Сервис мониторинга и логирования"""
 
     # AGORA_BLOCK: start:init
-    def __init__(self, port: int = 8001):
-        try:
-            # Запуск Prometheus метрик
-            start_http_server(port)
-
-            # Основные метрики
-            self.api_requests = Counter('agora_api_requests_total', 'API requests', ['endpoint', 'method', 'status'])
-            self.api_errors = Counter('agora_api_errors_total', 'API errors', ['endpoint', 'status'])
-            self.active_negotiations = Gauge('agora_active_negotiations', 'Active negotiations count')
-            self.successful_matches = Counter('agora_successful_matches_total', 'Successful matches count')
-            self.request_duration = Histogram('agora_request_duration_seconds', 'Request duration')
-
-            logger.info(f"Monitoring service started on port {port}")
-        except Exception as e:
-            logger.warning(f"Monitoring service already running or port {port} is busy: {e}")
+    def __init__(self, port: Optional[int] = None):
+        # Порт экспортера занимается в start(), а не при создании сервиса
+        self.port = port if port is not None else int(os.getenv("AGORA_METRICS_PORT", "8001"))
+        self.exporter_started = False
+        # Заранее связанные дочерние метрики по набору меток
+        self._request_children: Dict[Tuple[str, str, int], Any] = {}
+        self._error_children: Dict[Tuple[str, int], Any] = {}
+        # Внутрипроцессные агрегаты для /api/v1/metrics (без Prometheus scrape)
+        self.rolling_stats = RollingStats()
+        self.totals = {
+            "requests": 0,
+            "errors": 0,
+            "active_negotiations": 0,
+            "successful_matches": 0,
+        }
+        # Журнал событий: цикл событий только ставит запись в очередь
+        self.event_logger = EventLogger(on_drop=self._on_event_dropped)
+        directory = multiprocess_dir()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        # Метрики создаются всегда, независимо от того, удалось ли занять порт.
+        # Для Gauge задан режим агрегации между воркерами (вне многопроцессного
+        # режима он ни на что не влияет).
+        self.api_requests = Counter('agora_api_requests_total', 'API requests', ['endpoint', 'method', 'status'])
+        self.api_errors = Counter('agora_api_errors_total', 'API errors', ['endpoint', 'status'])
+        self.active_negotiations = Gauge('agora_active_negotiations', 'Active negotiations count', multiprocess_mode='livesum')
+        self.successful_matches = Counter('agora_successful_matches_total', 'Successful matches count')
+        self.request_duration = Histogram('agora_request_duration_seconds', 'Request duration')
+        self.cache_lookups = Counter('agora_cache_lookups_total', 'Cache lookups', ['cache', 'result'])
+        self.cache_size = Gauge('agora_cache_entries', 'Cache entries', ['cache'], multiprocess_mode='livesum')
+        self.cache_evictions = Counter('agora_cache_evictions_total', 'Entries evicted from in-process caches', ['cache', 'reason'])
+        self.error_fingerprints = Counter('agora_error_fingerprints_total', 'Handled errors by fingerprint', ['fingerprint', 'error_type'])
+        self.events_dropped = Counter('agora_events_dropped_total', 'Log events dropped by sampling, burst caps or a full queue', ['event', 'reason'])
+        self.telegram_queue_depth = Gauge('agora_telegram_queue_depth', 'Pending outbound Telegram requests', multiprocess_mode='livesum')
+        self.telegram_send_latency = Histogram('agora_telegram_send_latency_seconds', 'Outbound Telegram request latency from enqueue to delivery', ['method'])
+        self.telegram_rate_limited = Counter('agora_telegram_rate_limited_total', 'Telegram 429 responses')
+        self.http_pool_connections = Gauge('agora_http_pool_connections', 'Outbound HTTP pool connections', ['client', 'state'], multiprocess_mode='livesum')
+        self.http_pool_wait = Histogram('agora_http_pool_wait_seconds', 'Time an outbound request waited for a pooled connection', ['client'],
+                                        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+        self.dependency_up = Gauge('agora_dependency_up', 'Last readiness probe result per dependency (1 - ok)', ['probe'], multiprocess_mode='liveall')
+        self.dependency_probe_latency = Histogram('agora_dependency_probe_seconds', 'Readiness probe latency', ['probe'])
+        self.http_connections_opened = Counter('agora_http_connections_opened_total', 'New outbound HTTP connections', ['client'])
+        self.event_bus_published = Counter('agora_event_bus_published_total', 'Events published to the in-process bus', ['topic'])
+        self.event_bus_delivered = Counter('agora_event_bus_delivered_total', 'Events delivered to bus subscribers', ['topic'])
+        self.event_bus_lag = Histogram('agora_event_bus_lag_seconds', 'Time from publish to delivery to a bus subscriber', ['topic'],
+                                       buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+        self.event_bus_dropped = Counter('agora_event_bus_dropped_total', 'Events dropped by full subscriber queues', ['topic', 'subscriber', 'reason'])
+        self.event_bus_queue_depth = Gauge('agora_event_bus_queue_depth', 'Events waiting in a bus subscriber queue', ['subscriber'], multiprocess_mode='livesum')
     # AGORA_BLOCK: end:init
 
+    # AGORA_BLOCK: start:monitoring_lifecycle
+    def start(self) -> None:
+        """Запуск экспортера метрик и фоновой записи журнала событий"""
+        if not self.exporter_started:
+            self.exporter_started = start_metrics_exporter(self.port)
+            if self.exporter_started:
+                mode = "multiprocess" if multiprocess_dir() else "single process"
+                logger.info(f"Monitoring service started on port {self.port} ({mode})")
+        self.event_logger.start()
+
+    def stop(self) -> None:
+        """Запись оставшихся событий журнала и снятие live-метрик процесса"""
+        self.event_logger.stop()
+        self.mark_process_dead()
+    # AGORA_BLOCK: end:monitoring_lifecycle
+
+    # AGORA_BLOCK: start:mark_process_dead
+    def mark_process_dead(self) -> None:
+        """
+        Удаление live-значений Gauge остановленного воркера из агрегата
+        (в однопроцессном режиме ничего не делает)
+        """
+        if multiprocess_dir() is not None:
+            multiprocess.mark_process_dead(os.getpid())
+    # AGORA_BLOCK: end:mark_process_dead
+
     # AGORA_BLOCK: start:log_event
     def log_event(self, event_name: str, data: Optional[Dict[str, Any]] = None) -> None:
-        """Логирование события"""
-        if data:
-            logger.info(f"Event: {event_name}, Data: {data}")
-        else:
-            logger.info(f"Event: {event_name}")
+        """
+        Логирование события (неблокирующее, с выборкой по имени события) и
+        публикация в шину событий для подписчиков других модулей
+        """
+        self.event_logger.emit(event_name, data)
+        try:
+            get_event_bus().publish_nowait(event_name, data)
+        except TypeError as e:
+            # Данные не соответствуют типу темы: событие уже в журнале, вызывающий не падает
+            logger.error(f"Event '{event_name}' was not published to the bus: {e}")
+
+    def _on_event_dropped(self, event_name: str, reason: str) -> None:
+        """Учет отброшенных событий журнала"""
+        self.events_dropped.labels(event=event_name, reason=reason).inc()
     # AGORA_BLOCK: end:log_event
 
     # AGORA_BLOCK: start:increment_api_requests
     def increment_api_requests(self, endpoint: str, method: str, status: int) -> None:
         """Увеличение счетчика API запросов"""
-        self.api_requests.labels(endpoint=endpoint, method=method, status=status).inc()
+        self.totals["requests"] += 1
+        # Метод нормализуется до ключа кэша: произвольные методы сканеров
+        # не должны размножать ни серии, ни записи в кэше
+        if method not in KNOWN_METHODS:
+            method = "OTHER"
+        key = (endpoint, method, status)
+        child = self._request_children.get(key)
+        if child is None:
+            child = self.api_requests.labels(endpoint=endpoint, method=method, status=status)
+            self._request_children[key] = child
+        child.inc()
     # AGORA_BLOCK: end:increment_api_requests
 
     # AGORA_BLOCK: start:increment_api_errors
     def increment_api_errors(self, endpoint: str, status: int) -> None:
         """Увеличение счетчика ошибок API"""
-        self.api_errors.labels(endpoint=endpoint, status=status).inc()
+        self.totals["errors"] += 1
+        key = (endpoint, status)
+        child = self._error_children.get(key)
+        if child is None:
+            child = self._error_children[key] = self.api_errors.labels(endpoint=endpoint, status=status)
+        child.inc()
     # AGORA_BLOCK: end:increment_api_errors
 
     # AGORA_BLOCK: start:track_negotiation_start
     def track_negotiation_start(self) -> None:
         """Отслеживание начала переговоров"""
+        self.totals["active_negotiations"] += 1
         self.active_negotiations.inc()
     # AGORA_BLOCK: end:track_negotiation_start
 
     # AGORA_BLOCK: start:track_negotiation_end
     def track_negotiation_end(self, success: bool = True) -> None:
         """Отслеживание окончания переговоров"""
+        self.totals["active_negotiations"] -= 1
         self.active_negotiations.dec()
         if success:
+            self.totals["successful_matches"] += 1
             self.successful_matches.inc()
     # AGORA_BLOCK: end:track_negotiation_end
 
@@ -69,9 +173,113 @@ class MonitoringService:
         """Отслеживание длительности запроса"""
         self.request_duration.observe(duration)
     # AGORA_BLOCK: end:track_request_duration
+
+    # AGORA_BLOCK: start:record_request_stats
+    def record_request_stats(self, endpoint: str, status: int, duration: float) -> None:
+        """Учет запроса в скользящих окнах (endpoint - шаблон маршрута)"""
+        self.rolling_stats.record(endpoint, status, duration)
+
+    def get_stats_snapshot(self) -> Dict[str, Any]:
+        """Накопленные счетчики и скользящие окна по маршрутам"""
+        return {
+            "requests_total": self.totals["requests"],
+            "errors_total": self.totals["errors"],
+            "active_negotiations": self.totals["active_negotiations"],
+            "successful_matches": self.totals["successful_matches"],
+            "windows": self.rolling_stats.snapshot(),
+        }
+    # AGORA_BLOCK: end:record_request_stats
+
+    # AGORA_BLOCK: start:track_cache_lookup
+    def track_cache_lookup(self, cache: str, result: str) -> None:
+        """Учет обращений к кэшу (result: hit, shared_hit, miss, stale, coalesced, early_refresh)"""
+        self.cache_lookups.labels(cache=cache, result=result).inc()
+
+    def track_cache_size(self, cache: str, size: int) -> None:
+        """Отслеживание числа записей в кэше"""
+        self.cache_size.labels(cache=cache).set(size)
+
+    def track_cache_eviction(self, cache: str, reason: str) -> None:
+        """Учет вытеснения записей из кэша (reason: size)"""
+        self.cache_evictions.labels(cache=cache, reason=reason).inc()
+    # AGORA_BLOCK: end:track_cache_lookup
+
+    # AGORA_BLOCK: start:track_error_fingerprint
+    def track_error_fingerprint(self, fingerprint: str, error_type: str) -> None:
+        """Учет ошибок по отпечатку"""
+        self.error_fingerprints.labels(fingerprint=fingerprint, error_type=error_type).inc()
+    # AGORA_BLOCK: end:track_error_fingerprint
+
+    # AGORA_BLOCK: start:track_telegram_queue
+    def track_telegram_queue_depth(self, depth: int) -> None:
+        """Отслеживание глубины очереди исходящих запросов в Telegram"""
+        self.telegram_queue_depth.set(depth)
+
+    def track_telegram_send(self, method: str, latency: float) -> None:
+        """Отслеживание задержки доставки запроса в Telegram"""
+        self.telegram_send_latency.labels(method=method).observe(latency)
+
+    def track_telegram_rate_limited(self) -> None:
+        """Учет ответов 429 от Telegram"""
+        self.telegram_rate_limited.inc()
+    # AGORA_BLOCK: end:track_telegram_queue
+
+    # AGORA_BLOCK: start:track_http_pool
+    def track_http_pool(self, client: str, active: int, idle: int) -> None:
+        """Отслеживание занятых и простаивающих соединений пула исходящего клиента"""
+        self.http_pool_connections.labels(client=client, state="active").set(active)
+        self.http_pool_connections.labels(client=client, state="idle").set(idle)
+
+    def track_http_pool_wait(self, client: str, wait: float, new_connection: bool) -> None:
+        """Учет ожидания соединения из пула и открытия новых соединений"""
+        self.http_pool_wait.labels(client=client).observe(wait)
+        if new_connection:
+            self.http_connections_opened.labels(client=client).inc()
+    # AGORA_BLOCK: end:track_http_pool
+
+    # AGORA_BLOCK: start:track_dependency_probe
+    def track_dependency_probe(self, probe: str, ok: bool, latency: float) -> None:
+        """Учет результата фоновой проверки зависимости"""
+        self.dependency_up.labels(probe=probe).set(1 if ok else 0)
+        self.dependency_probe_latency.labels(probe=probe).observe(latency)
+    # AGORA_BLOCK: end:track_dependency_probe
+
+    # AGORA_BLOCK: start:track_event_bus
+    def track_event_published(self, topic: str) -> None:
+        """Учет событий, опубликованных в шину"""
+        self.event_bus_published.labels(topic=topic).inc()
+
+    def track_event_delivered(self, topic: str, lag: float) -> None:
+        """Учет доставки события подписчику и задержки от публикации"""
+        self.event_bus_delivered.labels(topic=topic).inc()
+        self.event_bus_lag.labels(topic=topic).observe(lag)
+
+    def track_event_dropped(self, topic: str, subscriber: str, reason: str) -> None:
+        """Учет событий, отброшенных из-за заполненной очереди подписчика"""
+        self.event_bus_dropped.labels(topic=topic, subscriber=subscriber, reason=reason).inc()
+
+    def track_event_queue_depth(self, subscriber: str, depth: int) -> None:
+        """Отслеживание глубины очереди подписчика шины"""
+        self.event_bus_queue_depth.labels(subscriber=subscriber).set(depth)
+    # AGORA_BLOCK: end:track_event_bus
 # AGORA_BLOCK: end:monitoring_service_class
 
-# Создаем экземпляр сервиса
-monitoring_service = MonitoringService()
+# AGORA_BLOCK: start:get_monitoring_service
+_monitoring_service: Optional[MonitoringService] = None
+
+def get_monitoring_service() -> MonitoringService:
+    """Единственный экземпляр сервиса, создается при первом обращении"""
+    global _monitoring_service
+    if _monitoring_service is None:
+        load_environment()
+        _monitoring_service = MonitoringService()
+    return _monitoring_service
+
+def __getattr__(name: str) -> Any:
+    # Совместимость с `from ... import monitoring_service`
+    if name == "monitoring_service":
+        return get_monitoring_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+# AGORA_BLOCK: end:get_monitoring_service
 # AGORA_BLOCK: end:monitoring_service
 # AGORA_FILE: end:src/infrastructure/monitoring/monitoringService.py
@@ -0,0 +1,198 @@
+# AGORA_FILE: start:src/infrastructure/monitoring/rollingStats.py
+# AGORA_BLOCK: start:rolling_stats
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Логарифмические корзины: от 10 мкс до ~60 с, шаг 2^(1/8) (погрешность квантилей ~4.5%)
+HISTOGRAM_MIN_VALUE = 1e-5
+HISTOGRAM_GROWTH = 2 ** 0.125
+HISTOGRAM_BUCKETS = 1 + math.ceil(math.log(60.0 / HISTOGRAM_MIN_VALUE, HISTOGRAM_GROWTH))
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+# Окна: имя -> (число слотов, длительность слота в секундах)
+DEFAULT_WINDOWS = {
+    "1m": (12, 5.0),
+    "5m": (10, 30.0),
+    "1h": (12, 300.0),
+}
+
+# Нижняя граница интервала для rps: первые запросы не дают всплеска частоты
+MIN_RATE_SECONDS = 1.0
+
+# AGORA_BLOCK: start:log_histogram
+def bucket_index(value: float) -> int:
+    """Номер логарифмической корзины для значения в секундах"""
+    if value <= HISTOGRAM_MIN_VALUE:
+        return 0
+    index = 1 + int(math.log(value / HISTOGRAM_MIN_VALUE) / _LOG_GROWTH)
+    return min(index, HISTOGRAM_BUCKETS - 1)
+
+def bucket_value(index: int) -> float:
+    """Представитель корзины - геометрическая середина ее границ"""
+    if index == 0:
+        return HISTOGRAM_MIN_VALUE
+    return HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** (index - 0.5)
+
+class LogHistogram:
+    """Разреженная гистограмма по логарифмическим корзинам (без хранения выборок)"""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def record_bucket(self, index: int) -> None:
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+
+    def merge(self, other: "LogHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+
+    def quantiles(self, qs: Tuple[float, ...]) -> List[Optional[float]]:
+        """Квантили за один проход по корзинам"""
+        if not self.total:
+            return [None] * len(qs)
+        # Квантиль приходится на корзину, где накопленная сумма достигает q * total
+        targets = sorted((q * self.total, i) for i, q in enumerate(qs))
+        values: List[Optional[float]] = [None] * len(qs)
+        position = 0
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while position < len(targets) and seen >= targets[position][0]:
+                values[targets[position][1]] = bucket_value(index)
+                position += 1
+        return values
+# AGORA_BLOCK: end:log_histogram
+
+# AGORA_BLOCK: start:route_stats
+class RouteStats:
+    """Счетчики одного маршрута в одном слоте"""
+
+    __slots__ = ("requests", "client_errors", "server_errors", "latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.client_errors = 0
+        self.server_errors = 0
+        self.latency = LogHistogram()
+
+    def merge(self, other: "RouteStats") -> None:
+        self.requests += other.requests
+        self.client_errors += other.client_errors
+        self.server_errors += other.server_errors
+        self.latency.merge(other.latency)
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        p50, p95, p99 = self.latency.quantiles((0.5, 0.95, 0.99))
+        errors = self.client_errors + self.server_errors
+        return {
+            "requests": self.requests,
+            "rps": round(self.requests / seconds, 3),
+            "errors": errors,
+            "server_errors": self.server_errors,
+            "error_rate": round(errors / self.requests, 4) if self.requests else 0.0,
+            "latency_ms": {
+                "p50": round(p50 * 1000, 3) if p50 is not None else None,
+                "p95": round(p95 * 1000, 3) if p95 is not None else None,
+                "p99": round(p99 * 1000, 3) if p99 is not None else None,
+            },
+        }
+# AGORA_BLOCK: end:route_stats
+
+# AGORA_BLOCK: start:rolling_window
+class RollingWindow:
+    """Кольцо слотов фиксированной длительности; старые слоты переиспользуются"""
+
+    def __init__(self, slots: int, resolution: float):
+        self.slots = slots
+        self.resolution = resolution
+        self._epochs = [-1] * slots
+        self._data: List[Dict[str, RouteStats]] = [{} for _ in range(slots)]
+        # Время первой записи: до заполнения окна rps считается по прошедшему времени
+        self._first_record: Optional[float] = None
+
+    def record(self, route: str, status: int, bucket: int, now: float) -> None:
+        if self._first_record is None:
+            self._first_record = now
+        epoch = int(now // self.resolution)
+        slot = epoch % self.slots
+        if self._epochs[slot] != epoch:
+            self._epochs[slot] = epoch
+            self._data[slot].clear()
+        stats = self._data[slot].get(route)
+        if stats is None:
+            stats = self._data[slot][route] = RouteStats()
+        stats.requests += 1
+        if status >= 500:
+            stats.server_errors += 1
+        elif status >= 400:
+            stats.client_errors += 1
+        stats.latency.record_bucket(bucket)
+
+    def merged(self, now: float) -> Dict[str, RouteStats]:
+        """Сумма актуальных слотов по маршрутам"""
+        oldest_epoch = int(now // self.resolution) - self.slots + 1
+        result: Dict[str, RouteStats] = {}
+        for epoch, data in zip(self._epochs, self._data):
+            if epoch < oldest_epoch:
+                continue
+            for route, stats in data.items():
+                merged = result.get(route)
+                if merged is None:
+                    merged = result[route] = RouteStats()
+                merged.merge(stats)
+        return result
+
+    def covered(self, now: float) -> float:
+        """Секунды, за которые окно действительно собирало данные (для rps)"""
+        window_start = (int(now // self.resolution) - self.slots + 1) * self.resolution
+        if self._first_record is not None:
+            window_start = max(window_start, self._first_record)
+        return max(now - window_start, MIN_RATE_SECONDS)
+# AGORA_BLOCK: end:rolling_window
+
+# AGORA_BLOCK: start:rolling_stats_class
+class RollingStats:
+    """
+    Скользящие окна (1m/5m/1h) по маршрутам: число запросов, доля ошибок,
+    квантили задержки. Память ограничена числом слотов, маршрутов и корзин.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, Tuple[int, float]]] = None):
+        self.windows = {
+            name: RollingWindow(slots, resolution)
+            for name, (slots, resolution) in (windows or DEFAULT_WINDOWS).items()
+        }
+
+    def record(self, route: str, status: int, duration: float, now: Optional[float] = None) -> None:
+        """Учет одного запроса (duration - в секундах)"""
+        if now is None:
+            now = time.time()
+        bucket = bucket_index(duration)
+        for window in self.windows.values():
+            window.record(route, status, bucket, now)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Сводка по всем окнам: по маршрутам и в целом"""
+        if now is None:
+            now = time.time()
+        result = {}
+        for name, window in self.windows.items():
+            seconds = window.covered(now)
+            routes = window.merged(now)
+            total = RouteStats()
+            for stats in routes.values():
+                total.merge(stats)
+            result[name] = {
+                "total": total.summary(seconds),
+                "routes": {route: stats.summary(seconds) for route, stats in sorted(routes.items())},
+            }
+        return result
+# AGORA_BLOCK: end:rolling_stats_class
+# AGORA_BLOCK: end:rolling_stats
+# AGORA_FILE: end:src/infrastructure/monitoring/rollingStats.py
@@ -0,0 +1,95 @@
+# AGORA_FILE: start:src/infrastructure/monitoring/timingMiddleware.py
+# AGORA_BLOCK: start:timing_middleware
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service, route_label
+
+# Накопленные длительности фаз текущего запроса, нс
+_phase_timings: ContextVar[Optional[Dict[str, int]]] = ContextVar("agora_phase_timings", default=None)
+
+# AGORA_BLOCK: start:timing_phase
+@contextmanager
+def timing_phase(name: str) -> Iterator[None]:
+    """
+    Замер фазы обработки запроса для заголовка Server-Timing.
+
+    Повторные фазы с тем же именем суммируются. Вне запроса ничего не делает.
+    """
+    timings = _phase_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0) + time.perf_counter_ns() - started
+# AGORA_BLOCK: end:timing_phase
+
+# AGORA_BLOCK: start:format_server_timing
+def format_server_timing(timings: Dict[str, int], elapsed_ns: int) -> str:
+    """Заголовок Server-Timing: именованные фазы, остаток обработчика и итог (мс)"""
+    parts = [f"{name};dur={duration / 1e6:.3f}" for name, duration in timings.items()]
+    handler_ns = max(elapsed_ns - sum(timings.values()), 0)
+    parts.append(f"handler;dur={handler_ns / 1e6:.3f}")
+    parts.append(f"total;dur={elapsed_ns / 1e6:.3f}")
+    return ", ".join(parts)
+# AGORA_BLOCK: end:format_server_timing
+
+# AGORA_BLOCK: start:timing_middleware_class
+class TimingMiddleware:
+    """
+    ASGI middleware для учета запросов.
+
+    В отличие от @app.middleware("http") (BaseHTTPMiddleware) не создает
+    отдельную задачу и не оборачивает поток ответа: заголовки X-Process-Time
+    и Server-Timing добавляются в сообщение http.response.start, метрики
+    пишутся после завершения ответа.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter_ns()
+        timings: Dict[str, int] = {}
+        token = _phase_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter_ns() - started
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{elapsed / 1e9:.6f}")
+                headers.append("Server-Timing", format_server_timing(timings, elapsed))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _phase_timings.reset(token)
+            duration = (time.perf_counter_ns() - started) / 1e9
+            route = route_label(scope)
+            monitoring = get_monitoring_service()
+            monitoring.increment_api_requests(
+                endpoint=route,
+                method=scope["method"],
+                status=status_code
+            )
+            monitoring.track_request_duration(duration)
+            monitoring.record_request_stats(route, status_code, duration)
+# AGORA_BLOCK: end:timing_middleware_class
+# AGORA_BLOCK: end:timing_middleware
+# AGORA_FILE: end:src/infrastructure/monitoring/timingMiddleware.py
@@ -0,0 +1,333 @@
+# AGORA_FILE: start:src/integrations/telegram/telegramDispatcher.py
+# AGORA_BLOCK: start:telegram_dispatcher
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Set, Tuple
+
+import httpx
+
+from src.infrastructure.monitoring.monitoringService import get_monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# AGORA_BLOCK: start:telegram_api_error
+class TelegramAPIError(Exception):
+    """Ошибка, возвращенная Telegram Bot API"""
+
+    def __init__(self, method: str, error_code: int, description: str):
+        super().__init__(f"{method}: {error_code} {description}")
+        self.method = method
+        self.error_code = error_code
+        self.description = description
+# AGORA_BLOCK: end:telegram_api_error
+
+# AGORA_BLOCK: start:token_bucket
+class TokenBucket:
+    """Token bucket с возможностью принудительной паузы (retry_after)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд появится токен (0 - доступен сейчас)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds: float, now: float) -> None:
+        """Пауза по требованию сервера: токены начнут копиться только после нее"""
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = self.blocked_until
+# AGORA_BLOCK: end:token_bucket
+
+@dataclass
+class OutboundRequest:
+    """Запрос к Bot API, ожидающий отправки"""
+    method: str
+    payload: Dict[str, Any]
+    chat_id: Any
+    future: asyncio.Future
+    enqueued_at: float
+    attempts: int = 0
+
+# AGORA_BLOCK: start:telegram_dispatcher_class
+class TelegramDispatcher:
+    """
+    Асинхронная очередь исходящих запросов к Telegram Bot API.
+
+    Запросы группируются по chat_id: у каждого чата своя FIFO-очередь и свой
+    token bucket, поверх действует глобальный bucket. Чат, готовый к отправке,
+    попадает в кучу по времени готовности, и фиксированный пул отправителей
+    забирает из нее первый готовый чат - медленный чат не занимает отправителя
+    ожиданием. Ответ 429 ставит чат на паузу retry_after и возвращает запрос
+    в начало его очереди. Общее число ожидающих запросов ограничено:
+    при заполнении submit() ждет освобождения места.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        bot_token: str,
+        api_url: str = "https://api.telegram.org",
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 3,
+    ):
+        self.http_client = http_client
+        self.bot_token = bot_token
+        self.api_url = api_url.rstrip('/')
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._chat_queues: Dict[Any, Deque[OutboundRequest]] = {}
+        # Чаты, которые стоят в куче готовности или обрабатываются отправителем
+        self._active_chats: Set[Any] = set()
+        self._ready: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+
+        self._slots = asyncio.Semaphore(max_queue_size)
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._pending = 0
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Количество запросов, ожидающих доставки"""
+        return self._pending
+
+    # AGORA_BLOCK: start:dispatcher_lifecycle
+    def start(self) -> None:
+        """Запуск пула отправителей (вызывается автоматически при первом submit)"""
+        if self._tasks:
+            return
+        self._closed = False
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"telegram-sender-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Остановка с ожиданием доставки уже поставленных запросов"""
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Telegram dispatcher stopped with {self._pending} undelivered requests")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for queue in self._chat_queues.values():
+            for request in queue:
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError("Telegram dispatcher stopped"))
+        self._chat_queues.clear()
+        self._active_chats.clear()
+        self._ready.clear()
+    # AGORA_BLOCK: end:dispatcher_lifecycle
+
+    # AGORA_BLOCK: start:dispatcher_submit
+    async def submit(self, method: str, payload: Dict[str, Any], chat_id: Any = None) -> asyncio.Future:
+        """
+        Постановка запроса в очередь.
+
+        Возвращает future с полем `result` ответа Bot API. Его можно не ждать
+        (fire-and-forget) - ошибки доставки при этом только логируются.
+        При заполненной очереди корутина ждет свободного места.
+        """
+        if self._closed:
+            raise RuntimeError("Telegram dispatcher is stopped")
+        self.start()
+
+        await self._slots.acquire()
+        request = OutboundRequest(
+            method=method,
+            payload=payload,
+            chat_id=chat_id,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.monotonic()
+        )
+        request.future.add_done_callback(self._on_request_done)
+
+        self._pending += 1
+        self._drained.clear()
+        get_monitoring_service().track_telegram_queue_depth(self._pending)
+
+        self._chat_queues.setdefault(chat_id, deque()).append(request)
+        self._schedule(chat_id)
+        return request.future
+
+    async def call(self, method: str, payload: Dict[str, Any], chat_id: Any = None) -> Any:
+        """Постановка запроса в очередь и ожидание результата"""
+        return await (await self.submit(method, payload, chat_id))
+
+    def _on_request_done(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        self._pending -= 1
+        if self._pending == 0:
+            self._drained.set()
+        get_monitoring_service().track_telegram_queue_depth(self._pending)
+        # Помечаем исключение как полученное: ошибка уже залогирована отправителем
+        if not future.cancelled():
+            future.exception()
+    # AGORA_BLOCK: end:dispatcher_submit
+
+    # AGORA_BLOCK: start:dispatcher_scheduling
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def _schedule(self, chat_id: Any) -> None:
+        """Помещение чата в кучу готовности, если у него есть запросы и он не активен"""
+        if chat_id in self._active_chats or not self._chat_queues.get(chat_id):
+            return
+        now = time.monotonic()
+        ready_at = now + self._chat_bucket(chat_id).delay(now)
+        heapq.heappush(self._ready, (ready_at, next(self._sequence), chat_id))
+        self._active_chats.add(chat_id)
+        self._wakeup.set()
+
+    async def _next_chat(self) -> Any:
+        """Ожидание чата, для которого разрешены и чатовый, и глобальный лимиты"""
+        while True:
+            timeout = None
+            if self._ready:
+                now = time.monotonic()
+                ready_at, _, chat_id = self._ready[0]
+                timeout = max(ready_at - now, self._global_bucket.delay(now))
+                if timeout <= 0:
+                    heapq.heappop(self._ready)
+                    bucket = self._chat_bucket(chat_id)
+                    chat_delay = bucket.delay(now)
+                    if chat_delay > 0:
+                        # Чат успел попасть под retry_after, пока ждал в куче
+                        heapq.heappush(self._ready, (now + chat_delay, next(self._sequence), chat_id))
+                        continue
+                    bucket.consume(now)
+                    self._global_bucket.consume(now)
+                    return chat_id
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._next_chat()
+            queue = self._chat_queues[chat_id]
+            request = queue.popleft()
+            try:
+                await self._send(request)
+            except asyncio.CancelledError:
+                # stop() по таймауту: запрос уже снят с очереди, и его future
+                # не увидит цикл очистки в stop()
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError("Telegram dispatcher stopped"))
+                raise
+            except Exception as e:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                self._active_chats.discard(chat_id)
+                if queue:
+                    self._schedule(chat_id)
+                else:
+                    del self._chat_queues[chat_id]
+                    if len(self._chat_buckets) > self.max_queue_size:
+                        self._prune_buckets()
+
+    def _prune_buckets(self) -> None:
+        """Удаление bucket'ов простаивающих чатов, которые уже полностью восстановились"""
+        now = time.monotonic()
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            if chat_id in self._chat_queues:
+                continue
+            if bucket.delay(now) == 0 and bucket.tokens >= bucket.capacity:
+                del self._chat_buckets[chat_id]
+    # AGORA_BLOCK: end:dispatcher_scheduling
+
+    # AGORA_BLOCK: start:dispatcher_send
+    async def _send(self, request: OutboundRequest) -> None:
+        """Один HTTP-запрос; при 429 или сетевой ошибке запрос возвращается в очередь"""
+        if request.future.done():
+            return
+
+        request.attempts += 1
+        url = f"{self.api_url}/bot{self.bot_token}/{request.method}"
+        retry_after = None
+        try:
+            response = await self.http_client.post(url, json=request.payload)
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            if request.attempts > self.max_retries:
+                logger.error(f"Ошибка отправки {request.method} в Telegram: {e}")
+                raise
+            retry_after = 0.5 * 2 ** request.attempts
+        else:
+            if response.status_code == 429 or data.get("error_code") == 429:
+                get_monitoring_service().track_telegram_rate_limited()
+                retry_after = float(data.get("parameters", {}).get("retry_after", 1))
+                if request.attempts > self.max_retries:
+                    raise TelegramAPIError(request.method, 429, data.get("description", "Too Many Requests"))
+            elif not data.get("ok"):
+                error = TelegramAPIError(
+                    request.method,
+                    data.get("error_code", response.status_code),
+                    data.get("description", "")
+                )
+                logger.error(f"Telegram отклонил запрос: {error}")
+                raise error
+
+        if retry_after is not None:
+            now = time.monotonic()
+            self._chat_bucket(request.chat_id).block(retry_after, now)
+            if request.chat_id is None:
+                self._global_bucket.block(retry_after, now)
+            self._chat_queues[request.chat_id].appendleft(request)
+            return
+
+        get_monitoring_service().track_telegram_send(request.method, time.monotonic() - request.enqueued_at)
+        request.future.set_result(data.get("result"))
+    # AGORA_BLOCK: end:dispatcher_send
+# AGORA_BLOCK: end:telegram_dispatcher_class
+# AGORA_BLOCK: end:telegram_dispatcher
+# AGORA_FILE: end:src/integrations/telegram/telegramDispatcher.py
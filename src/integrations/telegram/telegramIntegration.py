@@ -1,24 +1,31 @@
 # AGORA_FILE: start:src/integrations/telegram/telegramIntegration.py
 # AGORA_BLOCK: start:telegram_integration
 import os
+import re
+import time
 import hashlib
 import hmac
 import json
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from fastapi import HTTPException, status
 from pydantic import BaseModel, field_validator
-import httpx
 import logging
-from urllib.parse import unquote
-from dotenv import load_dotenv
+from urllib.parse import parse_qsl
+from src.infrastructure.config.configService import load_environment
+from src.infrastructure.http.httpClientRegistry import get_http_client_registry
+from src.integrations.telegram.telegramDispatcher import TelegramAPIError, TelegramDispatcher
+from src.infrastructure.cache.asyncTtlCache import AsyncTTLCache
+from src.infrastructure.monitoring.timingMiddleware import timing_phase
 
-# Загружаем переменные окружения
-load_dotenv()
-
-# Настройка логирования
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Имя клиента Telegram в реестре исходящих HTTP клиентов
+TELEGRAM_HTTP_CLIENT = "telegram"
+
+# Формат подписи initData: HMAC-SHA256 в hex
+INIT_DATA_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
 # AGORA_BLOCK: start:telegram_init_data_model
 class TelegramInitData(BaseModel):
     """Модель для валидации initData от Telegram"""
@@ -30,7 +37,10 @@ class TelegramInitData(BaseModel):
     @field_validator('hash')
     @classmethod
     def validate_hash(cls, v):
-        # Временно пропускаем валидацию для разработки
+        # Подпись проверяется в TelegramIntegration.validate_init_data (нужен bot_token),
+        # здесь отсекаем значения, которые заведомо не могут быть подписью
+        if not INIT_DATA_HASH_RE.match(v):
+            raise ValueError("Невалидный формат hash")
         return v
 # AGORA_BLOCK: end:telegram_init_data_model
 
@@ -45,30 +55,93 @@ class TelegramIntegration:
         if not self.bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN не установлен. Проверьте файл .env")
         
-        # Инициализация HTTP клиента
-        self.http_client = httpx.AsyncClient(timeout=10.0)
+        # Секретный ключ для проверки initData вычисляется один раз
+        self.init_data_secret = hmac.new(b"WebAppData", self.bot_token.encode(), hashlib.sha256).digest()
+        
+        # Окно актуальности initData и кэш уже использованных подписей
+        self.init_data_max_age = int(os.getenv('TELEGRAM_INIT_DATA_MAX_AGE', '86400'))
+        self.replay_cache_size = int(os.getenv('TELEGRAM_REPLAY_CACHE_SIZE', '100000'))
+        self._seen_init_data: "OrderedDict[Tuple[str, int], None]" = OrderedDict()
+        
+        # HTTP клиент из общего реестра: отдельный пул к api.telegram.org,
+        # открывается и закрывается в lifespan приложения
+        self.api_url = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+        http_clients = get_http_client_registry()
+        if not http_clients.is_registered(TELEGRAM_HTTP_CLIENT):
+            http_clients.register(
+                TELEGRAM_HTTP_CLIENT,
+                timeout=float(os.getenv('TELEGRAM_HTTP_TIMEOUT', '10')),
+                connect_timeout=float(os.getenv('TELEGRAM_HTTP_CONNECT_TIMEOUT', '5')),
+                max_connections=int(os.getenv('TELEGRAM_HTTP_MAX_CONNECTIONS', '20')),
+                max_keepalive_connections=int(os.getenv('TELEGRAM_HTTP_KEEPALIVE_CONNECTIONS', '10')),
+                # HTTP/2 требует пакет h2 (httpx[http2]), по умолчанию выключен
+                http2=os.getenv('TELEGRAM_HTTP2', '0') == '1'
+            )
+        self.http_client = http_clients.get(TELEGRAM_HTTP_CLIENT)
+        
+        # Очередь исходящих запросов с учетом лимитов Telegram
+        self.dispatcher = TelegramDispatcher(
+            self.http_client,
+            self.bot_token,
+            api_url=self.api_url,
+            workers=int(os.getenv('TELEGRAM_SENDER_WORKERS', '4')),
+            max_queue_size=int(os.getenv('TELEGRAM_QUEUE_SIZE', '1000'))
+        )
+        
+        # Кэш профилей: одновременные логины одного пользователя дают один запрос
+        self.user_info_cache = AsyncTTLCache(
+            "telegram_user_info",
+            self._fetch_user_info,
+            ttl=float(os.getenv('TELEGRAM_USER_CACHE_TTL', '300')),
+            stale_ttl=float(os.getenv('TELEGRAM_USER_CACHE_STALE_TTL', '3600')),
+            max_size=int(os.getenv('TELEGRAM_USER_CACHE_SIZE', '10000'))
+        )
     # AGORA_BLOCK: end:init
     
     # AGORA_BLOCK: start:validate_init_data
     async def validate_init_data(self, init_data: str) -> Dict[str, Any]:
         """
         Валидация initData от Telegram
+        
+        Дешевые проверки (формат, возраст auth_date, повтор) выполняются
+        до вычисления HMAC, чтобы поток мусорных запросов не тратил CPU.
         """
         try:
-            # Парсинг строки запроса
-            data = dict(pair.split('=') for pair in init_data.split('&'))
+            # Парсинг строки запроса за один проход (с URL-декодированием)
+            data = dict(parse_qsl(init_data, keep_blank_values=True, strict_parsing=True))
+            
+            received_hash = data.pop('hash', '')
+            if not INIT_DATA_HASH_RE.match(received_hash):
+                raise ValueError("Отсутствует или невалиден hash")
+            
+            # Проверка актуальности auth_date
+            auth_date = int(data['auth_date'])
+            now = time.time()
+            if now - auth_date > self.init_data_max_age or auth_date > now + 60:
+                raise ValueError("Устаревшие initData")
+            
+            # Защита от повторного использования
+            replay_key = (received_hash, auth_date)
+            if replay_key in self._seen_init_data:
+                raise ValueError("Повторное использование initData")
             
-            # Валидация хеша (временно упрощенная для разработки)
-            if 'hash' not in data:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Невалидные initData"
-                )
+            # Проверка подписи: data-check-string из отсортированных пар key=value
+            data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(data.items()))
+            calculated_hash = hmac.new(
+                self.init_data_secret,
+                data_check_string.encode(),
+                hashlib.sha256
+            ).hexdigest()
+            if not hmac.compare_digest(calculated_hash, received_hash):
+                raise ValueError("Неверная подпись initData")
+            
+            self._remember_init_data(replay_key, now)
             
             # Парсинг вложенных JSON-полей
             if 'user' in data:
-                user_str = unquote(data['user'])
-                data['user'] = json.loads(user_str)
+                data['user'] = json.loads(data['user'])
+            data['auth_date'] = auth_date
+            data['hash'] = received_hash
             
             # Возвращаем валидированные данные
             return data
@@ -81,37 +154,62 @@ class TelegramIntegration:
             )
     # AGORA_BLOCK: end:validate_init_data
     
+    # AGORA_BLOCK: start:remember_init_data
+    def _remember_init_data(self, replay_key: Tuple[str, int], now: float) -> None:
+        """Запоминание использованной подписи с вытеснением устаревших и лишних записей"""
+        self._seen_init_data[replay_key] = None
+        
+        # Записи старше окна актуальности не нужны: такие initData отсекаются по auth_date
+        stale_before = now - self.init_data_max_age
+        while self._seen_init_data:
+            _, oldest_auth_date = next(iter(self._seen_init_data))
+            if oldest_auth_date >= stale_before and len(self._seen_init_data) <= self.replay_cache_size:
+                break
+            self._seen_init_data.popitem(last=False)
+    # AGORA_BLOCK: end:remember_init_data
+    
     # AGORA_BLOCK: start:get_user_info
     async def get_user_info(self, telegram_id: int) -> Optional[Dict[str, Any]]:
         """
-        Получение информации о пользователе из Telegram
+        Получение информации о пользователе из Telegram (через кэш)
         """
         try:
-            return {
-                "id": telegram_id,
-                "first_name": "Test",
-                "last_name": "User",
-                "username": "testuser"
-            }
+            with timing_phase("telegram"):
+                return await self.user_info_cache.get(telegram_id)
         except Exception as e:
             logger.error(f"Ошибка получения информации о пользователе: {e}")
             return None
+    
+    async def _fetch_user_info(self, telegram_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Запрос информации о пользователе у Telegram (без кэша)
+        """
+        return {
+            "id": telegram_id,
+            "first_name": "Test",
+            "last_name": "User",
+            "username": "testuser"
+        }
     # AGORA_BLOCK: end:get_user_info
     
     # AGORA_BLOCK: start:send_message
-    async def send_message(self, chat_id: int, text: str) -> bool:
+    async def send_message(self, chat_id: int, text: str, wait: bool = True) -> bool:
         """
         Отправка сообщения в Telegram
+        
+        Сообщение ставится в очередь диспетчера. При wait=False метод
+        возвращается сразу после постановки в очередь.
         """
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
             payload = {
                 "chat_id": chat_id,
                 "text": text
             }
             
-            response = await self.http_client.post(url, json=payload)
-            response.raise_for_status()
+            with timing_phase("telegram"):
+                delivery = await self.dispatcher.submit("sendMessage", payload, chat_id)
+                if wait:
+                    await delivery
             
             return True
         except Exception as e:
@@ -125,25 +223,68 @@ class TelegramIntegration:
         Создание ссылки-приглашения в чат
         """
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/createChatInviteLink"
             payload = {
                 "chat_id": chat_id,
                 "member_limit": 2
             }
             
-            response = await self.http_client.post(url, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get("result", {}).get("invite_link")
+            with timing_phase("telegram"):
+                result = await self.dispatcher.call("createChatInviteLink", payload, chat_id)
+            return (result or {}).get("invite_link")
             
         except Exception as e:
             logger.error(f"Ошибка создания ссылки-приглашения: {e}")
             return None
     # AGORA_BLOCK: end:create_chat_invite_link
+
+    # AGORA_BLOCK: start:ping
+    async def ping(self) -> str:
+        """
+        Проверка доступности Bot API (getMe) для фоновой проверки готовности.
+
+        Запрос идет напрямую, минуя очередь отправки: проверка не должна
+        ждать за пользовательскими сообщениями.
+        """
+        response = await self.http_client.get(f"{self.api_url}/bot{self.bot_token}/getMe")
+        data = response.json()
+        if not data.get("ok"):
+            raise TelegramAPIError("getMe", data.get("error_code", response.status_code), data.get("description", ""))
+        return f"@{data['result'].get('username')}"
+    # AGORA_BLOCK: end:ping
+
+    # AGORA_BLOCK: start:close
+    async def close(self) -> None:
+        """Доставка сообщений, оставшихся в очереди (HTTP клиент закрывает реестр)"""
+        await self.dispatcher.stop()
+    # AGORA_BLOCK: end:close
 # AGORA_BLOCK: end:telegram_integration_class
 
-# Создаем экземпляр интеграции
-telegram_integration = TelegramIntegration()
+# AGORA_BLOCK: start:get_telegram_integration
+_telegram_integration: Optional[TelegramIntegration] = None
+
+def get_telegram_integration() -> TelegramIntegration:
+    """
+    Единственный экземпляр интеграции, создается при первом обращении
+    (обычно в lifespan приложения), а не при импорте модуля
+    """
+    global _telegram_integration
+    if _telegram_integration is None:
+        load_environment()
+        _telegram_integration = TelegramIntegration()
+    return _telegram_integration
+
+async def close_telegram_integration() -> None:
+    """Закрытие экземпляра интеграции, если он был создан"""
+    global _telegram_integration
+    if _telegram_integration is not None:
+        integration, _telegram_integration = _telegram_integration, None
+        await integration.close()
+
+def __getattr__(name: str) -> Any:
+    # Совместимость с `from ... import telegram_integration`
+    if name == "telegram_integration":
+        return get_telegram_integration()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+# AGORA_BLOCK: end:get_telegram_integration
 # AGORA_BLOCK: end:telegram_integration
 # AGORA_FILE: end:src/integrations/telegram/telegramIntegration.py
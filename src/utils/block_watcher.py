@@ -0,0 +1,325 @@
+# AGORA_BLOCK: start:block_watcher
+# [Описание: Наблюдение за файлами с тегами блоков - живой индекс границ блоков и события изменений]
+# [Зависимости: ctypes, os, select, struct, threading, dataclasses, code_utils]
+# [Автор: AI_Assistant / Версия: 1.0]
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .code_utils import FileTagIndex, block_hash
+
+logger = logging.getLogger(__name__)
+
+# Расширения файлов, в которых теги блоков - комментарии "# AGORA_BLOCK: ..."
+DEFAULT_EXTENSIONS = ('.py', '.yml', '.yaml', '.toml', '.sh')
+SKIP_DIRS = {'.git', '__pycache__', '.pytest_cache', 'node_modules', '.vscode', '.idea', 'venv', 'env', 'dist', 'build', 'logs'}
+
+@dataclass(frozen=True)
+class BlockEvent:
+    """Изменение блока: kind - "added", "removed" или "changed" """
+    kind: str
+    file: str
+    block: str
+
+def iter_source_files(roots: Iterable[str], extensions: Tuple[str, ...]):
+    """Файлы с подходящими расширениями под корнями (без служебных директорий)"""
+    stack = list(roots)
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS and not entry.name.startswith('.'):
+                    stack.append(entry.path)
+            elif entry.name.endswith(extensions):
+                yield entry.path
+
+class PollingBackend:
+    """Обнаружение изменений сравнением mtime и размера файлов раз в interval секунд"""
+
+    name = "polling"
+
+    def __init__(self, roots: List[str], extensions: Tuple[str, ...], stop_event: threading.Event, interval: float = 1.0):
+        self.roots = roots
+        self.extensions = extensions
+        self.interval = interval
+        self._stop = stop_event
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for path in iter_source_files(self.roots, self.extensions):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def poll(self) -> Optional[Set[str]]:
+        """Измененные, созданные и удаленные файлы с прошлого вызова"""
+        self._stop.wait(self.interval)
+        state = self._snapshot()
+        changed = {path for path, signature in state.items() if self._state.get(path) != signature}
+        changed.update(path for path in self._state if path not in state)
+        self._state = state
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyBackend:
+    """
+    Изменения от inotify (Linux, через ctypes): наблюдение за директориями,
+    в том числе за атомарной заменой файлов (os.replace дает IN_MOVED_TO).
+    """
+
+    name = "inotify"
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    EVENT = struct.Struct("iIII")
+    # Сколько ждать остальные события пачки после первого (сохранение файла - несколько событий)
+    SETTLE_SECONDS = 0.05
+
+    @staticmethod
+    def available() -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            return hasattr(libc, 'inotify_init1')
+        except OSError:
+            return False
+
+    def __init__(self, roots: List[str], extensions: Tuple[str, ...], stop_event: threading.Event, interval: float = 0.2):
+        self.extensions = extensions
+        self.interval = interval
+        self._stop = stop_event
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, str] = {}
+        for root in roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, root: str):
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                logger.warning("inotify_add_watch failed for %s: %s", directory, os.strerror(ctypes.get_errno()))
+                continue
+            self._watches[wd] = directory
+            try:
+                with os.scandir(directory) as it:
+                    stack.extend(entry.path for entry in it
+                                 if entry.is_dir(follow_symlinks=False)
+                                 and entry.name not in SKIP_DIRS and not entry.name.startswith('.'))
+            except (FileNotFoundError, PermissionError):
+                continue
+
+    def poll(self) -> Optional[Set[str]]:
+        """Измененные файлы; None - очередь событий переполнена, нужен полный пересмотр"""
+        ready, _, _ = select.select([self._fd], [], [], self.interval)
+        if not ready:
+            return set()
+        # Даем редактору закончить запись (временный файл, переименование и т.п.)
+        self._stop.wait(self.SETTLE_SECONDS)
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0')
+                offset += self.EVENT.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                        # Новая директория: наблюдаем и учитываем уже созданные в ней файлы
+                        self._watch_tree(path)
+                        changed.update(iter_source_files([path], self.extensions))
+                    elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                        changed.add(path + os.sep)
+                elif path.endswith(self.extensions):
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+class BlockWatcher:
+    """
+    Живой индекс блоков: {файл: {имя блока: (строка start, строка end, хэш кода)}}.
+
+    Файлы под roots разбираются один раз при запуске, затем - только при
+    изменении (inotify, иначе опрос mtime). Изменения блоков передаются в
+    callback пачками BlockEvent. Если передан tag_index (например,
+    CodeBlockManager.tag_index), наблюдаемые файлы в нем обновляются
+    watcher'ом, и менеджер берет их из памяти без stat.
+
+    Пути файлов строятся от roots так же, как записаны в кодовой карте
+    (например, roots=["src"] при запуске из корня проекта).
+    """
+
+    def __init__(self, roots: Iterable[str], tag_index: Optional[FileTagIndex] = None,
+                 callback: Optional[Callable[[List[BlockEvent]], None]] = None,
+                 extensions: Tuple[str, ...] = DEFAULT_EXTENSIONS, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        self.roots = list(roots)
+        self.tag_index = tag_index or FileTagIndex()
+        self.callback = callback
+        self.extensions = extensions
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.blocks: Dict[str, Dict[str, Tuple[int, int, str]]] = {}
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def _parse(self, path: str) -> Dict[str, Tuple[int, int, str]]:
+        """Границы и хэши блоков файла (пустой словарь для удаленного или нечитаемого файла)"""
+        self.tag_index.invalidate(path)
+        try:
+            lines, tags = self.tag_index.get(path)
+        except (FileNotFoundError, UnicodeDecodeError, IsADirectoryError):
+            self.tag_index.watched.discard(path)
+            self.tag_index.invalidate(path)
+            return {}
+        self.tag_index.watched.add(path)
+        blocks = {}
+        for (kind, name), starts in tags.items():
+            if kind != 'start':
+                continue
+            # Как CodeBlockManager.find_block_in_file: первый конец после первого начала
+            end = next((i for i in tags.get(('end', name), []) if i >= starts[0]), None)
+            if end is None:
+                continue
+            start = max(i for i in starts if i <= end)
+            blocks[name] = (start, end, block_hash(''.join(lines[start + 1:end])))
+        return blocks
+
+    def refresh(self, paths: Iterable[str]) -> List[BlockEvent]:
+        """Перечитать файлы и вернуть события изменения блоков"""
+        events = []
+        with self._lock:
+            for path in paths:
+                if path.endswith(os.sep):
+                    # Удалена директория - удалены все ее файлы
+                    removed = [known for known in self.blocks if known.startswith(path)]
+                    events.extend(self.refresh(removed))
+                    continue
+                old = self.blocks.get(path, {})
+                new = self._parse(path)
+                if new or os.path.exists(path):
+                    self.blocks[path] = new
+                else:
+                    self.blocks.pop(path, None)
+                for name in new.keys() - old.keys():
+                    events.append(BlockEvent("added", path, name))
+                for name in old.keys() - new.keys():
+                    events.append(BlockEvent("removed", path, name))
+                for name in new.keys() & old.keys():
+                    if new[name][2] != old[name][2]:
+                        events.append(BlockEvent("changed", path, name))
+        return events
+
+    def rescan(self) -> List[BlockEvent]:
+        """Полный пересмотр файлов под roots"""
+        current = set(iter_source_files(self.roots, self.extensions))
+        return self.refresh(sorted(current | set(self.blocks)))
+
+    def get_blocks(self, path: str) -> Dict[str, Tuple[int, int, str]]:
+        return dict(self.blocks.get(path, {}))
+
+    def find(self, name: str) -> List[Tuple[str, int, int]]:
+        """Все вхождения блока: (файл, строка start, строка end)"""
+        return [(path, start, end) for path, blocks in list(self.blocks.items())
+                for block_name, (start, end, _) in blocks.items() if block_name == name]
+
+    def start(self):
+        """Начальный разбор файлов и запуск фонового потока наблюдения"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        # Наблюдение начинается до разбора, чтобы не пропустить изменения во время него
+        if self.use_inotify and InotifyBackend.available():
+            self.backend = InotifyBackend(self.roots, self.extensions, self._stop)
+        else:
+            self.backend = PollingBackend(self.roots, self.extensions, self._stop, self.poll_interval)
+        self.rescan()
+        self._thread = threading.Thread(target=self._run, name="block-watcher", daemon=True)
+        self._thread.start()
+        logger.info("Block watcher started (%s), files: %d", self.backend.name, len(self.blocks))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                changed = self.backend.poll()
+                events = self.rescan() if changed is None else self.refresh(sorted(changed))
+            except Exception:
+                logger.exception("Block watcher failed to process changes")
+                continue
+            if events and self.callback and not self._stop.is_set():
+                try:
+                    self.callback(events)
+                except Exception:
+                    logger.exception("Block watcher callback failed")
+
+    def stop(self):
+        """Остановка наблюдения; tag_index снова проверяет файлы по stat"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.backend.close()
+        self.tag_index.watched.clear()
+
+if __name__ == "__main__":
+    # python -m src.utils.block_watcher [директории...] - печать событий изменения блоков
+    import time
+    logging.basicConfig(level=logging.INFO)
+    watcher = BlockWatcher(sys.argv[1:] or ["src"], callback=lambda events: [print(f"{e.kind}: {e.block} ({e.file})") for e in events])
+    watcher.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+# AGORA_BLOCK: end:block_watcher
@@ -0,0 +1,339 @@
+# AGORA_BLOCK: start:code_map_store
+# [Описание: Хранилища кодовой карты - JSON файл и индексированная SQLite база]
+# [Зависимости: copy, json, os, shutil, sqlite3, tempfile, threading]
+# [Автор: AI_Assistant / Версия: 1.0]
+import copy
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# Расширения файлов, которые открываются как SQLite база
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Разобранные JSON карты: абсолютный путь -> (mtime_ns, size, карта).
+# Каждое хранилище получает свою копию: несохраненные правки одного
+# CodeBlockManager не должны попадать в другие
+_code_map_cache = {}
+
+def write_temp_file(file_path, content):
+    """Запись содержимого во временный файл рядом с целевым (для атомарной замены)"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return temp_path
+
+def atomic_write(file_path, content):
+    """Атомарная запись файла: временный файл + os.replace"""
+    os.replace(write_temp_file(file_path, content), file_path)
+
+class JsonCodeMapStore:
+    """
+    Кодовая карта в JSON файле (исходный формат docs/architecture/code_map.json).
+
+    Карта разбирается целиком при открытии (повторно - только после изменения
+    файла) и целиком перезаписывается при каждом сохранении.
+    """
+
+    def __init__(self, path, create=False):
+        self.path = path
+        if not os.path.exists(path):
+            if not create:
+                raise FileNotFoundError(f"Code map file not found: {path}")
+            self.code_map = {"layers": {}}
+        else:
+            self.code_map = self._load()
+        self._build_indexes()
+
+    def _load(self):
+        key = os.path.abspath(self.path)
+        stat = os.stat(key)
+        cached = _code_map_cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return copy.deepcopy(cached[2])
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            code_map = json.load(f)
+        _code_map_cache[key] = (stat.st_mtime_ns, stat.st_size, code_map)
+        return copy.deepcopy(code_map)
+
+    def _save(self):
+        atomic_write(self.path, json.dumps(self.code_map, indent=2, ensure_ascii=False))
+        key = os.path.abspath(self.path)
+        stat = os.stat(key)
+        _code_map_cache[key] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(self.code_map))
+
+    def _build_indexes(self):
+        """Индексы: ID -> блок, ID -> слой, start_tag -> ID, файл -> ID блоков"""
+        self._blocks = {}
+        self._block_layers = {}
+        self._tag_index = {}
+        self._file_index = {}
+        # ID -> (файл, start_tag), под которыми блок проиндексирован
+        self._indexed = {}
+        for layer_name, layer in self.code_map['layers'].items():
+            for block_id, block_info in layer['modules'].items():
+                self._index_block(block_id, block_info, layer_name)
+
+    def _index_block(self, block_id, block_info, layer_name):
+        self._blocks[block_id] = block_info
+        self._block_layers[block_id] = layer_name
+        self._tag_index.setdefault(block_info['start_tag'], block_id)
+        self._file_index.setdefault(block_info['file'], []).append(block_id)
+        self._indexed[block_id] = (block_info['file'], block_info['start_tag'])
+
+    def get_block(self, block_id):
+        return self._blocks.get(block_id)
+
+    def get_layer(self, block_id):
+        return self._block_layers.get(block_id)
+
+    def has_layer(self, layer):
+        return layer in self.code_map['layers']
+
+    def find_by_tag(self, start_tag):
+        return self._tag_index.get(start_tag)
+
+    def file_blocks(self, file_path):
+        return list(self._file_index.get(file_path, []))
+
+    def files(self):
+        return {file_path: list(block_ids) for file_path, block_ids in self._file_index.items()}
+
+    def iter_blocks(self):
+        """(слой, ID) всех блоков в порядке кодовой карты"""
+        for layer_name, layer in self.code_map['layers'].items():
+            for block_id in layer['modules']:
+                yield layer_name, block_id
+
+    def dependents(self, block_id):
+        return [other_id for other_id, info in self._blocks.items()
+                if block_id in info.get('dependencies', [])]
+
+    def add_block(self, layer, block_info):
+        self.code_map['layers'][layer]['modules'][block_info['id']] = block_info
+        self._index_block(block_info['id'], block_info, layer)
+        self._save()
+
+    def update_blocks(self, block_ids):
+        """Сохранение измененных блоков (словари из get_block изменены на месте)"""
+        if any(self._indexed[block_id] != (self._blocks[block_id]['file'], self._blocks[block_id]['start_tag'])
+               for block_id in block_ids):
+            self._build_indexes()
+        self._save()
+
+    def export(self):
+        """Копия кодовой карты: изменения вносятся только через методы хранилища"""
+        return copy.deepcopy(self.code_map)
+
+    def import_map(self, code_map):
+        self.code_map = code_map
+        self._build_indexes()
+        self._save()
+
+    def close(self):
+        pass
+
+class SqliteCodeMapStore:
+    """
+    Кодовая карта в SQLite базе: таблицы слоев, блоков и зависимостей.
+
+    Поиск по ID, тегу, файлу и зависимости идет по индексам, блок разбирается
+    из JSON только при первом обращении к нему. Изменение блока - одна запись
+    строки (и его зависимостей) вместо перезаписи всей карты.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS layers (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS blocks (
+            id TEXT PRIMARY KEY,
+            layer TEXT NOT NULL REFERENCES layers(name),
+            position INTEGER NOT NULL,
+            file TEXT NOT NULL,
+            start_tag TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS blocks_by_tag ON blocks(start_tag);
+        CREATE INDEX IF NOT EXISTS blocks_by_file ON blocks(file);
+        CREATE INDEX IF NOT EXISTS blocks_by_layer ON blocks(layer, position);
+        CREATE TABLE IF NOT EXISTS dependencies (
+            block_id TEXT NOT NULL,
+            depends_on TEXT NOT NULL,
+            PRIMARY KEY (block_id, depends_on)
+        );
+        CREATE INDEX IF NOT EXISTS dependencies_by_target ON dependencies(depends_on);
+    """
+
+    # Порядок блоков как в исходной карте: по позиции слоя, затем блока
+    ORDER = "ORDER BY (SELECT position FROM layers WHERE name = blocks.layer), blocks.position"
+
+    def __init__(self, path, create=False):
+        if not os.path.exists(path) and not create:
+            raise FileNotFoundError(f"Code map file not found: {path}")
+        self.path = path
+        # Соединение используется и из пула потоков validate_all_blocks
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # ID -> (слой, блок): разобранные блоки, изменяемые на месте
+        self._cache = {}
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _load(self, block_id):
+        cached = self._cache.get(block_id)
+        if cached is None:
+            rows = self._query("SELECT layer, data FROM blocks WHERE id = ?", (block_id,))
+            if not rows:
+                return None
+            cached = self._cache.setdefault(block_id, (rows[0][0], json.loads(rows[0][1])))
+        return cached
+
+    def get_block(self, block_id):
+        cached = self._load(block_id)
+        return cached[1] if cached else None
+
+    def get_layer(self, block_id):
+        cached = self._load(block_id)
+        return cached[0] if cached else None
+
+    def has_layer(self, layer):
+        return bool(self._query("SELECT 1 FROM layers WHERE name = ?", (layer,)))
+
+    def find_by_tag(self, start_tag):
+        rows = self._query(f"SELECT id FROM blocks WHERE start_tag = ? {self.ORDER} LIMIT 1", (start_tag,))
+        return rows[0][0] if rows else None
+
+    def file_blocks(self, file_path):
+        return [row[0] for row in self._query(f"SELECT id FROM blocks WHERE file = ? {self.ORDER}", (file_path,))]
+
+    def files(self):
+        result = {}
+        for file_path, block_id in self._query(f"SELECT file, id FROM blocks {self.ORDER}"):
+            result.setdefault(file_path, []).append(block_id)
+        return result
+
+    def iter_blocks(self):
+        """(слой, ID) всех блоков в порядке кодовой карты"""
+        return self._query(f"SELECT layer, id FROM blocks {self.ORDER}")
+
+    def dependents(self, block_id):
+        return [row[0] for row in self._query(
+            "SELECT block_id FROM dependencies WHERE depends_on = ? ORDER BY block_id", (block_id,))]
+
+    def add_block(self, layer, block_info):
+        with self._lock, self._conn:
+            position = self._conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM blocks WHERE layer = ?", (layer,)).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO blocks (id, layer, position, file, start_tag, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (block_info['id'], layer, position, block_info['file'], block_info['start_tag'],
+                 json.dumps(block_info, ensure_ascii=False)))
+            self._write_dependencies(block_info['id'], block_info)
+        self._cache[block_info['id']] = (layer, block_info)
+
+    def update_blocks(self, block_ids):
+        """Сохранение измененных блоков одной транзакцией - по строке на блок"""
+        with self._lock, self._conn:
+            for block_id in block_ids:
+                block_info = self._cache[block_id][1]
+                self._conn.execute(
+                    "UPDATE blocks SET file = ?, start_tag = ?, data = ? WHERE id = ?",
+                    (block_info['file'], block_info['start_tag'],
+                     json.dumps(block_info, ensure_ascii=False), block_id))
+                self._conn.execute("DELETE FROM dependencies WHERE block_id = ?", (block_id,))
+                self._write_dependencies(block_id, block_info)
+
+    def _write_dependencies(self, block_id, block_info):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO dependencies (block_id, depends_on) VALUES (?, ?)",
+            [(block_id, dependency) for dependency in block_info.get('dependencies', [])])
+
+    def export(self):
+        """Кодовая карта в формате JSON файла (с исходным порядком ключей)"""
+        layers = {}
+        for name, data in self._query("SELECT name, data FROM layers ORDER BY position"):
+            layers[name] = json.loads(data)
+            layers[name]['modules'] = {}
+        for layer, block_id, data in self._query(f"SELECT layer, id, data FROM blocks {self.ORDER}"):
+            layers[layer]['modules'][block_id] = json.loads(data)
+
+        code_map = {}
+        for key, value in self._query("SELECT key, value FROM meta ORDER BY position"):
+            code_map[key] = layers if key == 'layers' else json.loads(value)
+        code_map.setdefault('layers', layers)
+        return code_map
+
+    def import_map(self, code_map):
+        """Замена содержимого базы кодовой картой в формате JSON файла"""
+        with self._lock, self._conn:
+            for table in ('meta', 'layers', 'blocks', 'dependencies'):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.executemany(
+                "INSERT INTO meta (key, position, value) VALUES (?, ?, ?)",
+                [(key, position, 'null' if key == 'layers' else json.dumps(value, ensure_ascii=False))
+                 for position, (key, value) in enumerate(code_map.items())])
+            for layer_position, (layer_name, layer) in enumerate(code_map['layers'].items()):
+                layer_data = {key: value for key, value in layer.items() if key != 'modules'}
+                self._conn.execute(
+                    "INSERT INTO layers (name, position, data) VALUES (?, ?, ?)",
+                    (layer_name, layer_position, json.dumps(layer_data, ensure_ascii=False)))
+                for position, (block_id, block_info) in enumerate(layer['modules'].items()):
+                    self._conn.execute(
+                        "INSERT INTO blocks (id, layer, position, file, start_tag, data) VALUES (?, ?, ?, ?, ?, ?)",
+                        (block_id, layer_name, position, block_info['file'], block_info['start_tag'],
+                         json.dumps(block_info, ensure_ascii=False)))
+                    self._write_dependencies(block_id, block_info)
+        self._cache.clear()
+
+    def close(self):
+        self._conn.close()
+
+def open_code_map_store(path, create=False):
+    """Хранилище кодовой карты по расширению файла (.db/.sqlite - SQLite, иначе JSON)"""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteCodeMapStore(path, create=create)
+    return JsonCodeMapStore(path, create=create)
+
+def convert_code_map(source_path, target_path):
+    """Перенос кодовой карты между хранилищами (JSON -> SQLite и обратно)"""
+    source = open_code_map_store(source_path)
+    target = open_code_map_store(target_path, create=True)
+    try:
+        target.import_map(source.export())
+    finally:
+        source.close()
+        target.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python -m src.utils.code_map_store <источник> <назначение>")
+        print("Пример: python -m src.utils.code_map_store docs/architecture/code_map.json code_map.db")
+        sys.exit(1)
+    convert_code_map(sys.argv[1], sys.argv[2])
+    print(f"✅ Кодовая карта перенесена: {sys.argv[1]} -> {sys.argv[2]}")
+# AGORA_BLOCK: end:code_map_store
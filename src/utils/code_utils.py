@@ -1,53 +1,188 @@
 # AGORA_BLOCK: start:code_utils
 # [Описание: Утилиты для работы с тегированными блоками кода]
-# [Зависимости: json, os, re, datetime]
-# [Автор: AI_Assistant / Версия: 1.0]
-import json
+# [Зависимости: hashlib, os, re, concurrent.futures, datetime, code_map_store]
+# [Автор: AI_Assistant / Версия: 1.3]
+import hashlib
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+
+# Относительный импорт: модуль загружается и как src.utils, и как utils (src/test)
+from .code_map_store import open_code_map_store, write_temp_file
+
+# Тег блока в исходном файле - отдельная строка-комментарий:
+# "# AGORA_BLOCK: start:name" / "# AGORA_BLOCK: end:name"
+BLOCK_TAG_RE = re.compile(r'^\s*#\s*AGORA_BLOCK:\s*(start|end):([^\s#]+)')
+
+def block_hash(content):
+    """Хэш кода блока - текста между строками тегов (поле content_hash кодовой карты)"""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+class FileTagIndex:
+    """
+    Индекс тегов блоков по файлам: строки файла, номера строк с тегами и
+    ошибки вложенности. Все теги файла находятся за один проход по строкам.
+
+    Файл перечитывается только при изменении mtime или размера. Файлы из
+    watched (их обновляет BlockWatcher) при чтении берутся из индекса без
+    stat; fresh=True (перед записью файла) всегда сверяет mtime и размер,
+    так как watcher может еще не увидеть внешнюю правку.
+    """
+    
+    def __init__(self):
+        # путь -> (mtime_ns, size, lines, {(kind, name): [номера строк]}, {name: ошибка})
+        self._files = {}
+        self.watched = set()
+    
+    def _entry(self, file_path, fresh=False):
+        if not fresh and file_path in self.watched:
+            entry = self._files.get(file_path)
+            if entry is not None:
+                return entry
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            self._files.pop(file_path, None)
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        entry = self._files.get(file_path)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        tags = {}
+        events = []
+        for i, line in enumerate(lines):
+            if 'AGORA_BLOCK' not in line:
+                continue
+            match = BLOCK_TAG_RE.match(line)
+            if match:
+                kind, name = match.groups()
+                tags.setdefault((kind, name), []).append(i)
+                events.append((i, kind, name))
+        entry = (stat.st_mtime_ns, stat.st_size, lines, tags, self._check_nesting(events))
+        self._files[file_path] = entry
+        return entry
+    
+    @staticmethod
+    def _check_nesting(events):
+        """Ошибки порядка и вложенности тегов: {имя блока: описание}"""
+        errors = {}
+        stack = []
+        for line_no, kind, name in events:
+            if kind == 'start':
+                stack.append((name, line_no))
+                continue
+            if stack and stack[-1][0] == name:
+                stack.pop()
+            elif any(open_name == name for open_name, _ in stack):
+                # Блок закрыт раньше вложенных в него блоков
+                while stack[-1][0] != name:
+                    inner, inner_line = stack.pop()
+                    errors.setdefault(inner, f"Block '{inner}' (line {inner_line + 1}) crosses end of '{name}' (line {line_no + 1})")
+                    errors.setdefault(name, f"Block '{name}' ends at line {line_no + 1} before nested '{inner}' ends")
+                stack.pop()
+            else:
+                errors.setdefault(name, f"End tag of '{name}' at line {line_no + 1} has no preceding start tag")
+        for name, line_no in stack:
+            errors.setdefault(name, f"Start tag of '{name}' at line {line_no + 1} is never closed")
+        return errors
+    
+    def get(self, file_path, fresh=False):
+        """Строки файла и позиции тегов (с перечитыванием измененного файла)"""
+        entry = self._entry(file_path, fresh)
+        return entry[2], entry[3]
+    
+    def structure_errors(self, file_path):
+        """Ошибки порядка и вложенности тегов файла по именам блоков"""
+        return self._entry(file_path)[4]
+    
+    def invalidate(self, file_path=None):
+        """Сброс индекса файла (или всех файлов)"""
+        if file_path is None:
+            self._files.clear()
+        else:
+            self._files.pop(file_path, None)
+
 class CodeBlockManager:
     def __init__(self, code_map_path="docs/architecture/code_map.json"):
+        """
+        code_map_path - JSON файл кодовой карты или SQLite база (.db/.sqlite),
+        созданная из него: python -m src.utils.code_map_store code_map.json code_map.db
+        """
         self.code_map_path = code_map_path
-        self.code_map = self._load_code_map()
+        self.store = open_code_map_store(code_map_path)
+        self.tag_index = FileTagIndex()
+        # Файлы, измененные этим менеджером (для коммита только их)
+        self.modified_paths = set()
     
-    def _load_code_map(self):
-        """Загрузка кодовой карты из JSON файла"""
-        if not os.path.exists(self.code_map_path):
-            raise FileNotFoundError(f"Code map file not found: {self.code_map_path}")
-        
-        with open(self.code_map_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def close(self):
+        """Закрытие хранилища кодовой карты (соединение с SQLite базой)"""
+        self.store.close()
+    
+    def __enter__(self):
+        return self
     
-    def _save_code_map(self):
-        """Сохранение кодовой карты в JSON файл"""
-        with open(self.code_map_path, 'w', encoding='utf-8') as f:
-            json.dump(self.code_map, f, indent=2, ensure_ascii=False)
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @property
+    def code_map(self):
+        """
+        Кодовая карта целиком, только для чтения: возвращается отдельная копия
+        (для SQLite базы - собирается из таблиц). Изменения - через методы менеджера.
+        """
+        return self.store.export()
     
     def get_block_info(self, block_id):
         """Получение информации о блоке по ID"""
-        for layer in self.code_map['layers'].values():
-            if block_id in layer['modules']:
-                return layer['modules'][block_id]
-        raise ValueError(f"Block with ID '{block_id}' not found in code map")
+        block_info = self.store.get_block(block_id)
+        if block_info is None:
+            raise ValueError(f"Block with ID '{block_id}' not found in code map")
+        return block_info
     
-    def find_block_in_file(self, file_path, start_tag, end_tag):
-        """Поиск границ блока в файле"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"File not found: {file_path}")
+    def get_block_layer(self, block_id):
+        """Слой, к которому относится блок"""
+        self.get_block_info(block_id)
+        return self.store.get_layer(block_id)
+    
+    def find_block_by_tag(self, tag_name):
+        """ID блока по тегу (короткому \"name\" или полному \"# AGORA_BLOCK: start:name\")"""
+        if not tag_name.startswith("# AGORA_BLOCK: start:"):
+            tag_name = f"# AGORA_BLOCK: start:{tag_name}"
+        return self.store.find_by_tag(tag_name)
+    
+    def get_file_blocks(self, file_path):
+        """ID блоков кодовой карты, расположенных в файле"""
+        return self.store.file_blocks(file_path)
+    
+    def get_dependent_blocks(self, block_id):
+        """ID блоков, у которых block_id указан в зависимостях"""
+        return self.store.dependents(block_id)
+    
+    def find_block_in_file(self, file_path, start_tag, end_tag, fresh=False):
+        """Поиск границ блока в файле (fresh=True - с проверкой stat и для наблюдаемых файлов)"""
+        lines, tags = self.tag_index.get(file_path, fresh)
+        
+        start_match = BLOCK_TAG_RE.search(start_tag)
+        end_match = BLOCK_TAG_RE.search(end_tag)
+        if start_match and end_match:
+            starts = tags.get(start_match.groups(), [])
+            ends = tags.get(end_match.groups(), [])
+        else:
+            # Нестандартные теги - поиск подстроки, как раньше
+            starts = [i for i, line in enumerate(lines) if start_tag in line]
+            ends = [i for i, line in enumerate(lines) if end_tag in line]
         
+        # Первый конец после первого начала; начало - ближайшее перед ним
         start_idx = None
         end_idx = None
-        
-        for i, line in enumerate(lines):
-            if start_tag in line:
-                start_idx = i
-            if end_tag in line and start_idx is not None:
-                end_idx = i
-                break
+        if starts:
+            end_idx = next((i for i in ends if i >= starts[0]), None)
+            if end_idx is not None:
+                start_idx = max(i for i in starts if i <= end_idx)
         
         if start_idx is None or end_idx is None:
             raise ValueError(f"Block tags not found in file: {file_path}")
@@ -56,32 +191,103 @@ class CodeBlockManager:
     
     def replace_block(self, block_id, new_code, update_metadata=True):
         """Замена кода в указанном блоке"""
-        block_info = self.get_block_info(block_id)
+        file_path = self.get_block_info(block_id)['file']
+        if not self.replace_blocks({block_id: new_code}, update_metadata):
+            return f"Block '{block_id}' is unchanged in {file_path}"
+        return f"Block '{block_id}' successfully updated in {file_path}"
+    
+    def replace_blocks(self, updates, update_metadata=True):
+        """
+        Пакетная замена кода в нескольких блоках ({block_id: new_code}).
         
-        start_idx, end_idx, lines = self.find_block_in_file(
-            block_info['file'], 
-            block_info['start_tag'], 
-            block_info['end_tag']
-        )
+        Сначала вычисляется новое содержимое всех затронутых файлов (ошибка в
+        любом блоке отменяет весь пакет), затем каждый файл и кодовая карта
+        записываются один раз через временный файл и os.replace.
         
-        # Формируем новый контент блока с сохранением тегов
-        new_lines = (
-            lines[:start_idx + 1] +  # Сохраняем start_tag
-            [new_code + '\n'] +      # Новый код
-            lines[end_idx:]          # Сохраняем end_tag и остальной файл
-        )
+        Блоки, код которых совпадает с новым, пропускаются; если не изменился
+        ни один блок, файлы и кодовая карта не записываются. Возвращает
+        {файл: [ID измененных блоков]}.
+        """
+        by_file = {}
+        new_hashes = {}
+        for block_id, new_code in updates.items():
+            block_info = self.get_block_info(block_id)
+            new_hash = block_hash(new_code + '\n')
+            if new_hash == self._current_hash(block_info, fresh=True):
+                continue
+            new_hashes[block_id] = new_hash
+            by_file.setdefault(block_info['file'], []).append((block_id, block_info, new_code))
+        if not by_file:
+            return {}
+        
+        new_contents = {}
+        for file_path, blocks in by_file.items():
+            new_contents[file_path] = self._apply_block_edits(file_path, blocks)
         
-        # Записываем изменения в файл
-        with open(block_info['file'], 'w', encoding='utf-8') as f:
-            f.writelines(new_lines)
+        # Все временные файлы готовы до замены первого исходного файла
+        prepared = []
+        try:
+            for file_path, content in new_contents.items():
+                prepared.append((write_temp_file(file_path, content), file_path))
+        except Exception:
+            for temp_path, _ in prepared:
+                os.unlink(temp_path)
+            raise
+        for temp_path, file_path in prepared:
+            os.replace(temp_path, file_path)
+            self.tag_index.invalidate(file_path)
+            self.modified_paths.add(file_path)
         
         # Обновляем метаданные
         if update_metadata:
-            block_info['last_modified'] = datetime.now().isoformat()
-            block_info['version'] = self._increment_version(block_info['version'])
-            self._save_code_map()
+            now = datetime.now().isoformat()
+            for block_id, new_hash in new_hashes.items():
+                block_info = self.get_block_info(block_id)
+                block_info['last_modified'] = now
+                block_info['version'] = self._increment_version(block_info['version'])
+                block_info['content_hash'] = new_hash
+            self.store.update_blocks(list(new_hashes))
+            self.modified_paths.add(self.code_map_path)
         
-        return f"Block '{block_id}' successfully updated in {block_info['file']}"
+        return {file_path: [block_id for block_id, _, _ in blocks] for file_path, blocks in by_file.items()}
+    
+    def _current_hash(self, block_info, fresh=False):
+        """Хэш текущего кода блока в файле"""
+        start_idx, end_idx, lines = self.find_block_in_file(
+            block_info['file'],
+            block_info['start_tag'],
+            block_info['end_tag'],
+            fresh
+        )
+        return block_hash(''.join(lines[start_idx + 1:end_idx]))
+    
+    def _apply_block_edits(self, file_path, blocks):
+        """
+        Новое содержимое файла после замены блоков (правки применяются с конца файла).
+        Файл сверяется по stat: содержимое строится из его текущих строк, а не
+        из индекса watcher'а, иначе внешняя правка была бы затерта.
+        """
+        spans = []
+        lines = None
+        for block_id, block_info, new_code in blocks:
+            start_idx, end_idx, lines = self.find_block_in_file(
+                file_path,
+                block_info['start_tag'],
+                block_info['end_tag'],
+                fresh=True
+            )
+            spans.append((start_idx, end_idx, block_id, new_code))
+        
+        spans.sort()
+        for (start_a, end_a, id_a, _), (start_b, end_b, id_b, _) in zip(spans, spans[1:]):
+            if start_b <= end_a:
+                raise ValueError(f"Blocks '{id_a}' and '{id_b}' overlap in {file_path}, update them separately")
+        
+        new_lines = list(lines)
+        for start_idx, end_idx, _, new_code in reversed(spans):
+            # Сохраняем start_tag и end_tag, заменяем код между ними
+            new_lines[start_idx + 1:end_idx] = [new_code + '\n']
+        return ''.join(new_lines)
     
     def get_block_content(self, block_id):
         """Получение текущего содержимого блока"""
@@ -98,32 +304,102 @@ class CodeBlockManager:
         return ''.join(block_lines).strip()
     
     def validate_block_integrity(self, block_id):
-        """Проверка целостности блока (наличие обоих тегов)"""
+        """Проверка целостности блока (наличие обоих тегов, порядок и вложенность)"""
         block_info = self.get_block_info(block_id)
-        
+        return self._validate_file(block_info['file'], [block_id])[block_id]
+    
+    def _validate_file(self, file_path, block_ids):
+        """Проверка всех блоков одного файла по одному индексу его тегов"""
         try:
-            self.find_block_in_file(
-                block_info['file'], 
-                block_info['start_tag'], 
-                block_info['end_tag']
-            )
-            return True, "Block integrity validated"
-        except ValueError as e:
-            return False, str(e)
+            self.tag_index.get(file_path)
+            structure_errors = self.tag_index.structure_errors(file_path)
+        except (FileNotFoundError, UnicodeDecodeError) as e:
+            return {block_id: (False, str(e)) for block_id in block_ids}
+        
+        results = {}
+        for block_id in block_ids:
+            block_info = self.get_block_info(block_id)
+            start_match = BLOCK_TAG_RE.search(block_info['start_tag'])
+            try:
+                self.find_block_in_file(file_path, block_info['start_tag'], block_info['end_tag'])
+            except ValueError as e:
+                results[block_id] = (False, str(e))
+                continue
+            error = structure_errors.get(start_match.group(2)) if start_match else None
+            results[block_id] = (False, error) if error else (True, "Block integrity validated")
+        return results
     
-    def validate_all_blocks(self):
-        """Проверка целостности всех блоков"""
+    def validate_all_blocks(self, max_workers=None):
+        """
+        Проверка целостности всех блоков.
+        
+        Блоки группируются по файлам: каждый файл читается и разбирается один
+        раз для всех своих блоков, файлы проверяются параллельно в пуле потоков.
+        """
+        files = list(self.store.files().items())
+        results_by_block = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for file_results in executor.map(lambda item: self._validate_file(*item), files):
+                results_by_block.update(file_results)
+        
         results = {}
-        for layer_name, layer in self.code_map['layers'].items():
-            for block_id in layer['modules']:
-                is_valid, message = self.validate_block_integrity(block_id)
-                results[block_id] = {
-                    'valid': is_valid,
-                    'message': message,
-                    'layer': layer_name
-                }
+        for layer_name, block_id in self.store.iter_blocks():
+            is_valid, message = results_by_block[block_id]
+            results[block_id] = {
+                'valid': is_valid,
+                'message': message,
+                'layer': layer_name
+            }
         return results
     
+    def _drift_in_file(self, file_path, block_ids):
+        """Блоки файла, код которых не совпадает с content_hash кодовой карты"""
+        drifted = {}
+        for block_id in block_ids:
+            block_info = self.get_block_info(block_id)
+            try:
+                current_hash = self._current_hash(block_info)
+            except (FileNotFoundError, UnicodeDecodeError, ValueError) as e:
+                drifted[block_id] = str(e)
+                continue
+            if 'content_hash' not in block_info:
+                drifted[block_id] = "No content hash in code map"
+            elif block_info['content_hash'] != current_hash:
+                drifted[block_id] = "Block content differs from code map"
+        return drifted
+    
+    def find_drifted_blocks(self, max_workers=None):
+        """
+        Блоки, код которых изменился в обход кодовой карты: {block_id: причина}.
+        
+        Сравниваются хэши кода блоков с content_hash; файлы обрабатываются
+        параллельно, каждый читается один раз.
+        """
+        drifted = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for file_drift in executor.map(lambda item: self._drift_in_file(*item), self.store.files().items()):
+                drifted.update(file_drift)
+        return drifted
+    
+    def record_content_hashes(self, block_ids=None):
+        """Запись текущих хэшей кода блоков в кодовую карту (по умолчанию - всех доступных)"""
+        if block_ids is None:
+            block_ids = [block_id for _, block_id in self.store.iter_blocks()]
+        recorded = []
+        for block_id in block_ids:
+            block_info = self.get_block_info(block_id)
+            try:
+                current_hash = self._current_hash(block_info)
+            except (FileNotFoundError, UnicodeDecodeError, ValueError):
+                continue
+            if block_info.get('content_hash') != current_hash:
+                block_info['content_hash'] = current_hash
+                recorded.append(block_id)
+        if recorded:
+            self.store.update_blocks(recorded)
+            self.modified_paths.add(self.code_map_path)
+        return recorded
+    
     def _increment_version(self, version):
         """Инкремент версии (семантическое версионирование)"""
         try:
@@ -138,13 +414,12 @@ class CodeBlockManager:
             dependencies = []
         
         # Определяем слой для добавления
-        if layer not in self.code_map['layers']:
+        if not self.store.has_layer(layer):
             raise ValueError(f"Layer '{layer}' not found in code map")
         
         # Проверяем уникальность ID
-        for l in self.code_map['layers'].values():
-            if block_id in l['modules']:
-                raise ValueError(f"Block ID '{block_id}' already exists")
+        if self.store.get_block(block_id) is not None:
+            raise ValueError(f"Block ID '{block_id}' already exists")
         
         # Создаем запись о новом блоке
         new_block = {
@@ -159,8 +434,8 @@ class CodeBlockManager:
             "last_modified": datetime.now().isoformat()
         }
         
-        self.code_map['layers'][layer]['modules'][block_id] = new_block
-        self._save_code_map()
+        self.store.add_block(layer, new_block)
+        self.modified_paths.add(self.code_map_path)
         
         return f"New block '{block_id}' created in layer '{layer}'"
 # Пример использования
@@ -1,28 +1,95 @@
 # AGORA_BLOCK: start:git_integration
 # [Описание: Интеграция с Git для автоматического коммита изменений]
-# [Зависимости: subprocess]
-# [Автор: AI_Assistant / Версия: 1.0]
+# [Зависимости: collections, logging, subprocess, time]
+# [Автор: AI_Assistant / Версия: 1.1]
+import logging
 import subprocess
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
 class GitIntegration:
+    # Последние вызовы git: (подкоманда, длительность в секундах)
+    timings = deque(maxlen=100)
+
     @staticmethod
-    def commit_changes(block_id, message=None):
-        """Автоматический коммит изменений с указанием ID блока"""
+    def _run(args):
+        """Вызов git с замером времени"""
+        started = time.perf_counter()
+        try:
+            return subprocess.run(["git", *args], check=True, capture_output=True, text=True)
+        finally:
+            elapsed = time.perf_counter() - started
+            GitIntegration.timings.append((args[0], elapsed))
+            logger.debug("git %s: %.1f ms", args[0], elapsed * 1000)
+
+    @staticmethod
+    def commit_changes(block_id, message=None, paths=None):
+        """
+        Автоматический коммит изменений с указанием ID блока.
+
+        paths - файлы, измененные обновлением (CodeBlockManager.modified_paths):
+        индексируются и коммитятся только они. Без paths индексируется
+        все рабочее дерево, как раньше.
+        """
         if message is None:
             message = f"AI update: Modified block '{block_id}'"
-        
+
         try:
-            # Добавляем измененные файлы
-            subprocess.run(["git", "add", "."], check=True)
-            
-            # Создаем коммит
-            subprocess.run(
-                ["git", "commit", "-m", message],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
+            if paths:
+                paths = sorted(set(paths))
+                # Добавляем только измененные файлы; коммит не захватывает чужие staged изменения
+                GitIntegration._run(["add", "--", *paths])
+                GitIntegration._run(["commit", "-m", message, "--", *paths])
+            else:
+                GitIntegration._run(["add", "."])
+                GitIntegration._run(["commit", "-m", message])
+
             return f"Changes committed: {message}"
         except subprocess.CalledProcessError as e:
             return f"Git commit failed: {e.stderr}"
+
+class CommitQueue:
+    """
+    Очередь коммитов: несколько обновлений блоков - один коммит.
+
+    with CommitQueue() as queue:
+        manager.replace_block(...)
+        queue.add([block_id], manager.modified_paths)
+    # коммит при выходе из блока with (если не было исключения)
+    """
+
+    def __init__(self):
+        self.block_ids = []
+        self.paths = set()
+
+    def add(self, block_ids, paths):
+        for block_id in block_ids:
+            if block_id not in self.block_ids:
+                self.block_ids.append(block_id)
+        self.paths.update(paths)
+
+    def __len__(self):
+        return len(self.block_ids)
+
+    def flush(self, message=None):
+        """
+        Коммит накопленных изменений (None, если очередь пуста).
+        При ошибке коммита очередь сохраняется для повторного flush.
+        """
+        if not self.block_ids:
+            return None
+        result = GitIntegration.commit_changes(", ".join(self.block_ids), message, self.paths)
+        if result.startswith("Changes committed"):
+            self.block_ids = []
+            self.paths = set()
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
 # AGORA_BLOCK: end:git_integration
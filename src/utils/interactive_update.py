@@ -6,35 +6,41 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.utils.code_utils import CodeBlockManager
-from src.utils.git_integration import GitIntegration
+from src.utils.git_integration import CommitQueue
 
 def interactive_update():
-    manager = CodeBlockManager()
-    
-    print("Доступные блоки:")
-    for layer_name, layer in manager.code_map['layers'].items():
-        for block_id in layer['modules']:
-            print(f"- {block_id} ({layer_name})")
-    
-    block_id = input("Введите ID блока для обновления: ")
-    
-    print("Введите новый код (завершите пустой строкой):")
-    lines = []
-    while True:
-        line = input()
-        if line == "":
-            break
-        lines.append(line)
-    
-    new_code = "\n".join(lines)
-    
-    result = manager.replace_block(block_id, new_code)
-    print(result)
-    
-    commit = input("Сделать коммит? (y/n): ")
-    if commit.lower() == 'y':
-        GitIntegration.commit_changes(block_id)
-        print("Changes committed to Git")
+    with CodeBlockManager() as manager:
+        print("Доступные блоки:")
+        for layer_name, layer in manager.code_map['layers'].items():
+            for block_id in layer['modules']:
+                print(f"- {block_id} ({layer_name})")
+        
+        # Все обновления сессии коммитятся одним коммитом
+        queue = CommitQueue()
+        while True:
+            block_id = input("Введите ID блока для обновления: ")
+            
+            print("Введите новый код (завершите пустой строкой):")
+            lines = []
+            while True:
+                line = input()
+                if line == "":
+                    break
+                lines.append(line)
+            
+            new_code = "\n".join(lines)
+            
+            result = manager.replace_block(block_id, new_code)
+            print(result)
+            if "successfully updated" in result:
+                queue.add([block_id], manager.modified_paths)
+            
+            if input("Обновить еще один блок? (y/n): ").lower() != 'y':
+                break
+        
+        commit = input(f"Сделать коммит ({len(queue)} блоков)? (y/n): ")
+        if commit.lower() == 'y':
+            print(queue.flush())
 
 if __name__ == "__main__":
     interactive_update()
@@ -0,0 +1,180 @@
+# AGORA_BLOCK: start:project_snapshot
+# [Описание: Снимок проекта с произвольным доступом - сжатые сегменты файлов и индекс]
+# [Зависимости: codecs, hashlib, json, mmap, struct, zlib]
+# [Автор: AI_Assistant / Версия: 1.0]
+import codecs
+import hashlib
+import json
+import mmap
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+# Формат файла:
+#   заголовок: MAGIC, смещение и длина индекса (uint64, little-endian)
+#   сегменты: содержимое файлов частями по SEGMENT_SIZE байт, каждая сжата zlib отдельно
+#   индекс: сжатый zlib JSON - путь, смещение, длина, размер, хэш и длины сегментов файлов
+MAGIC = b"AGSNAP1\0"
+HEADER = struct.Struct("<8sQQ")
+SEGMENT_SIZE = 64 * 1024
+
+# Оценка размера токена для чанков с бюджетом токенов (без токенизатора)
+CHARS_PER_TOKEN = 4
+
+def content_hash(data: bytes) -> str:
+    """Хэш содержимого файла для индекса и манифеста"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def compress_segments(data: bytes, segment_size: int = SEGMENT_SIZE) -> List[bytes]:
+    """Сжатие содержимого независимыми сегментами (можно вызывать из пула потоков)"""
+    return [zlib.compress(data[i:i + segment_size]) for i in range(0, len(data), segment_size)] or [zlib.compress(b"")]
+
+class SnapshotWriter:
+    """
+    Потоковая запись снимка: сегменты пишутся сразу, в памяти остается только индекс.
+
+    Используется как контекстный менеджер; индекс и заголовок записываются в close().
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict] = None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.entries: List[Dict] = []
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, 0, 0))
+
+    def add_file(self, path: str, segments: List[bytes], **meta) -> Dict:
+        """Запись сжатых сегментов файла (результат compress_segments); meta - хэш, размер и т.п."""
+        offset = self._file.tell()
+        for segment in segments:
+            self._file.write(segment)
+        entry = {"path": path, **meta, "offset": offset, "length": self._file.tell() - offset,
+                 "segments": [len(segment) for segment in segments]}
+        self.entries.append(entry)
+        return entry
+
+    def add_entry(self, path: str, **meta) -> Dict:
+        """Запись файла без содержимого (бинарный или непрочитанный файл)"""
+        entry = {"path": path, **meta}
+        self.entries.append(entry)
+        return entry
+
+    def copy_file(self, reader: "SnapshotReader", entry: Dict) -> Dict:
+        """Перенос файла из предыдущего снимка без распаковки"""
+        if "segments" not in entry:
+            return self.add_entry(**entry)
+        offset = self._file.tell()
+        self._file.write(reader.raw(entry))
+        new_entry = dict(entry, offset=offset)
+        self.entries.append(new_entry)
+        return new_entry
+
+    def close(self):
+        if self._file.closed:
+            return
+        index = zlib.compress(json.dumps({**self.metadata, "files": self.entries}, ensure_ascii=False).encode("utf-8"))
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, index_offset, len(index)))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class SnapshotReader:
+    """
+    Чтение снимка через mmap: при открытии распаковывается только индекс,
+    содержимое файла - только его сегменты (и только нужные для чанков).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, index_offset, index_length = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or index_offset == 0:
+                raise ValueError(f"Not a project snapshot: {path}")
+            index = json.loads(zlib.decompress(self._mmap[index_offset:index_offset + index_length]))
+        except Exception:
+            self._mmap.close()
+            raise
+        self.files: List[Dict] = index.pop("files")
+        self.metadata: Dict = index
+        self._by_path = {entry["path"]: entry for entry in self.files}
+
+    def entry(self, path: str) -> Dict:
+        try:
+            return self._by_path[path]
+        except KeyError:
+            raise KeyError(f"File not found in snapshot: {path}")
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+    def raw(self, entry: Dict) -> bytes:
+        """Сжатые сегменты файла как есть"""
+        return self._mmap[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def _segments(self, entry: Dict) -> Iterator[bytes]:
+        if "segments" not in entry:
+            raise ValueError(entry.get("error") or f"File content is not stored in snapshot: {entry['path']}")
+        offset = entry["offset"]
+        for length in entry["segments"]:
+            yield zlib.decompress(self._mmap[offset:offset + length])
+            offset += length
+
+    def read_bytes(self, path: str) -> bytes:
+        return b"".join(self._segments(self.entry(path)))
+
+    def read_file(self, path: str) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """Строки файла (с переводами строк); сегменты распаковываются по одному"""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        for segment in self._segments(self.entry(path)):
+            lines = (pending + decoder.decode(segment)).splitlines(keepends=True)
+            # Последняя строка сегмента может продолжаться в следующем
+            pending = lines.pop() if lines else ""
+            yield from lines
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    def iter_chunks(self, path: str, max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Содержимое файла чанками не больше max_tokens (оценка CHARS_PER_TOKEN
+        символов на токен). Чанки режутся по границам строк, слишком длинная
+        строка - по бюджету.
+        """
+        budget = max_tokens * CHARS_PER_TOKEN
+        chunk: List[str] = []
+        size = 0
+        for line in self.iter_lines(path):
+            if chunk and size + len(line) > budget:
+                yield "".join(chunk)
+                chunk, size = [], 0
+            while len(line) > budget:
+                yield line[:budget]
+                line = line[budget:]
+            if line:
+                chunk.append(line)
+                size += len(line)
+        if chunk:
+            yield "".join(chunk)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+# AGORA_BLOCK: end:project_snapshot
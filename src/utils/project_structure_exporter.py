@@ -1,145 +1,324 @@
 # AGORA_BLOCK: start:project_structure_exporter
-import os
+import argparse
 import datetime
-from typing import List, Set
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Добавляем корневую директорию проекта в sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.utils.project_snapshot import SnapshotReader, SnapshotWriter, compress_segments, content_hash
+
+# Файл проекта: (относительный путь, полный путь, os.stat_result)
+FileRecord = Tuple[str, str, os.stat_result]
+
+BINARY_MARKER = "[БИНАРНЫЙ ФАЙЛ - СОДЕРЖИМОЕ НЕ ПРОЧИТАНО]"
 
 class ProjectStructureExporter:
-    def __init__(self, root_path: str = ".", output_file: str = "project_structure.txt"):
+    # Сколько первых байт файла проверяется на нулевые байты (признак бинарного файла)
+    SNIFF_SIZE = 8192
+
+    def __init__(self, root_path: str = ".", output_file: str = "project_structure.txt",
+                 output_format: str = "text", max_workers: Optional[int] = None):
+        """
+        output_format - "text" (один читаемый файл) или "snapshot" (сжатые
+        сегменты и индекс для произвольного доступа, см. project_snapshot).
+        """
+        if output_format not in ("text", "snapshot"):
+            raise ValueError(f"Unknown output format: {output_format}")
         self.root_path = os.path.abspath(root_path)
         self.output_file = output_file
+        self.output_format = output_format
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        # Манифест текстового экспорта: путь, mtime, размер, хэш и положение содержимого в файле
+        self.manifest_file = output_file + ".manifest.json"
         self.text_extensions = {'.py', '.txt', '.json', '.md', '.yml', '.yaml', '.env', '.ini', '.cfg', '.toml', '.xml', '.html', '.css', '.js', '.sql', '.sh', '.bat', '.ps1', '.gitignore', '.dockerignore'}
         self.skip_dirs = {'.git', '__pycache__', '.pytest_cache', 'node_modules', '.vscode', '.idea', 'venv', 'env', 'dist', 'build'}
-        
+
     def should_skip_directory(self, dir_name: str) -> bool:
         """Проверить, нужно ли пропустить директорию"""
         return dir_name in self.skip_dirs or dir_name.startswith('.')
-    
+
     def should_read_file(self, file_path: str) -> bool:
         """Проверить, нужно ли читать содержимое файла"""
         _, ext = os.path.splitext(file_path)
         return ext.lower() in self.text_extensions
-    
+
+    def _own_files(self) -> set:
+        """Файлы самого экспорта - не попадают в результат"""
+        output = os.path.abspath(self.output_file)
+        return {output, output + ".tmp", os.path.abspath(self.manifest_file)}
+
+    def scan(self) -> Tuple[List[str], List[FileRecord]]:
+        """Один проход os.scandir: строки иерархии и файлы проекта (отсортированные по пути)"""
+        structure: List[str] = []
+        files: List[FileRecord] = []
+        self._scan_directory(self.root_path, "", structure, files, self._own_files())
+        files.sort(key=lambda record: record[0])
+        return structure, files
+
     def get_directory_structure(self, path: str, prefix: str = "") -> List[str]:
         """Рекурсивно получить структуру директорий"""
-        structure = []
+        structure: List[str] = []
+        self._scan_directory(path, prefix, structure, [], self._own_files())
+        return structure
+
+    def _scan_directory(self, path: str, prefix: str, structure: List[str], files: List[FileRecord], excluded: set):
         try:
-            items = sorted(os.listdir(path))
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
         except PermissionError:
-            return structure
-        
+            return
+
         dirs = []
-        files = []
-        for item in items:
-            full_path = os.path.join(path, item)
-            if os.path.isdir(full_path):
-                if not self.should_skip_directory(item):
-                    dirs.append(item)
+        file_entries = []
+        for entry in entries:
+            if entry.path in excluded:
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not self.should_skip_directory(entry.name):
+                    dirs.append(entry)
             else:
-                files.append(item)
-        
+                file_entries.append(entry)
+
         # Сначала директории
-        for i, dir_name in enumerate(dirs):
-            is_last_dir = i == len(dirs) - 1 and len(files) == 0
+        for i, entry in enumerate(dirs):
+            is_last_dir = i == len(dirs) - 1 and len(file_entries) == 0
             current_prefix = "└── " if is_last_dir else "├── "
-            structure.append(prefix + current_prefix + dir_name + "/")
-            
-            next_prefix = prefix + ("    " if is_last_dir else "│   ")
-            structure.extend(self.get_directory_structure(os.path.join(path, dir_name), next_prefix))
-        
+            structure.append(prefix + current_prefix + entry.name + "/")
+
+            # По символическим ссылкам на директории не спускаемся (как os.walk)
+            if not entry.is_symlink():
+                next_prefix = prefix + ("    " if is_last_dir else "│   ")
+                self._scan_directory(entry.path, next_prefix, structure, files, excluded)
+
         # Затем файлы
-        for i, file_name in enumerate(files):
-            is_last_file = i == len(files) - 1
+        for i, entry in enumerate(file_entries):
+            is_last_file = i == len(file_entries) - 1
             current_prefix = "└── " if is_last_file else "├── "
-            structure.append(prefix + current_prefix + file_name)
-        
-        return structure
-    
+            structure.append(prefix + current_prefix + entry.name)
+            try:
+                files.append((os.path.relpath(entry.path, self.root_path), entry.path, entry.stat()))
+            except OSError:
+                continue
+
+    def _read_text(self, file_path: str) -> Optional[str]:
+        """
+        Текст файла (None для бинарного). Файл читается один раз: начало
+        проверяется на нулевые байты, при ошибке UTF-8 те же байты
+        декодируются как latin-1.
+        """
+        with open(file_path, 'rb') as f:
+            head = f.read(self.SNIFF_SIZE)
+            if b'\0' in head:
+                return None
+            data = head + f.read()
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = data.decode('latin-1')
+        # Переводы строк как при чтении в текстовом режиме
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
     def read_file_content(self, file_path: str) -> str:
         """Прочитать содержимое файла с обработкой ошибок"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return f.read()
-            except Exception as e:
-                return f"[Ошибка чтения файла: {str(e)}]"
+            text = self._read_text(file_path)
         except Exception as e:
             return f"[Ошибка чтения файла: {str(e)}]"
-    
+        return BINARY_MARKER if text is None else text
+
+    def _load_file(self, record: FileRecord) -> Dict:
+        """Содержимое файла для записи (выполняется в пуле потоков)"""
+        relative_path, file_path, stat = record
+        result = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        if not self.should_read_file(file_path):
+            result["binary"] = True
+            return result
+        try:
+            text = self._read_text(file_path)
+        except Exception as e:
+            result["error"] = f"[Ошибка чтения файла: {str(e)}]"
+            return result
+        if text is None:
+            result["binary"] = True
+            return result
+        data = text.encode('utf-8')
+        result["hash"] = content_hash(data)
+        if self.output_format == "snapshot":
+            result["segments"] = compress_segments(data)
+        else:
+            result["body"] = data if text.endswith('\n') else data + b'\n'
+        return result
+
+    def _iter_files(self, files: List[FileRecord], previous: Callable[[FileRecord], Optional[Dict]]) -> Iterator[Tuple[FileRecord, Optional[Dict], Optional[Dict]]]:
+        """
+        Файлы в порядке списка: (файл, запись предыдущего экспорта, None) для
+        неизмененных и (файл, None, прочитанное содержимое) для остальных.
+        Измененные файлы читаются в пуле потоков; в памяти не больше
+        max_workers * 4 прочитанных файлов.
+        """
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for record in files:
+                entry = previous(record)
+                window.append((record, entry, None if entry else executor.submit(self._load_file, record)))
+                if len(window) > self.max_workers * 4:
+                    record, entry, future = window.popleft()
+                    yield record, entry, future and future.result()
+            while window:
+                record, entry, future = window.popleft()
+                yield record, entry, future and future.result()
+
+    @staticmethod
+    def _unchanged(entry: Optional[Dict], record: FileRecord) -> bool:
+        stat = record[2]
+        return bool(entry) and "error" not in entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size
+
+    def _header(self) -> str:
+        return ("=" * 80 + "\n"
+                "СТРУКТУРА ПРОЕКТА\n"
+                + "=" * 80 + "\n"
+                f"Дата создания: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Корневая директория: {self.root_path}\n"
+                + "=" * 80 + "\n\n")
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """Записи манифеста, если предыдущий экспорт не менялся после его создания"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            stat = os.stat(self.output_file)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("output") != {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}:
+            return {}
+        return manifest.get("files", {})
+
+    def _export_text(self, structure_lines: List[str], files: List[FileRecord]) -> Tuple[int, int]:
+        """Текстовый экспорт; содержимое неизмененных файлов копируется из предыдущего"""
+        manifest = self._load_manifest()
+        previous = open(self.output_file, 'rb') if manifest else None
+        entries = {}
+        reused = 0
+        temp_path = self.output_file + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                # Заголовок и иерархия папок и файлов
+                f.write(self._header().encode('utf-8'))
+                f.write(("ИЕРАРХИЯ ПАПОК И ФАЙЛОВ:\n" + "-" * 40 + "\n").encode('utf-8'))
+                for line in structure_lines:
+                    f.write((line + "\n").encode('utf-8'))
+                f.write(("\n" + "=" * 80 + "\n\n").encode('utf-8'))
+
+                # Содержимое файлов
+                f.write(("СОДЕРЖИМОЕ ФАЙЛОВ:\n" + "-" * 40 + "\n").encode('utf-8'))
+                lookup = lambda record: manifest.get(record[0]) if self._unchanged(manifest.get(record[0]), record) else None
+                for (relative_path, _, _), entry, loaded in self._iter_files(files, lookup):
+                    f.write(f"\n{'='*80}\nФАЙЛ: {relative_path}\n{'='*80}\n".encode('utf-8'))
+                    if entry:
+                        previous.seek(entry["offset"])
+                        body = previous.read(entry["length"])
+                        entry = dict(entry)
+                        reused += 1
+                    else:
+                        body = loaded.pop("body", None)
+                        if body is None:
+                            body = (loaded.get("error", BINARY_MARKER) + "\n").encode('utf-8')
+                        entry = loaded
+                    entry["offset"] = f.tell()
+                    entry["length"] = len(body)
+                    f.write(body)
+                    if "error" not in entry:
+                        entries[relative_path] = entry
+        finally:
+            if previous:
+                previous.close()
+        os.replace(temp_path, self.output_file)
+
+        stat = os.stat(self.output_file)
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump({"output": {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}, "files": entries}, f, ensure_ascii=False)
+        return len(files), reused
+
+    def _export_snapshot(self, structure_lines: List[str], files: List[FileRecord]) -> Tuple[int, int]:
+        """Экспорт снимка; сжатые сегменты неизмененных файлов копируются из предыдущего"""
+        try:
+            previous = SnapshotReader(self.output_file)
+        except (OSError, ValueError):
+            previous = None
+        reused = 0
+        temp_path = self.output_file + ".tmp"
+        metadata = {
+            "created": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "root": self.root_path,
+            "structure": structure_lines,
+        }
+        try:
+            with SnapshotWriter(temp_path, metadata) as writer:
+                def lookup(record):
+                    if previous is None or record[0] not in previous:
+                        return None
+                    entry = previous.entry(record[0])
+                    return entry if self._unchanged(entry, record) else None
+
+                for (relative_path, _, _), entry, loaded in self._iter_files(files, lookup):
+                    if entry:
+                        writer.copy_file(previous, entry)
+                        reused += 1
+                    elif "segments" in loaded:
+                        writer.add_file(relative_path, loaded.pop("segments"), **loaded)
+                    else:
+                        writer.add_entry(relative_path, **loaded)
+        finally:
+            if previous:
+                previous.close()
+        os.replace(temp_path, self.output_file)
+        return len(files), reused
+
     def export_project(self):
         """Основной метод экспорта проекта"""
         print(f"Начинаю экспорт структуры проекта из: {self.root_path}")
         print(f"Результат будет сохранен в: {self.output_file}")
-        
-        # Получаем структуру директорий
-        structure_lines = self.get_directory_structure(self.root_path)
-        
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            # Заголовок
-            f.write("=" * 80 + "\n")
-            f.write("СТРУКТУРА ПРОЕКТА\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Дата создания: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Корневая директория: {self.root_path}\n")
-            f.write("=" * 80 + "\n\n")
-            
-            # Иерархия папок и файлов
-            f.write("ИЕРАРХИЯ ПАПОК И ФАЙЛОВ:\n")
-            f.write("-" * 40 + "\n")
-            for line in structure_lines:
-                f.write(line + "\n")
-            f.write("\n" + "=" * 80 + "\n\n")
-            
-            # Содержимое файлов
-            f.write("СОДЕРЖИМОЕ ФАЙЛОВ:\n")
-            f.write("-" * 40 + "\n")
-            
-            # Собираем все файлы для обработки
-            all_files = []
-            for root, dirs, files in os.walk(self.root_path):
-                # Пропускаем нежелательные директории
-                dirs[:] = [d for d in dirs if not self.should_skip_directory(d)]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, self.root_path)
-                    all_files.append((relative_path, file_path))
-            
-            # Сортируем файлы по пути
-            all_files.sort(key=lambda x: x[0])
-            
-            # Записываем содержимое каждого файла
-            for relative_path, file_path in all_files:
-                if self.should_read_file(file_path):
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"ФАЙЛ: {relative_path}\n")
-                    f.write(f"{'='*80}\n")
-                    content = self.read_file_content(file_path)
-                    f.write(content)
-                    if not content.endswith('\n'):
-                        f.write('\n')
-                else:
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"ФАЙЛ: {relative_path}\n")
-                    f.write(f"{'='*80}\n")
-                    f.write(f"[БИНАРНЫЙ ФАЙЛ - СОДЕРЖИМОЕ НЕ ПРОЧИТАНО]\n")
-        
+
+        # Иерархия и список файлов за один проход
+        structure_lines, files = self.scan()
+
+        if self.output_format == "snapshot":
+            total, reused = self._export_snapshot(structure_lines, files)
+        else:
+            total, reused = self._export_text(structure_lines, files)
+
         print(f"Экспорт завершен! Результат сохранен в файл: {self.output_file}")
+        print(f"Файлов: {total}, без изменений с прошлого экспорта: {reused}")
         print(f"Размер файла: {os.path.getsize(self.output_file)} байт")
 
 def main():
     """Основная функция для запуска утилиты"""
+    parser = argparse.ArgumentParser(description='Экспорт структуры и содержимого проекта')
+    parser.add_argument('--root', default='.', help='Корневая директория проекта')
+    parser.add_argument('--output', '-o', help='Файл результата (по умолчанию project_structure.txt или project_structure.snap)')
+    parser.add_argument('--format', choices=['text', 'snapshot'], default='text', help='Формат результата')
+    parser.add_argument('--workers', type=int, help='Число потоков чтения файлов')
+    args = parser.parse_args()
+
     print("Утилита экспорта структуры проекта")
     print("=" * 50)
-    
+
     # Создаем экспортер
-    exporter = ProjectStructureExporter()
-    
+    output_file = args.output or ("project_structure.snap" if args.format == "snapshot" else "project_structure.txt")
+    exporter = ProjectStructureExporter(args.root, output_file, args.format, args.workers)
+
     # Запускаем экспорт
     exporter.export_project()
 
 if __name__ == "__main__":
     main()
-# AGORA_BLOCK: end:project_structure_exporter
\ No newline at end of file
+# AGORA_BLOCK: end:project_structure_exporter
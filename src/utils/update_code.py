@@ -8,7 +8,7 @@ from pathlib import Path
 
 # Добавляем корневую директорию проекта в sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from src.utils.code_utils import CodeBlockManager
+from src.utils.code_utils import BLOCK_TAG_RE, CodeBlockManager
 from src.utils.git_integration import GitIntegration
 
 def clean_code(code):
@@ -48,25 +48,40 @@ def clean_code(code):
     return '\n'.join(cleaned_lines)
 
 def find_block_by_tag(tag_name):
-    """Найти блок по тегу"""
-    manager = CodeBlockManager()
-    
-    # Поддерживаем оба формата: с префиксом и без
-    possible_tags = [
-        f"# AGORA_BLOCK: start:{tag_name}",
-        tag_name if tag_name.startswith("# AGORA_BLOCK: start:") else None
-    ]
-    
-    for full_tag in possible_tags:
-        if full_tag is None:
+    """Найти блок по тегу (короткому или полному формату)"""
+    with CodeBlockManager() as manager:
+        return manager.find_block_by_tag(tag_name)
+
+def parse_patch(text):
+    """
+    Разбор патча из нескольких блоков: {тег: код}.
+
+    Патч - это подряд идущие блоки в обычном формате тегов:
+        # AGORA_BLOCK: start:monitoring_service
+        ...новый код...
+        # AGORA_BLOCK: end:monitoring_service
+    Берутся только внешние блоки; вложенные теги остаются частью кода.
+    """
+    blocks = {}
+    current = None
+    depth = 0
+    body = []
+    for line in text.splitlines():
+        match = BLOCK_TAG_RE.search(line)
+        if current is None:
+            if match and match.group(1) == 'start':
+                current, depth, body = match.group(2), 1, []
             continue
-            
-        for layer_name, layer in manager.code_map['layers'].items():
-            for block_id, block_info in layer['modules'].items():
-                if block_info['start_tag'] == full_tag:
-                    return block_id
-    
-    return None
+        if match and match.group(2) == current:
+            depth += 1 if match.group(1) == 'start' else -1
+            if depth == 0:
+                blocks[current] = clean_code('\n'.join(body))
+                current = None
+                continue
+        body.append(line)
+    if current is not None:
+        raise ValueError(f"Block '{current}' has no end tag in patch")
+    return blocks
 
 def read_code_from_file(file_path):
     """Чтение кода из файла"""
@@ -100,42 +115,78 @@ def read_code_interactive():
 
 def update_block(block_id, new_code, no_commit=False, confirm=False, dry_run=False):
     """Обновление блока кода"""
-    manager = CodeBlockManager()
-    
-    if confirm:
-        print(f"Будет обновлен блок: {block_id}")
-        print(f"Новый код ({len(new_code)} символов):")
-        print("-" * 40)
-        print(new_code[:200] + "..." if len(new_code) > 200 else new_code)
-        print("-" * 40)
+    with CodeBlockManager() as manager:
+        if confirm:
+            print(f"Будет обновлен блок: {block_id}")
+            print(f"Новый код ({len(new_code)} символов):")
+            print("-" * 40)
+            print(new_code[:200] + "..." if len(new_code) > 200 else new_code)
+            print("-" * 40)
+            
+            response = input("Подтвердить обновление? (y/N): ")
+            if response.lower() != 'y':
+                print("Обновление отменено")
+                return False
         
-        response = input("Подтвердить обновление? (y/N): ")
-        if response.lower() != 'y':
-            print("Обновление отменено")
-            return False
-    
-    if dry_run:
-        print(f"[DRY RUN] Блок {block_id} будет обновлен")
-        print(f"Новый код ({len(new_code)} символов):")
-        print("-" * 40)
-        print(new_code)
-        print("-" * 40)
-        return True
-    
-    try:
-        result = manager.replace_block(block_id, new_code)
-        print(result)
+        if dry_run:
+            print(f"[DRY RUN] Блок {block_id} будет обновлен")
+            print(f"Новый код ({len(new_code)} символов):")
+            print("-" * 40)
+            print(new_code)
+            print("-" * 40)
+            return True
         
-        if not no_commit:
-            GitIntegration.commit_changes(block_id)
-            print("Changes committed to Git")
-        else:
-            print("Изменения сохранены без коммита")
+        try:
+            result = manager.replace_block(block_id, new_code)
+            print(result)
+            if "successfully updated" not in result:
+                print("Запись и коммит пропущены")
+                return True
+            
+            if not no_commit:
+                print(GitIntegration.commit_changes(block_id, paths=manager.modified_paths))
+            else:
+                print("Изменения сохранены без коммита")
+            
+            return True
+        except Exception as e:
+            print(f"Ошибка при обновлении блока: {e}")
+            return False
+
+def update_blocks(updates, no_commit=False, confirm=False, dry_run=False):
+    """Пакетное обновление блоков ({block_id: new_code}): один проход по каждому файлу"""
+    with CodeBlockManager() as manager:
+        if confirm or dry_run:
+            prefix = "[DRY RUN] " if dry_run else ""
+            print(f"{prefix}Будут обновлены блоки ({len(updates)}):")
+            for block_id, new_code in updates.items():
+                print(f"  - {block_id} ({manager.get_block_info(block_id)['file']}, {len(new_code)} символов)")
+        if dry_run:
+            return True
+        if confirm:
+            response = input("Подтвердить обновление? (y/N): ")
+            if response.lower() != 'y':
+                print("Обновление отменено")
+                return False
         
-        return True
-    except Exception as e:
-        print(f"Ошибка при обновлении блока: {e}")
-        return False
+        try:
+            changed = manager.replace_blocks(updates)
+            if not changed:
+                print("Ни один блок не изменился - запись и коммит пропущены")
+                return True
+            for file_path, block_ids in changed.items():
+                print(f"{file_path}: {', '.join(block_ids)}")
+            
+            if not no_commit:
+                changed_ids = [block_id for block_ids in changed.values() for block_id in block_ids]
+                print(GitIntegration.commit_changes(", ".join(changed_ids), paths=manager.modified_paths))
+            else:
+                print("Изменения сохранены без коммита")
+            
+            return True
+        except Exception as e:
+            print(f"Ошибка при обновлении блоков: {e}")
+            return False
 
 def main():
     parser = argparse.ArgumentParser(
@@ -154,6 +205,13 @@ def main():
   python src/utils/update_code.py --tag monitoring_service --interactive --confirm
   python src/utils/update_code.py --tag monitoring_service --file code.txt --dry-run
 
+  # Несколько блоков одним патчем (каждый файл и кодовая карта записываются один раз)
+  python src/utils/update_code.py --patch changes.txt --dry-run
+
+  # Блоки, измененные в обход кодовой карты (сравнение хэшей кода)
+  python src/utils/update_code.py --drift
+  python src/utils/update_code.py --record-hashes
+
 Поддерживаемые форматы тегов:
   - Короткий: monitoring_service
   - Полный: "# AGORA_BLOCK: start:monitoring_service"
@@ -164,6 +222,9 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('block_id', nargs='?', help='ID блока для обновления (старый способ)')
     group.add_argument('--tag', '-t', help='Тег блока (рекомендуется)')
+    group.add_argument('--patch', '-p', help='Файл с несколькими блоками в формате тегов AGORA_BLOCK')
+    group.add_argument('--drift', action='store_true', help='Показать блоки, код которых не совпадает с хэшем в кодовой карте')
+    group.add_argument('--record-hashes', action='store_true', help='Записать текущие хэши кода блоков в кодовую карту')
     
     # Группа для источника кода
     source_group = parser.add_mutually_exclusive_group()
@@ -179,6 +240,47 @@ def main():
     
     args = parser.parse_args()
     
+    if args.drift:
+        with CodeBlockManager() as manager:
+            drifted = manager.find_drifted_blocks()
+        for drift_block_id, reason in drifted.items():
+            print(f"❌ {drift_block_id}: {reason}")
+        print(f"Расхождений с кодовой картой: {len(drifted)}")
+        sys.exit(1 if drifted else 0)
+    
+    if args.record_hashes:
+        with CodeBlockManager() as manager:
+            recorded = manager.record_content_hashes()
+        print(f"Обновлены хэши блоков: {len(recorded)}")
+        if recorded and not args.no_commit:
+            print(GitIntegration.commit_changes(", ".join(recorded), "Record block content hashes", manager.modified_paths))
+        return
+    
+    if args.patch:
+        try:
+            with open(args.patch, 'r', encoding='utf-8') as f:
+                patch = parse_patch(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения патча: {e}")
+            sys.exit(1)
+        if not patch:
+            print("В патче не найдено ни одного блока")
+            sys.exit(1)
+        
+        updates = {}
+        with CodeBlockManager() as manager:
+            for tag, code in patch.items():
+                patch_block_id = manager.find_block_by_tag(tag)
+                if not patch_block_id:
+                    print(f"Ошибка: Блок с тегом '{tag}' не найден")
+                    sys.exit(1)
+                updates[patch_block_id] = code
+        
+        if update_blocks(updates, args.no_commit, args.confirm, args.dry_run):
+            print("Готово!")
+            return
+        sys.exit(1)
+    
     # Определяем блок для обновления
     block_id = None
     